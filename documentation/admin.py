@@ -439,8 +439,15 @@ class SDGMappingAdmin(admin.ModelAdmin):
         'program_outcome' , 'impact_area' ,
         'measurement_method'
     )
+    list_select_related = ('initiative' , 'responsible_person__user')
     inlines = [SDGProgressInline]
 
+    def get_readonly_fields(self , request , obj=None):
+        # current_value follows the latest progress record once there is one
+        if obj is not None and obj.latest_progress_id:
+            return tuple(self.readonly_fields) + ('current_value' ,)
+        return self.readonly_fields
+
     fieldsets = (
         ('Basic Information' , {
             'fields': (
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from documentation.sdg import invalidate_dashboard, refresh_current_values
+
+
+class Command(BaseCommand):
+    help = "Recompute SDGMapping current values from their latest SDGProgress records."
+
+    def add_arguments(self, parser):
+        parser.add_argument('mapping_ids', nargs='*', type=int, help="Limit to these mappings")
+
+    def handle(self, *args, **options):
+        refreshed = refresh_current_values(options['mapping_ids'] or None)
+        invalidate_dashboard()
+        self.stdout.write(f"Refreshed {refreshed} SDG mappings")
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documentation', '0004_alter_programlogbook_activity_description_and_more'),
+        ('users', '0002_alter_department_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sdgmapping',
+            name='latest_progress',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='documentation.sdgprogress'),
+        ),
+        migrations.AddField(
+            model_name='sdgmapping',
+            name='latest_progress_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='sdgprogress',
+            index=models.Index(fields=['sdg_mapping', 'record_date'], name='documentati_sdg_map_030bc8_idx'),
+        ),
+    ]
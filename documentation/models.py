@@ -346,6 +346,16 @@ class SDGMapping(models.Model):
     baseline_value = models.FloatField(null=True , blank=True)
     target_value = models.FloatField()
     current_value = models.FloatField(default=0)
+    # Progress record current_value was taken from, kept by documentation.sdg
+    latest_progress = models.ForeignKey(
+        'SDGProgress' ,
+        on_delete=models.SET_NULL ,
+        null=True ,
+        blank=True ,
+        editable=False ,
+        related_name='+'
+    )
+    latest_progress_date = models.DateField(null=True , blank=True , editable=False)
     measurement_method = CustomRichTextField(blank=True)
     data_source = CustomRichTextField(blank=True)
     collection_frequency = models.CharField(
@@ -373,6 +383,19 @@ class SDGMapping(models.Model):
     def __str__(self):
         return f"{self.get_sdg_display()} - {self.initiative.name}"
 
+    def save(self , *args , **kwargs):
+        # Once progress records drive current_value it is only changed by
+        # documentation.sdg; a stale instance must not write it back
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            derived = {'latest_progress' , 'latest_progress_date'}
+            if self.latest_progress_id:
+                derived.add('current_value')
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in derived
+            ]
+        super().save(*args , **kwargs)
+
     def progress_percentage(self):
         if self.target_value == 0:
             return 0
@@ -402,10 +425,21 @@ class SDGProgress(models.Model):
 
     class Meta:
         ordering = ['-record_date']
+        indexes = [
+            models.Index(fields=['sdg_mapping' , 'record_date'])
+        ]
 
     def __str__(self):
         return f"{self.sdg_mapping.get_sdg_display()} Progress - {self.record_date}"
 
+    @classmethod
+    def from_db(cls , db , field_names , values):
+        instance = super().from_db(db , field_names , values)
+        # Remember the mapping, so moving the record can refresh the old one
+        if 'sdg_mapping_id' in instance.__dict__:
+            instance._previous_mapping_id = instance.sdg_mapping_id
+        return instance
+
 
 class ReportDistribution(models.Model):
     REPORT_TYPES = [
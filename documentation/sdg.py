@@ -0,0 +1,151 @@
+"""
+SDG current values and the org-wide SDG dashboard.
+
+SDGMapping.current_value follows its latest SDGProgress record (latest
+record_date, then highest id). A new record is applied with one
+conditional UPDATE; edits and deletes re-read the latest record of the
+mappings involved, which the (sdg_mapping, record_date) index answers
+directly.
+
+The dashboard groups mappings by SDG and by the department of their
+initiative, with summed baseline, target and current values and
+progress_percentage computed the way SDGMapping does it. Progress records
+are grouped by quarter of record_date and the trend is the change in the
+average recorded value between the last two quarters. The dataset comes
+from two grouped queries and is cached until a mapping or progress record
+changes.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncQuarter
+from django.utils import timezone
+
+DASHBOARD_CACHE_KEY = 'documentation:sdg-dashboard'
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def record_added(progress):
+    """Point the mapping at a newly inserted progress record if it is the latest"""
+    from .models import SDGMapping
+
+    SDGMapping.objects.filter(pk=progress.sdg_mapping_id).filter(
+        Q(latest_progress_date__isnull=True)
+        | Q(latest_progress_date__lt=progress.record_date)
+        | Q(latest_progress_date=progress.record_date, latest_progress_id__lt=progress.pk)
+    ).update(
+        current_value=progress.value,
+        latest_progress=progress.pk,
+        latest_progress_date=progress.record_date,
+        updated_at=timezone.now()
+    )
+
+
+def refresh_current_values(mapping_ids=None):
+    """
+    Point current_value of each mapping (every mapping when None) at its
+    latest progress record. Returns the number of mappings refreshed.
+    """
+    from .models import SDGMapping, SDGProgress
+
+    if mapping_ids is None:
+        mapping_ids = SDGMapping.objects.values_list('pk', flat=True)
+    refreshed = 0
+    for mapping_id in mapping_ids:
+        latest = SDGProgress.objects.filter(sdg_mapping_id=mapping_id).order_by(
+            '-record_date', '-pk'
+        ).values_list('pk', 'record_date', 'value').first()
+        if latest:
+            SDGMapping.objects.filter(pk=mapping_id).update(
+                latest_progress=latest[0], latest_progress_date=latest[1], current_value=latest[2],
+                updated_at=timezone.now()
+            )
+        else:
+            SDGMapping.objects.filter(pk=mapping_id).update(
+                latest_progress=None, latest_progress_date=None, updated_at=timezone.now()
+            )
+        refreshed += 1
+    return refreshed
+
+
+def invalidate_dashboard():
+    cache.delete(DASHBOARD_CACHE_KEY)
+
+
+def _percentage(current, target):
+    if not target:
+        return 0
+    return current / target * 100
+
+
+def _trend(periods):
+    if len(periods) < 2:
+        return {'direction': None, 'change': None}
+    change = periods[-1]['average'] - periods[-2]['average']
+    return {'direction': 'up' if change > 0 else 'down' if change < 0 else 'flat', 'change': change}
+
+
+def _summary(totals, periods):
+    periods = sorted(periods.values(), key=lambda p: p['period'])
+    for period in periods:
+        period['average'] = period['total'] / period['records']
+    return {
+        **totals,
+        'progress_percentage': _percentage(totals['current'], totals['target']),
+        'periods': periods,
+        'trend': _trend(periods),
+    }
+
+
+def _add(into, row, *fields):
+    for field in fields:
+        into[field] = into.get(field, 0) + (row[field] or 0)
+
+
+def build_dashboard():
+    from .models import SDGMapping, SDGProgress
+
+    labels = dict(SDGMapping.SDG_CHOICES)
+    totals = {}
+    periods = {}
+    departments = {}
+    for row in SDGMapping.objects.order_by().values(
+        'sdg', 'initiative__department_id', 'initiative__department__name'
+    ).annotate(
+        mappings=Count('id'), baseline=Sum('baseline_value'), target=Sum('target_value'), current=Sum('current_value')
+    ):
+        key = (row['sdg'], row['initiative__department_id'])
+        departments[key] = row['initiative__department__name']
+        for group in (key, row['sdg']):
+            _add(totals.setdefault(group, {}), row, 'mappings', 'baseline', 'target', 'current')
+
+    for row in SDGProgress.objects.order_by().annotate(period=TruncQuarter('record_date')).values(
+        'sdg_mapping__sdg', 'sdg_mapping__initiative__department_id', 'period'
+    ).annotate(total=Sum('value'), records=Count('id')):
+        sdg = row['sdg_mapping__sdg']
+        for group in ((sdg, row['sdg_mapping__initiative__department_id']), sdg):
+            period = periods.setdefault(group, {}).setdefault(row['period'], {'period': row['period']})
+            _add(period, row, 'total', 'records')
+
+    sdgs = []
+    for sdg, label in SDGMapping.SDG_CHOICES:
+        if sdg not in totals:
+            continue
+        summary = _summary(totals[sdg], periods.get(sdg, {}))
+        summary['departments'] = sorted((
+            {
+                'department_id': department_id,
+                'department': departments[(sdg, department_id)],
+                **_summary(totals[(sdg, department_id)], periods.get((sdg, department_id), {})),
+            }
+            for group_sdg, department_id in departments if group_sdg == sdg
+        ), key=lambda d: d['department'])
+        sdgs.append({'sdg': sdg, 'label': labels[sdg], **summary})
+    return {'sdgs': sdgs, 'generated_at': timezone.now()}
+
+
+def get_dashboard():
+    dashboard = cache.get(DASHBOARD_CACHE_KEY)
+    if dashboard is None:
+        dashboard = build_dashboard()
+        cache.set(DASHBOARD_CACHE_KEY, dashboard, DASHBOARD_CACHE_TIMEOUT)
+    return dashboard
@@ -0,0 +1,33 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import sdg
+from .models import SDGMapping, SDGProgress
+
+
+@receiver(post_save, sender=SDGProgress)
+def update_mapping_current_value(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        sdg.record_added(instance)
+    else:
+        sdg.refresh_current_values(
+            {instance.sdg_mapping_id, getattr(instance, '_previous_mapping_id', None)} - {None}
+        )
+    instance._previous_mapping_id = instance.sdg_mapping_id
+
+
+@receiver(post_delete, sender=SDGProgress)
+def remove_mapping_current_value(sender, instance, **kwargs):
+    # SET_NULL on latest_progress has already run when the record was the
+    # latest one, so re-read rather than check latest_progress_id
+    sdg.refresh_current_values([instance.sdg_mapping_id])
+
+
+@receiver(post_save, sender=SDGMapping)
+@receiver(post_delete, sender=SDGMapping)
+@receiver(post_save, sender=SDGProgress)
+@receiver(post_delete, sender=SDGProgress)
+def invalidate_sdg_dashboard(sender, **kwargs):
+    sdg.invalidate_dashboard()
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'documentation'
+
+urlpatterns = [
+    path('sdg-dashboard/', views.sdg_dashboard, name='sdg-dashboard'),
+]
@@ -1,3 +1,11 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required, permission_required
+from django.http import JsonResponse
 
-# Create your views here.
+from .sdg import get_dashboard
+
+
+@login_required
+@permission_required('documentation.view_sdgmapping', raise_exception=True)
+def sdg_dashboard(request):
+    """SDG totals, progress and quarterly trend per SDG and department"""
+    return JsonResponse(get_dashboard())
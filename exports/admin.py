@@ -0,0 +1,145 @@
+# exports/admin.py
+from django.contrib import admin , messages
+from django.contrib.admin.options import IS_POPUP_VAR , TO_FIELD_VAR
+from django.contrib.admin.views.main import (
+    ALL_VAR , ERROR_FLAG , IS_FACETS_VAR , ORDER_VAR , PAGE_VAR , SEARCH_VAR
+)
+from django.core.exceptions import ValidationError
+from django.utils.html import format_html
+
+from .models import ExportJob , validate_export_filters
+
+
+# Changelist query parameters that aren't field lookups
+CHANGELIST_PARAMS = {
+    ALL_VAR , ORDER_VAR , PAGE_VAR , SEARCH_VAR , IS_POPUP_VAR , TO_FIELD_VAR , IS_FACETS_VAR , ERROR_FLAG ,
+    '_changelist_filters'
+}
+
+
+def _changelist_filters(model , request , queryset):
+    """
+    Export filters reproducing a select-across selection from the
+    changelist's query string, or None when they can't: a search, a custom
+    list filter or a lookup across relations, or an admin queryset that
+    hides rows the filters alone would export.
+    """
+    if request.GET.get(SEARCH_VAR):
+        return None
+    filters = {}
+    for key , values in request.GET.lists():
+        if key in CHANGELIST_PARAMS:
+            continue
+        if len(values) != 1:
+            return None
+        value = values[0]
+        if key.endswith('__in'):
+            value = value.split(',')
+        elif key.endswith('__isnull'):
+            value = value.lower() in ('1' , 'true')
+        filters[key] = value
+    try:
+        filters = validate_export_filters(model , filters)
+        if model._default_manager.filter(**filters).count() != queryset.count():
+            return None
+    except (ValidationError , ValueError):
+        return None
+    return filters
+
+
+def _queue_export(modeladmin , request , queryset , export_format):
+    filters = None
+    if request.POST.get('select_across') == '1':
+        filters = _changelist_filters(queryset.model , request , queryset)
+    if filters is None:
+        # Explicit selections, and changelists whose filters can't be
+        # stored as export filters, are stored as ids
+        filters = {'pk__in': list(queryset.values_list('pk' , flat=True))}
+    job = ExportJob.enqueue(queryset.model , request.user , filters , export_format)
+    modeladmin.message_user(
+        request ,
+        f"Export job #{job.pk} queued. You will be notified when the file is ready." ,
+        messages.SUCCESS
+    )
+
+
+def queue_csv_export(modeladmin , request , queryset):
+    _queue_export(modeladmin , request , queryset , 'CSV')
+
+
+def queue_jsonl_export(modeladmin , request , queryset):
+    _queue_export(modeladmin , request , queryset , 'JSONL')
+
+
+queue_csv_export.short_description = "Export selected %(verbose_name_plural)s in background (CSV)"
+queue_jsonl_export.short_description = "Export selected %(verbose_name_plural)s in background (JSON Lines)"
+
+admin.site.add_action(queue_csv_export)
+admin.site.add_action(queue_jsonl_export)
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id' , 'content_type' , 'export_format' , 'status_badge' ,
+        'progress_display' , 'rows_written' , 'requested_by' ,
+        'created_at' , 'download_link'
+    )
+    list_filter = ('status' , 'export_format' , 'content_type')
+    list_select_related = ('content_type' , 'requested_by')
+    readonly_fields = (
+        'requested_by' , 'content_type' , 'export_format' , 'status' ,
+        'total_rows' , 'rows_written' , 'progress' , 'file' , 'error' ,
+        'created_at' , 'started_at' , 'finished_at'
+    )
+    exclude = ('filters' ,)
+    actions = ['requeue_jobs']
+
+    def get_queryset(self , request):
+        queryset = super().get_queryset(request)
+        if request.user.is_superuser:
+            return queryset
+        return queryset.filter(requested_by=request.user)
+
+    def has_add_permission(self , request):
+        return False
+
+    def status_badge(self , obj):
+        colors = {
+            'QUEUED': '#6c757d' ,
+            'RUNNING': '#17a2b8' ,
+            'COMPLETED': '#28a745' ,
+            'FAILED': '#dc3545'
+        }
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 10px;">{}</span>' ,
+            colors.get(obj.status , '#6c757d') ,
+            obj.get_status_display()
+        )
+
+    status_badge.short_description = 'Status'
+
+    def progress_display(self , obj):
+        return f"{obj.progress}%"
+
+    progress_display.short_description = 'Progress'
+
+    def download_link(self , obj):
+        if obj.status != 'COMPLETED' or not obj.file:
+            return '-'
+        return format_html('<a href="{}">Download</a>' , obj.get_download_url())
+
+    download_link.short_description = 'File'
+
+    def requeue_jobs(self , request , queryset):
+        updated = queryset.filter(status__in=['FAILED' , 'RUNNING']).update(
+            status='QUEUED' ,
+            rows_written=0 ,
+            progress=0 ,
+            error='' ,
+            started_at=None ,
+            finished_at=None
+        )
+        self.message_user(request , f"{updated} export jobs requeued.")
+
+    requeue_jobs.short_description = "Requeue failed or stuck jobs"
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ExportsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'exports'
+
+    def ready(self):
+        from .signals import connect_tombstones
+        connect_tombstones()
@@ -0,0 +1,107 @@
+"""
+Initiative dossiers: an initiative together with every record an auditor
+needs, as one JSON document or a zip of CSVs (one file per section).
+
+Each section is read with a single filtered query across all requested
+initiatives, so the query count depends on the number of sections (and
+label chunks), never on the number of initiatives. Rows are written as they
+are read. Given a user, sections whose model the user may not view are left
+out.
+"""
+import csv
+import io
+import zipfile
+
+from django.apps import apps
+from django.contrib.auth import get_permission_codename
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from utils.export import export_fields , iter_export_values
+
+# (section, model label, lookup from the model to Initiative.pk)
+DOSSIER_SECTIONS = [
+    ('initiatives' , 'initiatives.Initiative' , 'pk') ,
+    ('kpis' , 'initiatives.KPI' , 'initiative') ,
+    ('milestones' , 'initiatives.Milestone' , 'initiative') ,
+    ('tasks' , 'initiatives.Task' , 'initiative') ,
+    ('risks' , 'initiatives.Risk' , 'initiative') ,
+    ('budget_items' , 'initiatives.Budget' , 'initiative') ,
+    ('execution_logs' , 'initiatives.ExecutionLog' , 'initiative') ,
+    ('events' , 'initiatives.Event' , 'initiative') ,
+    ('kpi_metrics' , 'monitoring.KPIMetric' , 'initiative') ,
+    ('metric_progress' , 'monitoring.MetricProgress' , 'metric__initiative') ,
+    ('financial_tracking' , 'monitoring.FinancialTracking' , 'initiative') ,
+    ('csr_reports' , 'documentation.CSRReport' , 'initiative') ,
+    ('sdg_mappings' , 'documentation.SDGMapping' , 'initiative') ,
+]
+
+
+def can_view(user , model):
+    opts = model._meta
+    return user.has_perm(f'{opts.app_label}.{get_permission_codename("view" , opts)}')
+
+
+def iter_sections(initiative_ids , user=None):
+    """
+    Yield (section, fields, rows) with rows as a lazy iterator, skipping
+    sections user may not view (all sections when user is None)
+    """
+    initiative_ids = list(initiative_ids)
+    for section , label , lookup in DOSSIER_SECTIONS:
+        model = apps.get_model(label)
+        if user is not None and not can_view(user , model):
+            continue
+        queryset = model._default_manager.filter(**{f'{lookup}__in': initiative_ids}).order_by(lookup , 'pk')
+        fields = export_fields(model)
+        yield section , fields , iter_export_values(queryset , fields)
+
+
+class StreamBuffer:
+    """Write-only file object whose contents are drained by the caller"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self , data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def iter_dossier_json(initiative_ids , user=None):
+    encoder = DjangoJSONEncoder()
+    yield '{"generated_at": %s, "sections": {' % encoder.encode(timezone.now())
+    for index , (section , fields , rows) in enumerate(iter_sections(initiative_ids , user)):
+        keys = [f.name for f in fields]
+        yield '%s%s: [' % (', ' if index else '' , encoder.encode(section))
+        for position , row in enumerate(rows):
+            yield ('' if position == 0 else ', ') + encoder.encode(dict(zip(keys , row)))
+        yield ']'
+    yield '}}\n'
+
+
+def iter_dossier_zip(initiative_ids , user=None , flush_every=500):
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer , mode='w' , compression=zipfile.ZIP_DEFLATED) as archive:
+        for section , fields , rows in iter_sections(initiative_ids , user):
+            with archive.open(f'{section}.csv' , mode='w') as member:
+                out = io.TextIOWrapper(member , encoding='utf-8' , newline='')
+                writer = csv.writer(out)
+                writer.writerow([str(f.verbose_name).title() for f in fields])
+                for position , row in enumerate(rows , start=1):
+                    writer.writerow(['' if value is None else value for value in row])
+                    if position % flush_every == 0:
+                        out.flush()
+                        yield buffer.drain()
+                out.flush()
+                out.detach()
+            yield buffer.drain()
+    yield buffer.drain()
@@ -0,0 +1,61 @@
+import json
+import os
+
+from django.apps import apps
+from django.core.management.base import BaseCommand , CommandError
+
+from exports.changes import (
+    export_until , gzip_stream , iter_change_lines , model_label , parse_watermark ,
+    tracked_models , watermark_field
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Write rows changed since each table's watermark, plus deletions, as gzip JSON Lines. "
+        "With --state the watermarks are read from and saved back to a JSON file."
+    )
+
+    def add_arguments(self , parser):
+        parser.add_argument('output' , help="Path of the .jsonl.gz file to write")
+        parser.add_argument('--state' , help="JSON file mapping model labels to watermarks")
+        parser.add_argument('--since' , help="Watermark for models missing from the state file (ISO 8601)")
+        parser.add_argument('--models' , nargs='+' , help="Model labels to export, e.g. initiatives.task")
+
+    def handle(self , *args , **options):
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError , ValueError) as e:
+                raise CommandError(str(e))
+            untracked = [model_label(m) for m in models if not watermark_field(m)]
+            if untracked:
+                raise CommandError(f"Not change-tracked: {', '.join(untracked)}")
+        else:
+            models = tracked_models()
+
+        state = {}
+        if options['state'] and os.path.exists(options['state']):
+            with open(options['state']) as fh:
+                state = json.load(fh)
+
+        try:
+            default_since = parse_watermark(options['since'])
+            models_since = [
+                (model , parse_watermark(state[model_label(model)]) if model_label(model) in state else default_since)
+                for model in models
+            ]
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        until = export_until()
+        with open(options['output'] , 'wb') as out:
+            for chunk in gzip_stream(iter_change_lines(models_since , until)):
+                out.write(chunk)
+
+        if options['state']:
+            state.update({model_label(model): until.isoformat() for model in models})
+            with open(options['state'] , 'w') as fh:
+                json.dump(state , fh , indent=2 , sort_keys=True)
+
+        self.stdout.write(f"Changes for {len(models)} models up to {until.isoformat()} written to {options['output']}")
@@ -0,0 +1,43 @@
+import sys
+
+from django.core.management.base import BaseCommand , CommandError
+
+from exports.dossier import iter_dossier_json , iter_dossier_zip
+from initiatives.models import Initiative
+
+
+class Command(BaseCommand):
+    help = "Export the full audit dossier of one or more initiatives as JSON or zipped CSV."
+
+    def add_arguments(self , parser):
+        parser.add_argument('initiative_ids' , nargs='*' , type=int)
+        parser.add_argument('--all' , action='store_true' , help="Export every initiative")
+        parser.add_argument('--format' , choices=['json' , 'zip'] , default='json')
+        parser.add_argument('--output' , '-o' , help="File to write, defaults to stdout")
+
+    def handle(self , *args , **options):
+        if options['all']:
+            initiative_ids = list(Initiative.objects.values_list('id' , flat=True))
+        else:
+            initiative_ids = options['initiative_ids']
+            if not initiative_ids:
+                raise CommandError("Pass one or more initiative ids, or --all")
+            found = set(Initiative.objects.filter(pk__in=initiative_ids).values_list('id' , flat=True))
+            missing = sorted(set(initiative_ids) - found)
+            if missing:
+                raise CommandError(f"Initiatives not found: {', '.join(map(str , missing))}")
+
+        if options['format'] == 'json':
+            chunks = (chunk.encode('utf-8') for chunk in iter_dossier_json(initiative_ids))
+        else:
+            chunks = iter_dossier_zip(initiative_ids)
+
+        if options['output']:
+            with open(options['output'] , 'wb') as out:
+                for chunk in chunks:
+                    out.write(chunk)
+            self.stderr.write(f"Dossier for {len(initiative_ids)} initiatives written to {options['output']}")
+        else:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
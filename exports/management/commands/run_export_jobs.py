@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from exports.runner import claim_next_job , run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued export jobs. Polls the database, so no broker is required."
+
+    def add_arguments(self , parser):
+        parser.add_argument(
+            '--once' ,
+            action='store_true' ,
+            help="Drain the queue and exit instead of polling forever"
+        )
+        parser.add_argument(
+            '--interval' ,
+            type=float ,
+            default=5 ,
+            help="Seconds to wait between polls when the queue is empty"
+        )
+
+    def handle(self , *args , **options):
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+                continue
+
+            self.stdout.write(f"Running export job {job.pk}")
+            job = run_job(job)
+            self.stdout.write(f"Export job {job.pk}: {job.get_status_display()} ({job.rows_written} rows)")
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:38
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fail_pending_jobs(apps, schema_editor):
+    # Jobs queued with a pickled query can't be replayed without it
+    apps.get_model('exports', 'ExportJob').objects.filter(status__in=['QUEUED', 'RUNNING']).update(
+        status='FAILED',
+        error='Queued before export filters were stored as field lookups; please request the export again.',
+        finished_at=timezone.now(),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exports', '0002_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='filters',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(fail_pending_jobs, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='exportjob',
+            name='query',
+        ),
+    ]
@@ -0,0 +1,128 @@
+# exports/models.py
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.urls import reverse
+
+# Lookups an export request may use on the model's own fields. Keys naming
+# a relation path (author__user__email) are refused, so filters can't probe
+# models the requester isn't allowed to see.
+FIELD_LOOKUPS = {
+    'exact' , 'iexact' , 'in' , 'gt' , 'gte' , 'lt' , 'lte' , 'range' , 'isnull' ,
+    'contains' , 'icontains' , 'startswith' , 'istartswith' , 'endswith' , 'iendswith' ,
+    'date' , 'year' , 'month' , 'day'
+}
+RELATION_LOOKUPS = {'exact' , 'in' , 'isnull'}
+
+
+def validate_export_filters(model , filters):
+    """
+    Check that filters only looks up the model's own concrete fields and
+    return it as a dict. Raises ValidationError otherwise.
+    """
+    if filters is None:
+        return {}
+    if not isinstance(filters , dict):
+        raise ValidationError("Filters must be an object of field lookups")
+    fields = {}
+    for field in model._meta.concrete_fields:
+        fields[field.name] = fields[field.attname] = field
+    fields['pk'] = model._meta.pk
+    for key in filters:
+        name , _ , lookup = str(key).partition('__')
+        field = fields.get(name)
+        if field is None:
+            raise ValidationError(f"Unknown field {name!r} in filter {key!r}")
+        allowed = RELATION_LOOKUPS if field.is_relation else FIELD_LOOKUPS
+        if lookup and lookup not in allowed:
+            raise ValidationError(f"Lookup {lookup!r} is not allowed in filter {key!r}")
+    return dict(filters)
+
+
+class ExportJob(models.Model):
+    """
+    An export that is too large to stream within a request. Jobs are queued
+    from the admin or GraphQL and picked up by the run_export_jobs command.
+    """
+    FORMAT_CHOICES = [
+        ('CSV' , 'CSV (gzip)') ,
+        ('JSONL' , 'JSON Lines (gzip)')
+    ]
+
+    STATUS_CHOICES = [
+        ('QUEUED' , 'Queued') ,
+        ('RUNNING' , 'Running') ,
+        ('COMPLETED' , 'Completed') ,
+        ('FAILED' , 'Failed')
+    ]
+
+    requested_by = models.ForeignKey(
+        User ,
+        on_delete=models.SET_NULL ,
+        null=True ,
+        related_name='export_jobs'
+    )
+    content_type = models.ForeignKey(
+        ContentType ,
+        on_delete=models.CASCADE ,
+        related_name='export_jobs'
+    )
+    # Field lookups checked by validate_export_filters; the worker rebuilds
+    # the queryset from the model and these
+    filters = models.JSONField(default=dict , blank=True)
+    export_format = models.CharField(max_length=10 , choices=FORMAT_CHOICES , default='CSV')
+    status = models.CharField(max_length=20 , choices=STATUS_CHOICES , default='QUEUED')
+    total_rows = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveIntegerField(default=0)
+    progress = models.PositiveSmallIntegerField(default=0)
+    file = models.FileField(upload_to='exports/%Y/%m/' , blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True , blank=True)
+    finished_at = models.DateTimeField(null=True , blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status' , 'created_at'])
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model_class()._meta.verbose_name_plural} export #{self.pk} ({self.get_status_display()})"
+
+    @classmethod
+    def enqueue(cls , model , user , filters=None , export_format='CSV'):
+        return cls.objects.create(
+            requested_by=user ,
+            content_type=ContentType.objects.get_for_model(model) ,
+            filters=validate_export_filters(model , filters) ,
+            export_format=export_format
+        )
+
+    def get_queryset(self):
+        model = self.content_type.model_class()
+        return model._default_manager.filter(**validate_export_filters(model , self.filters))
+
+    def get_download_url(self):
+        return reverse('exports:download' , args=[self.pk])
+
+
+class Tombstone(models.Model):
+    """Deletion of a change-tracked row, recorded for incremental exports"""
+    content_type = models.ForeignKey(
+        ContentType ,
+        on_delete=models.CASCADE ,
+        related_name='tombstones'
+    )
+    object_id = models.CharField(max_length=64)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['content_type' , 'deleted_at'])
+        ]
+
+    def __str__(self):
+        return f"{self.content_type} #{self.object_id} deleted {self.deleted_at:%Y-%m-%d %H:%M}"
@@ -0,0 +1,126 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import tempfile
+import traceback
+
+from django.conf import settings
+from django.core.files import File
+from django.core.mail import send_mail
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from job_portal.models import Notification
+from utils.export import EXPORT_CHUNK_SIZE , export_fields , iter_export_values
+
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+def claim_next_job():
+    """Mark the oldest queued job as running and return it, or None"""
+    for pk in ExportJob.objects.filter(status='QUEUED').order_by('created_at').values_list('pk' , flat=True)[:5]:
+        # The status guard makes the claim safe with several workers polling
+        claimed = ExportJob.objects.filter(pk=pk , status='QUEUED').update(
+            status='RUNNING' ,
+            started_at=timezone.now()
+        )
+        if claimed:
+            return ExportJob.objects.select_related('content_type' , 'requested_by').get(pk=pk)
+    return None
+
+
+def run_job(job , chunk_size=EXPORT_CHUNK_SIZE):
+    try:
+        queryset = job.get_queryset()
+        total = queryset.count()
+        ExportJob.objects.filter(pk=job.pk).update(total_rows=total)
+
+        with tempfile.TemporaryFile() as tmp:
+            rows = _write(job , queryset , tmp , total , chunk_size)
+            tmp.seek(0)
+            meta = queryset.model._meta
+            extension = 'csv.gz' if job.export_format == 'CSV' else 'jsonl.gz'
+            job.file.save(
+                f'{meta.app_label}_{meta.model_name}_{job.pk}.{extension}' ,
+                File(tmp) ,
+                save=False
+            )
+
+        job.status = 'COMPLETED'
+        job.total_rows = total
+        job.rows_written = rows
+        job.progress = 100
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status' , 'total_rows' , 'rows_written' , 'progress' , 'file' , 'finished_at'])
+    except Exception:
+        logger.exception('Export job %s failed' , job.pk)
+        job.status = 'FAILED'
+        job.error = traceback.format_exc()
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status' , 'error' , 'finished_at'])
+
+    try:
+        notify(job)
+    except Exception:
+        logger.exception('Could not notify the requester of export job %s' , job.pk)
+    return job
+
+
+def _write(job , queryset , tmp , total , chunk_size):
+    fields = export_fields(queryset.model)
+    gz = gzip.GzipFile(fileobj=tmp , mode='wb')
+    with io.TextIOWrapper(gz , encoding='utf-8' , newline='') as out:
+        if job.export_format == 'CSV':
+            writer = csv.writer(out)
+            writer.writerow([str(f.verbose_name).title() for f in fields])
+            write_row = lambda row: writer.writerow(['' if value is None else value for value in row])
+        else:
+            keys = [f.name for f in fields]
+            write_row = lambda row: out.write(json.dumps(dict(zip(keys , row)) , cls=DjangoJSONEncoder) + '\n')
+
+        rows = 0
+        for row in iter_export_values(queryset , fields , chunk_size):
+            write_row(row)
+            rows += 1
+            if rows % chunk_size == 0:
+                ExportJob.objects.filter(pk=job.pk).update(
+                    rows_written=rows ,
+                    progress=min(99 , rows * 100 // total) if total else 0
+                )
+    return rows
+
+
+def notify(job):
+    user = job.requested_by
+    if user is None:
+        return
+
+    label = job.content_type.model_class()._meta.verbose_name_plural
+    if job.status == 'COMPLETED':
+        title = f"Your {label} export is ready"
+        message = f"{job.rows_written} rows were exported. The file is available for download."
+        link = f"{getattr(settings , 'SITE_URL' , '')}{job.get_download_url()}"
+    else:
+        title = f"Your {label} export failed"
+        message = "The export could not be completed. Please try again or contact an administrator."
+        link = ''
+
+    Notification.objects.create(
+        user=user ,
+        notification_type='SY' ,
+        title=title ,
+        message=message ,
+        link=link
+    )
+    if user.email:
+        send_mail(
+            title ,
+            f"{message}\n\n{link}".strip() ,
+            settings.DEFAULT_FROM_EMAIL ,
+            [user.email] ,
+            fail_silently=True
+        )
@@ -0,0 +1,79 @@
+import graphene
+from graphene_django import DjangoObjectType
+from graphql_jwt.decorators import login_required
+from django.apps import apps
+from django.core.exceptions import FieldError , ValidationError
+
+from .models import ExportJob , validate_export_filters
+
+
+class ExportJobType(DjangoObjectType):
+    model = graphene.String()
+    download_url = graphene.String()
+
+    class Meta:
+        model = ExportJob
+        exclude = ('filters' ,)
+
+    def resolve_model(self , info):
+        return f"{self.content_type.app_label}.{self.content_type.model}"
+
+    def resolve_download_url(self , info):
+        if self.status != 'COMPLETED':
+            return None
+        return info.context.build_absolute_uri(self.get_download_url())
+
+
+class Query(graphene.ObjectType):
+    export_job = graphene.Field(ExportJobType , id=graphene.ID(required=True))
+    my_export_jobs = graphene.List(ExportJobType)
+
+    @login_required
+    def resolve_export_job(self , info , id):
+        return ExportJob.objects.filter(pk=id , requested_by=info.context.user).first()
+
+    @login_required
+    def resolve_my_export_jobs(self , info):
+        return ExportJob.objects.filter(requested_by=info.context.user).select_related('content_type')
+
+
+class RequestExportMutation(graphene.Mutation):
+    class Arguments:
+        model = graphene.String(required=True , description="Model label, e.g. monitoring.MetricProgress")
+        export_format = graphene.String(default_value='CSV')
+        filters = graphene.JSONString(
+            description="Lookups on the model's own fields, e.g. {\"status\": \"ACTIVE\", \"created_at__gte\": \"2025-01-01\"}"
+        )
+
+    job = graphene.Field(ExportJobType)
+    success = graphene.Boolean()
+    errors = graphene.List(graphene.String)
+
+    @login_required
+    def mutate(self , info , model , export_format='CSV' , filters=None):
+        user = info.context.user
+        try:
+            model_class = apps.get_model(model)
+        except (LookupError , ValueError):
+            return RequestExportMutation(job=None , success=False , errors=[f"Unknown model {model}"])
+
+        meta = model_class._meta
+        if not user.has_perm(f'{meta.app_label}.view_{meta.model_name}'):
+            return RequestExportMutation(job=None , success=False , errors=["Permission denied"])
+        if export_format not in dict(ExportJob.FORMAT_CHOICES):
+            return RequestExportMutation(job=None , success=False , errors=[f"Unknown format {export_format}"])
+
+        try:
+            # Fails early on values the lookups can't take
+            model_class._default_manager.filter(**validate_export_filters(model_class , filters)).exists()
+            job = ExportJob.enqueue(model_class , user , filters , export_format)
+        except ValidationError as e:
+            return RequestExportMutation(job=None , success=False , errors=e.messages)
+        except (FieldError , TypeError , ValueError) as e:
+            return RequestExportMutation(job=None , success=False , errors=[str(e)])
+
+        return RequestExportMutation(job=job , success=True , errors=None)
+
+
+class Mutation(graphene.ObjectType):
+    request_export = RequestExportMutation.Field()
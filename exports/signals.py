@@ -0,0 +1,23 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_delete
+
+from .changes import tracked_models
+from .models import Tombstone
+
+
+def record_tombstone(sender , instance , **kwargs):
+    Tombstone.objects.create(
+        content_type=ContentType.objects.get_for_model(sender) ,
+        object_id=str(instance.pk)
+    )
+
+
+def connect_tombstones():
+    # Connected per model rather than globally so deletes of untracked
+    # models keep Django's fast-delete path
+    for model in tracked_models():
+        post_delete.connect(
+            record_tombstone ,
+            sender=model ,
+            dispatch_uid=f'exports-tombstone-{model._meta.label_lower}'
+        )
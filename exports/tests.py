@@ -0,0 +1,21 @@
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase
+
+from utils import export
+
+
+class LabelResolverTests(TestCase):
+    def test_labels_survive_memo_overflow(self):
+        permissions = Permission.objects.select_related('content_type').order_by('pk')
+        fields = [Permission._meta.get_field('codename') , Permission._meta.get_field('content_type')]
+        self.assertGreater(permissions.values('content_type').distinct().count() , 3)
+
+        with mock.patch.object(export , 'LABEL_CACHE_SIZE' , 3):
+            rows = list(export.iter_export_values(permissions , fields , chunk_size=10))
+
+        self.assertEqual(
+            [row[1] for row in rows] ,
+            [str(permission.content_type) for permission in permissions]
+        )
@@ -0,0 +1,48 @@
+from django.apps import apps
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse , Http404 , HttpResponseBadRequest , StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+
+from .changes import export_until , gzip_stream , iter_change_lines , parse_watermark , watermark_field
+from .models import ExportJob
+
+
+@login_required
+def download(request , pk):
+    job = get_object_or_404(ExportJob , pk=pk , status='COMPLETED')
+    if job.requested_by_id != request.user.pk and not request.user.is_superuser:
+        raise Http404
+    if not job.file:
+        raise Http404
+    return FileResponse(job.file.open('rb') , as_attachment=True , filename=job.file.name.rsplit('/' , 1)[-1])
+
+
+@login_required
+def changes(request):
+    """
+    Stream rows of one model changed after ?since= as gzip JSON Lines. The
+    X-Export-Watermark header holds the value to pass as since next time.
+    """
+    try:
+        model = apps.get_model(request.GET.get('model' , ''))
+    except (LookupError , ValueError):
+        return HttpResponseBadRequest("Unknown model")
+    meta = model._meta
+    if not watermark_field(model):
+        return HttpResponseBadRequest("Model is not change-tracked")
+    if not (request.user.is_staff and request.user.has_perm(f'{meta.app_label}.view_{meta.model_name}')):
+        raise PermissionDenied
+    try:
+        since = parse_watermark(request.GET.get('since'))
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+
+    until = export_until()
+    response = StreamingHttpResponse(
+        gzip_stream(iter_change_lines([(model , since)] , until)) ,
+        content_type='application/gzip'
+    )
+    response['Content-Disposition'] = f'attachment; filename={meta.app_label}_{meta.model_name}_changes.jsonl.gz'
+    response['X-Export-Watermark'] = until.isoformat()
+    return response
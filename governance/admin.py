@@ -123,6 +123,7 @@ class ProjectTimelineAdmin(admin.ModelAdmin):
         'timeline_status'
     )
     list_filter = ('status' , 'priority' , 'start_date')
+    list_select_related = ('initiative' , 'assigned_to__user')
     search_fields = ('task_name' , 'description' , 'initiative__name')
     filter_horizontal = ('dependencies' ,)
 
@@ -0,0 +1,123 @@
+"""
+Precomputed Gantt layout for an initiative's ProjectTimeline rows.
+
+The layout is built from two queries (bars, then dependency edges) and
+cached per initiative until a timeline row changes or the day rolls over.
+Dates are sent as day offsets from the layout origin so clients only do
+arithmetic, and lanes are packed so bars that don't overlap share a row.
+"""
+import heapq
+
+from django.core.cache import cache
+from django.utils import timezone
+
+GANTT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def gantt_cache_key(initiative_id):
+    return f'governance:gantt:{initiative_id}'
+
+
+def invalidate_gantt(*initiative_ids):
+    cache.delete_many([gantt_cache_key(pk) for pk in initiative_ids if pk])
+
+
+def bar_state(status, start_date, end_date, today):
+    """Same rules as ProjectTimelineAdmin.timeline_status"""
+    if status == 'COMPLETED':
+        return 'completed'
+    if end_date < today:
+        return 'overdue'
+    if start_date <= today:
+        return 'active'
+    return 'upcoming'
+
+
+def _pack_lanes(bars):
+    """Assign each bar (sorted by start) the lowest lane free at its start"""
+    free = []  # (end offset, lane)
+    lanes = 0
+    for bar in bars:
+        if free and free[0][0] <= bar['start']:
+            _, lane = heapq.heappop(free)
+        else:
+            lane = lanes
+            lanes += 1
+        bar['lane'] = lane
+        heapq.heappush(free, (bar['start'] + bar['duration'], lane))
+    return lanes
+
+
+def build_gantt(initiative_id, today=None):
+    from .models import ProjectTimeline
+
+    today = today or timezone.now().date()
+    rows = list(
+        ProjectTimeline.objects.filter(initiative_id=initiative_id).order_by('start_date', 'end_date', 'pk').values_list(
+            'pk', 'task_name', 'start_date', 'end_date', 'progress', 'status', 'priority',
+            'assigned_to__user__first_name', 'assigned_to__user__last_name'
+        )
+    )
+    if not rows:
+        return {
+            'origin': None, 'days': 0, 'lanes': 0, 'bars': [], 'arrows': [],
+            'today': {'offset': None, 'state': 'empty'}, 'generated_at': timezone.now(),
+        }
+
+    origin = min(row[2] for row in rows)
+    finish = max(row[3] for row in rows)
+    bars = []
+    index = {}
+    for pk, name, start_date, end_date, progress, status, priority, first_name, last_name in rows:
+        index[pk] = len(bars)
+        bars.append({
+            'id': pk,
+            'name': name,
+            'assignee': f'{first_name} {last_name}'.strip(),
+            'start': (start_date - origin).days,
+            'duration': max((end_date - start_date).days, 0) + 1,
+            'progress': progress,
+            'status': status,
+            'priority': priority,
+            'state': bar_state(status, start_date, end_date, today),
+        })
+    lanes = _pack_lanes(bars)
+
+    Through = ProjectTimeline.dependencies.through
+    arrows = [
+        [index[upstream], index[downstream]]
+        for downstream, upstream in Through.objects.filter(
+            from_projecttimeline__initiative_id=initiative_id,
+            to_projecttimeline__initiative_id=initiative_id
+        ).values_list('from_projecttimeline_id', 'to_projecttimeline_id')
+    ]
+
+    if today < origin:
+        today_state = 'before'
+    elif today > finish:
+        today_state = 'after'
+    else:
+        today_state = 'during'
+
+    return {
+        'origin': origin,
+        'days': (finish - origin).days + 1,
+        'lanes': lanes,
+        'bars': bars,
+        'arrows': arrows,
+        'today': {'offset': (today - origin).days, 'state': today_state},
+        'generated_at': timezone.now(),
+    }
+
+
+def get_gantt(initiative_id):
+    today = timezone.now().date()
+    key = gantt_cache_key(initiative_id)
+    cached = cache.get(key)
+    # Bar states and the today marker move with the date, so a layout from
+    # an earlier day is rebuilt even if nothing was saved
+    if cached is not None and cached[0] == today:
+        return cached[1]
+    layout = build_gantt(initiative_id, today)
+    cache.set(key, (today, layout), GANTT_CACHE_TIMEOUT)
+    return layout
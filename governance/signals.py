@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .gantt import invalidate_gantt
+from .models import ProjectTimeline
+
+
+@receiver(pre_save, sender=ProjectTimeline)
+def remember_timeline_initiative(sender, instance, raw=False, **kwargs):
+    # A row moved to another initiative must also leave the old layout
+    if instance.pk and not raw:
+        instance._previous_initiative_id = ProjectTimeline.objects.filter(pk=instance.pk).values_list(
+            'initiative_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=ProjectTimeline)
+@receiver(post_delete, sender=ProjectTimeline)
+def invalidate_timeline_gantt(sender, instance, **kwargs):
+    initiative_ids = (instance.initiative_id, getattr(instance, '_previous_initiative_id', None))
+    # Invalidating before commit would let a concurrent request cache the
+    # old layout again until the next change
+    transaction.on_commit(lambda: invalidate_gantt(*initiative_ids))
+
+
+@receiver(m2m_changed, sender=ProjectTimeline.dependencies.through)
+def invalidate_dependency_gantt(sender, instance, action, reverse, pk_set, **kwargs):
+    if action.startswith('post_'):
+        initiative_ids = {instance.initiative_id}
+        if reverse and pk_set:
+            initiative_ids.update(
+                ProjectTimeline.objects.filter(pk__in=pk_set).values_list('initiative_id', flat=True)
+            )
+        transaction.on_commit(lambda: invalidate_gantt(*initiative_ids))
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'governance'
+
+urlpatterns = [
+    path('initiatives/<int:initiative_id>/gantt/', views.timeline_gantt, name='timeline-gantt'),
+]
@@ -1,3 +1,15 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import login_required, permission_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
 
-# Create your views here.
+from initiatives.models import Initiative
+
+from .gantt import get_gantt
+
+
+@login_required
+@permission_required('governance.view_projecttimeline', raise_exception=True)
+def timeline_gantt(request, initiative_id):
+    """Precomputed Gantt layout of an initiative's project timeline"""
+    get_object_or_404(Initiative, pk=initiative_id)
+    return JsonResponse(get_gantt(initiative_id))
@@ -156,12 +156,73 @@ from django.contrib import admin
 from django.db.models import Count, Q, Prefetch
 from django.utils import timezone
 from django.urls import reverse
-from django.utils.html import format_html, mark_safe
+from django.utils.html import format_html, format_html_join, mark_safe
 from django.db.models.functions import Coalesce
 from django.contrib import messages
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
+from django import forms
+from django.contrib.admin.helpers import ActionForm
 import csv
 from datetime import datetime
+from exports.dossier import iter_dossier_json, iter_dossier_zip
+from monitoring.admin import forecast_badge
+from .graph import DependencyCycleError, TaskGraph, find_dependency_cycle
+from .slippage import impact_of
+
+
+class InitiativeStatusActionForm(ActionForm):
+    status = forms.ChoiceField(
+        choices=[('', '---------')] + Initiative.STATUS_CHOICES,
+        required=False,
+        label='New status'
+    )
+
+
+class TaskStatusActionForm(ActionForm):
+    status = forms.ChoiceField(
+        choices=[('', '---------')] + Task.STATUS_CHOICES,
+        required=False,
+        label='New status'
+    )
+
+def feedback_summary(stats, program=False):
+    """Mean rating, recommendation score and responses from a FeedbackStatistics row"""
+    if stats is None or not (stats.responses or stats.program_responses):
+        return mark_safe('<span style="color: gray;">No feedback</span>')
+    parts = []
+    if stats.responses:
+        rating = stats.rating_mean()
+        if rating is None:
+            rating_display = format_html('<span style="color: gray;">No ratings</span>')
+        else:
+            color = 'green' if rating >= 4 else 'orange' if rating >= 3 else 'red'
+            rating_display = format_html('<span style="color: {};">{} / 5</span>', color, f'{rating:.1f}')
+        parts.append(format_html(
+            '{} ({} responses, recommend score {})',
+            rating_display, f'{stats.responses:,}', f'{stats.recommend_score():+.0f}'
+        ))
+    if program and stats.program_responses:
+        parts.append(format_html(
+            'Programme: {}% expectations met ({} responses)',
+            f'{stats.expectations_met_share():.0f}', f'{stats.program_responses:,}'
+        ))
+    return format_html_join(mark_safe('<br>'), '{}', ((part,) for part in parts))
+
+
+class TaskAdminForm(forms.ModelForm):
+    class Meta:
+        model = Task
+        fields = '__all__'
+
+    def clean_dependencies(self):
+        dependencies = self.cleaned_data.get('dependencies')
+        if self.instance.pk and dependencies:
+            cycle = find_dependency_cycle(self.instance.pk, [task.pk for task in dependencies])
+            if cycle:
+                raise forms.ValidationError(
+                    'These dependencies would create a cycle: %s' % ' -> '.join(str(pk) for pk in cycle)
+                )
+        return dependencies
 
 @admin.register(Initiative)
 class InitiativeAdmin(admin.ModelAdmin):
@@ -177,7 +238,9 @@ class InitiativeAdmin(admin.ModelAdmin):
         ('start_date', admin.DateFieldListFilter),
     )
     search_fields = ('name', 'description', 'created_by__user__username')
-    readonly_fields = ('created_at', 'last_updated', 'health_status')
+    readonly_fields = (
+        'created_at', 'last_updated', 'health_status', 'actual_spend', 'feedback_display', 'schedule_display'
+    )
     inlines = [KPIInline, MilestoneInline, RiskInline, BudgetInline]
     list_per_page = 20
 
@@ -188,11 +251,15 @@ class InitiativeAdmin(admin.ModelAdmin):
         ('Timeline', {
             'fields': ('start_date', 'end_date')
         }),
+        ('Schedule', {
+            'fields': ('schedule_display',),
+            'classes': ('collapse',)
+        }),
         ('Financial', {
             'fields': ('budget', 'actual_spend')
         }),
         ('Target & Impact', {
-            'fields': ('target_beneficiaries', 'success_metrics'),
+            'fields': ('target_beneficiaries', 'success_metrics', 'feedback_display'),
             'classes': ('collapse',)
         }),
         ('Learning & Documentation', {
@@ -213,7 +280,8 @@ class InitiativeAdmin(admin.ModelAdmin):
         }),
     )
     filter_horizontal = ('stakeholders','volunteer')
-    actions = ['export_as_csv', 'generate_progress_report', 'bulk_status_update']
+    actions = ['generate_progress_report', 'export_dossier_json', 'export_dossier_zip', 'bulk_status_update']
+    action_form = InitiativeStatusActionForm
 
     def get_queryset(self, request):
         """Optimize queryset with select_related and prefetch_related"""
@@ -226,6 +294,42 @@ class InitiativeAdmin(admin.ModelAdmin):
             'stakeholders'
         )
 
+    def feedback_display(self, obj):
+        return feedback_summary(obj.feedback_statistics.filter(event__isnull=True).first(), program=True)
+
+    feedback_display.short_description = 'Feedback'
+
+    def schedule_display(self, obj):
+        """Critical path of the initiative's tasks with their earliest dates, and blocked tasks"""
+        if not obj.pk:
+            return "-"
+        graph = TaskGraph.for_initiative(obj)
+        if not len(graph):
+            return "No tasks created yet"
+        try:
+            schedule = graph.schedule()
+            path = graph.critical_path()
+        except DependencyCycleError as e:
+            return format_html('<span style="color: red;">{}</span>', e.messages[0])
+        titles = dict(Task.objects.filter(pk__in=path).values_list('pk', 'title'))
+        return format_html(
+            '<strong>Critical path</strong> (finishes {}):'
+            '<ol style="margin: 0;">{}</ol>'
+            '<div>{} task(s) with slack, {} blocked by unfinished dependencies</div>',
+            schedule[path[-1]].earliest_finish,
+            format_html_join(
+                '', '<li>{} &ndash; {} to {}</li>',
+                (
+                    (titles.get(pk, pk), schedule[pk].earliest_start, schedule[pk].earliest_finish)
+                    for pk in path
+                )
+            ),
+            sum(1 for item in schedule.values() if not item.critical),
+            len(graph.blocked())
+        )
+
+    schedule_display.short_description = 'Schedule'
+
     def progress_display(self, obj):
         try:
             completed_kpis = obj.kpis.filter(achieved=True).count()
@@ -475,22 +579,107 @@ class InitiativeAdmin(admin.ModelAdmin):
         except Exception:
             return 0
 
-    def export_as_csv(self, request, queryset):
-        """Export selected initiatives as CSV"""
-        meta = self.model._meta
-        field_names = [field.name for field in meta.fields]
-        
+    def bulk_status_update(self, request, queryset):
+        """Move selected initiatives to the status chosen in the action bar"""
+        status = request.POST.get('status')
+        labels = dict(Initiative.STATUS_CHOICES)
+        if status not in labels:
+            self.message_user(request, "Choose a new status before running this action.", messages.ERROR)
+            return None
+
+        updated = queryset.transition_status(status)
+        self.message_user(request, f"{updated} initiative(s) moved to {labels[status]}.", messages.SUCCESS)
+
+    bulk_status_update.short_description = "Update status of selected initiatives"
+
+    def _dossier_response(self, request, queryset, content, content_type, extension):
+        initiative_ids = list(queryset.prefetch_related(None).values_list('id', flat=True))
+        # Only the sections the user could open in the admin themselves
+        response = StreamingHttpResponse(content(initiative_ids, request.user), content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename=initiative_dossier_{timezone.now().strftime("%Y_%m_%d")}.{extension}'
+        )
+        return response
+
+    def export_dossier_json(self, request, queryset):
+        """Stream the full dossier of the selected initiatives as one JSON document"""
+        return self._dossier_response(request, queryset, iter_dossier_json, 'application/json', 'json')
+
+    export_dossier_json.short_description = "Export dossier of selected initiatives (JSON)"
+
+    def export_dossier_zip(self, request, queryset):
+        """Stream the full dossier of the selected initiatives as a zip of CSV files"""
+        return self._dossier_response(request, queryset, iter_dossier_zip, 'application/zip', 'zip')
+
+    export_dossier_zip.short_description = "Export dossier of selected initiatives (zipped CSV)"
+
+    def generate_progress_report(self, request, queryset):
+        """Download a task, milestone and KPI progress summary as CSV"""
+        today = timezone.now().date()
+        initiative_ids = list(queryset.prefetch_related(None).values_list('id', flat=True))
+
+        task_stats = {
+            row['initiative']: row
+            for row in Task.objects.filter(initiative__in=initiative_ids).order_by().values('initiative').annotate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(status='COMPLETED')),
+                overdue=Count('id', filter=Q(due_date__lt=today) & ~Q(status='COMPLETED')),
+                avg_progress=Avg('progress'),
+            )
+        }
+        milestone_stats = {
+            row['initiative']: row
+            for row in Milestone.objects.filter(initiative__in=initiative_ids).order_by().values('initiative').annotate(
+                total=Count('id'),
+                completed=Count('id', filter=Q(status='COMPLETED')),
+            )
+        }
+        kpi_stats = {
+            row['initiative']: row
+            for row in KPI.objects.filter(initiative__in=initiative_ids).order_by().values('initiative').annotate(
+                total=Count('id'),
+                achieved=Count('id', filter=Q(achieved=True)),
+            )
+        }
+
         response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename={meta.verbose_name_plural}.csv'
-        
+        response['Content-Disposition'] = (
+            f'attachment; filename=initiative_progress_{today.strftime("%Y_%m_%d")}.csv'
+        )
         writer = csv.writer(response)
-        writer.writerow(field_names)
-        for obj in queryset:
-            writer.writerow([getattr(obj, field) for field in field_names])
-        
+        writer.writerow([
+            'Initiative', 'Status', 'Start Date', 'End Date',
+            'Tasks', 'Completed Tasks', 'Overdue Tasks', 'Average Task Progress',
+            'Milestones', 'Completed Milestones', 'KPIs', 'KPIs Achieved',
+            'Budget', 'Actual Spend'
+        ])
+        empty = {}
+        for initiative in queryset.prefetch_related(None).select_related(None).order_by('name').values(
+            'id', 'name', 'status', 'start_date', 'end_date', 'budget', 'actual_spend'
+        ):
+            tasks = task_stats.get(initiative['id'], empty)
+            milestones = milestone_stats.get(initiative['id'], empty)
+            kpis = kpi_stats.get(initiative['id'], empty)
+            writer.writerow([
+                initiative['name'],
+                initiative['status'],
+                initiative['start_date'],
+                initiative['end_date'],
+                tasks.get('total', 0),
+                tasks.get('completed', 0),
+                tasks.get('overdue', 0),
+                f"{tasks.get('avg_progress') or 0:.1f}",
+                milestones.get('total', 0),
+                milestones.get('completed', 0),
+                kpis.get('total', 0),
+                kpis.get('achieved', 0),
+                initiative['budget'],
+                initiative['actual_spend'],
+            ])
+
         return response
-    
-    export_as_csv.short_description = "Export selected initiatives as CSV"
+
+    generate_progress_report.short_description = "Download progress report for selected initiatives"
 
 @admin.register(BrainstormingSession)
 class BrainstormingSessionAdmin(admin.ModelAdmin):
@@ -581,7 +770,10 @@ class TaskAdmin(admin.ModelAdmin):
         'priority', 
         'status', 
         'progress_bar',  # Changed from progress_display
-        'due_date'
+        'due_date',
+        'days_until_due_display',
+        'blocked_display',
+        'open_predecessors_display'
     )
     
     list_filter = (
@@ -604,7 +796,10 @@ class TaskAdmin(admin.ModelAdmin):
         'progress_bar'
     )
     
+    form = TaskAdminForm
     autocomplete_fields = ['milestone', 'assigned_to', 'dependencies']
+    actions = ['bulk_status_update']
+    action_form = TaskStatusActionForm
 
     fieldsets = (
         ('Basic Information', {
@@ -690,7 +885,29 @@ class TaskAdmin(admin.ModelAdmin):
             'milestone',
             'assigned_to',
             'assigned_to__user'
-        )
+        ).with_schedule_state()
+
+    def days_until_due_display(self, obj):
+        days = obj.due_in.days
+        if obj.delayed:
+            return format_html('<span style="color: #dc3545;">{} days overdue</span>', -days)
+        return f"{days} days"
+
+    days_until_due_display.short_description = 'Due In'
+    days_until_due_display.admin_order_field = 'due_in'
+
+    def blocked_display(self, obj):
+        return obj.blocked
+
+    blocked_display.short_description = 'Blocked'
+    blocked_display.boolean = True
+    blocked_display.admin_order_field = 'blocked'
+
+    def open_predecessors_display(self, obj):
+        return obj.open_predecessors
+
+    open_predecessors_display.short_description = 'Open Dependencies'
+    open_predecessors_display.admin_order_field = 'open_predecessors'
 
     def save_model(self, request, obj, form, change):
         """Custom save logic"""
@@ -703,6 +920,24 @@ class TaskAdmin(admin.ModelAdmin):
             obj.status = 'IN_PROGRESS'
         super().save_model(request, obj, form, change)
 
+    def bulk_status_update(self, request, queryset):
+        """Move selected tasks to the status chosen in the action bar"""
+        status = request.POST.get('status')
+        labels = dict(Task.STATUS_CHOICES)
+        if status not in labels:
+            self.message_user(request, "Choose a new status before running this action.", messages.ERROR)
+            return None
+
+        updated = queryset.transition_status(status)
+        self.message_user(
+            request,
+            f"{updated} task(s) updated to {labels[status]}. "
+            f"Tasks at 100% progress always stay Completed.",
+            messages.SUCCESS
+        )
+
+    bulk_status_update.short_description = "Update status of selected tasks"
+
     class Media:
         css = {
             'all': ('admin/css/forms.css',)
@@ -712,12 +947,18 @@ class TaskAdmin(admin.ModelAdmin):
 class EventAdmin(admin.ModelAdmin):
     list_display = (
         'name', 'initiative', 'event_type', 'start_date',
-        'status', 'participant_count', 'budget_status'
+        'status', 'participant_count', 'budget_status', 'feedback_display'
     )
     list_filter = ('event_type', 'status', 'start_date')
     search_fields = ('name', 'description', 'initiative__name')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('created_at', 'updated_at', 'feedback_display')
     filter_horizontal = ('speakers', 'volunteers')
+    list_select_related = ('initiative', 'feedback_statistics')
+
+    def feedback_display(self, obj):
+        return feedback_summary(getattr(obj, 'feedback_statistics', None))
+
+    feedback_display.short_description = 'Feedback'
 
     def participant_count(self, obj):
         try:
@@ -796,11 +1037,11 @@ class KPIAdmin(admin.ModelAdmin):
     list_display = (
         'name', 'initiative', 'target_value',
         'current_value', 'progress_display',
-        'achieved', 'target_date'
+        'achieved', 'target_date', 'forecast_display'
     )
-    list_filter = ('achieved', 'measurement_frequency', 'target_date')
+    list_filter = ('achieved', 'on_track', 'measurement_frequency', 'target_date')
     search_fields = ('name', 'description', 'initiative__name')
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('projected_attainment_date', 'on_track', 'created_at', 'updated_at')
 
     def progress_display(self, obj):
         try:
@@ -818,6 +1059,12 @@ class KPIAdmin(admin.ModelAdmin):
     
     progress_display.short_description = 'Progress'
 
+    def forecast_display(self, obj):
+        return forecast_badge(obj.projected_attainment_date, obj.on_track)
+
+    forecast_display.short_description = 'Projected Attainment'
+    forecast_display.admin_order_field = 'projected_attainment_date'
+
 @admin.register(Milestone)
 class MilestoneAdmin(admin.ModelAdmin):
     list_display = (
@@ -825,9 +1072,11 @@ class MilestoneAdmin(admin.ModelAdmin):
         'initiative',
         'responsible_person', 
         'target_date',
+        'projected_completion_date',
         'status', 
         'progress_display',
         'delay_status',
+        'slip_display',
         'get_tasks_count'  # Changed from tasks_count to get_tasks_count
     )
     list_filter = (
@@ -843,11 +1092,49 @@ class MilestoneAdmin(admin.ModelAdmin):
     readonly_fields = (
         'created_at', 
         'updated_at', 
+        'projected_completion_date',
+        'slip_impact',
         'tasks_summary',
         'get_tasks_count'  # Added to readonly_fields
     )
     inlines = [TaskInline]
 
+    def get_readonly_fields(self, request, obj=None):
+        # Progress is rolled up from tasks once the milestone has any
+        if obj is not None and obj.has_task_rollup():
+            return self.readonly_fields + ('progress',)
+        return self.readonly_fields
+
+    def slip_display(self, obj):
+        """Days the projection runs past target, including slips inherited from dependencies"""
+        days = obj.slip_days()
+        if not days:
+            return mark_safe('<span style="color: green;">On track</span>')
+        return format_html('<span style="color: red;">+{} days</span>', days)
+    slip_display.short_description = 'Projected Slip'
+
+    def slip_impact(self, obj):
+        """Slipping milestones downstream of this one and the open tasks under them"""
+        if not obj.pk:
+            return "-"
+        impact = impact_of(obj.pk)
+        if not impact['milestones']:
+            return mark_safe('<span style="color: green;">Nothing downstream is slipping</span>')
+        titles = dict(Milestone.objects.filter(pk__in=impact['milestones']).values_list('pk', 'title'))
+        rows = sorted(impact['milestones'].items(), key=lambda item: (-item[1]['slip_days'], item[0]))
+        return format_html(
+            '<ul style="margin: 0;">{}</ul><div>{} open task(s) affected</div>',
+            format_html_join(
+                '', '<li>{} &ndash; projected {} (<span style="color: red;">+{} days</span>)</li>',
+                (
+                    (titles.get(pk, pk), slip['projected_completion_date'], slip['slip_days'])
+                    for pk, slip in rows
+                )
+            ),
+            len(impact['tasks'])
+        )
+    slip_impact.short_description = 'Slip Impact'
+
     def get_tasks_count(self, obj):
         """Display count of total and completed tasks"""
         if not obj.pk:
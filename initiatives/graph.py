@@ -0,0 +1,236 @@
+"""
+In-memory task dependency graph for one initiative.
+
+The graph is loaded with two queries (tasks, then dependency edges joined to
+their predecessor's dates) into integer-indexed adjacency lists, so
+topological sorting and critical path scheduling run in O(tasks + edges)
+without touching the database again.
+
+Scheduling follows the critical path method on whole days. A task's
+duration is due_date - start_date. It can start no earlier than its own
+start_date, nor before every predecessor has finished. Latest dates are
+computed backwards from the finish of the whole initiative. Slack is
+latest_start - earliest_start, and tasks with zero slack are critical.
+"""
+from collections import deque, namedtuple
+import datetime
+
+from django.core.exceptions import ValidationError
+
+TaskSchedule = namedtuple(
+    'TaskSchedule',
+    ['earliest_start', 'earliest_finish', 'latest_start', 'latest_finish', 'slack', 'critical']
+)
+
+
+class DependencyCycleError(ValidationError):
+    def __init__(self, cycle):
+        self.cycle = cycle
+        super().__init__(
+            'Task dependencies form a cycle: %s' % ' -> '.join(str(pk) for pk in cycle)
+        )
+
+
+class TaskGraph:
+    def __init__(self, tasks, edges):
+        """
+        tasks: iterable of (id, start_date, due_date, status)
+        edges: iterable of (predecessor_id, successor_id)
+        """
+        self.ids = []
+        self.index = {}
+        self.start = []
+        self.duration = []
+        self.status = []
+        for pk, start_date, due_date, status in tasks:
+            self._add(pk, start_date, due_date, status)
+
+        self.successors = [[] for _ in self.ids]
+        self.predecessors = [[] for _ in self.ids]
+        for predecessor, successor in edges:
+            if predecessor in self.index and successor in self.index:
+                p, s = self.index[predecessor], self.index[successor]
+                self.successors[p].append(s)
+                self.predecessors[s].append(p)
+
+        self._order = None
+        self._schedule = None
+
+    def _add(self, pk, start_date, due_date, status):
+        if pk in self.index:
+            return
+        self.index[pk] = len(self.ids)
+        self.ids.append(pk)
+        self.start.append(start_date.toordinal())
+        self.duration.append(max((due_date - start_date).days, 0))
+        self.status.append(status)
+
+    @classmethod
+    def for_initiative(cls, initiative):
+        from .models import Task
+
+        initiative_id = getattr(initiative, 'pk', initiative)
+        tasks = list(
+            Task.objects.filter(initiative_id=initiative_id).order_by().values_list(
+                'id', 'start_date', 'due_date', 'status'
+            )
+        )
+        # Predecessors may live in another initiative; their dates and status
+        # come from the join so they still constrain the schedule
+        Through = Task.dependencies.through
+        edges = []
+        for predecessor, successor, start_date, due_date, status in Through.objects.filter(
+            from_task__initiative_id=initiative_id
+        ).values_list('to_task_id', 'from_task_id', 'to_task__start_date', 'to_task__due_date', 'to_task__status'):
+            tasks.append((predecessor, start_date, due_date, status))
+            edges.append((predecessor, successor))
+        return cls(tasks, edges)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _topological_indexes(self):
+        if self._order is None:
+            indegree = [len(p) for p in self.predecessors]
+            queue = deque(i for i, d in enumerate(indegree) if d == 0)
+            order = []
+            while queue:
+                node = queue.popleft()
+                order.append(node)
+                for successor in self.successors[node]:
+                    indegree[successor] -= 1
+                    if indegree[successor] == 0:
+                        queue.append(successor)
+            if len(order) != len(self.ids):
+                raise DependencyCycleError(self._find_cycle(indegree))
+            self._order = order
+        return self._order
+
+    def _find_cycle(self, indegree):
+        # Every node left with a positive in-degree is on or behind a cycle;
+        # walking predecessors inside that set must eventually repeat a node
+        remaining = {i for i, d in enumerate(indegree) if d > 0}
+        node = next(iter(remaining))
+        seen = {}
+        path = []
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = next(p for p in self.predecessors[node] if p in remaining)
+        cycle = path[seen[node]:]
+        cycle.reverse()
+        return [self.ids[i] for i in cycle] + [self.ids[cycle[0]]]
+
+    def has_cycle(self):
+        try:
+            self._topological_indexes()
+        except DependencyCycleError:
+            return True
+        return False
+
+    def topological_order(self):
+        """Task ids with every task after all of its dependencies"""
+        return [self.ids[i] for i in self._topological_indexes()]
+
+    def _compute_schedule(self):
+        if self._schedule is not None:
+            return self._schedule
+        order = self._topological_indexes()
+        n = len(self.ids)
+        earliest_start = [0] * n
+        earliest_finish = [0] * n
+        for node in order:
+            es = self.start[node]
+            for p in self.predecessors[node]:
+                if earliest_finish[p] > es:
+                    es = earliest_finish[p]
+            earliest_start[node] = es
+            earliest_finish[node] = es + self.duration[node]
+
+        project_finish = max(earliest_finish, default=0)
+        latest_finish = [project_finish] * n
+        latest_start = [0] * n
+        for node in reversed(order):
+            lf = project_finish
+            for s in self.successors[node]:
+                if latest_start[s] < lf:
+                    lf = latest_start[s]
+            latest_finish[node] = lf
+            latest_start[node] = lf - self.duration[node]
+
+        self._schedule = (earliest_start, earliest_finish, latest_start, latest_finish)
+        return self._schedule
+
+    def schedule(self):
+        """Map each task id to its TaskSchedule (dates, slack in days)"""
+        es, ef, ls, lf = self._compute_schedule()
+        to_date = datetime.date.fromordinal
+        return {
+            pk: TaskSchedule(
+                to_date(es[i]), to_date(ef[i]), to_date(ls[i]), to_date(lf[i]),
+                ls[i] - es[i], ls[i] == es[i]
+            )
+            for i, pk in enumerate(self.ids)
+        }
+
+    def critical_path(self):
+        """Task ids of the longest dependency chain ending at the final finish"""
+        if not self.ids:
+            return []
+        es, ef, ls, lf = self._compute_schedule()
+        node = max(range(len(self.ids)), key=lambda i: (ef[i], ls[i] == es[i]))
+        path = [node]
+        while True:
+            driver = next(
+                (p for p in self.predecessors[node] if ef[p] == es[node] and ls[p] == es[p]),
+                None
+            )
+            if driver is None:
+                break
+            path.append(driver)
+            node = driver
+        path.reverse()
+        return [self.ids[i] for i in path]
+
+    def blocked(self):
+        """Ids of tasks with at least one dependency that is not completed"""
+        return {
+            self.ids[i] for i, predecessors in enumerate(self.predecessors)
+            if any(self.status[p] != 'COMPLETED' for p in predecessors)
+        }
+
+
+def find_dependency_cycle(task_id, dependency_ids):
+    """
+    Return the cycle (as a list of task ids) that making task_id depend on
+    dependency_ids would create, or None. Walks the dependencies of the new
+    predecessors one level per query.
+    """
+    from .models import Task
+
+    dependency_ids = set(dependency_ids)
+    if task_id in dependency_ids:
+        return [task_id, task_id]
+
+    Through = Task.dependencies.through
+    parent = {pk: None for pk in dependency_ids}
+    frontier = dependency_ids
+    while frontier:
+        next_frontier = set()
+        for successor, predecessor in Through.objects.filter(from_task_id__in=frontier).values_list(
+            'from_task_id', 'to_task_id'
+        ):
+            if predecessor in parent:
+                continue
+            parent[predecessor] = successor
+            if predecessor == task_id:
+                cycle = [task_id]
+                node = successor
+                while node is not None:
+                    cycle.append(node)
+                    node = parent[node]
+                cycle.append(task_id)
+                return cycle
+            next_frontier.add(predecessor)
+        frontier = next_frontier
+    return None
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from initiatives.models import Milestone
+from initiatives.slippage import propagate_from
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute projected completion dates for every milestone. Run daily so "
+        "overdue milestones keep moving with today's date between saves."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--initiative', type=int, help="Only milestones of this initiative")
+
+    def handle(self, *args, **options):
+        milestones = Milestone.objects.all()
+        if options['initiative']:
+            milestones = milestones.filter(initiative_id=options['initiative'])
+        changed = propagate_from(milestones.values_list('pk', flat=True))
+        self.stdout.write(f"Updated projections for {len(changed)} milestones")
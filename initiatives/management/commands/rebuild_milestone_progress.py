@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from initiatives.models import Milestone
+from initiatives.rollups import refresh_milestones
+
+
+class Command(BaseCommand):
+    help = "Recompute milestone progress and status from their tasks, for backfills or after raw SQL edits."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--initiative', type=int, help="Only milestones of this initiative")
+
+    def handle(self, *args, **options):
+        milestone_ids = None
+        if options['initiative']:
+            milestone_ids = Milestone.objects.filter(initiative_id=options['initiative']).values_list('pk', flat=True)
+        refreshed = refresh_milestones(milestone_ids)
+        self.stdout.write(f"Rebuilt progress for {refreshed} milestones")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from initiatives.spending import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare each initiative's actual spend with its budget line items and financial records, "
+        "and with --fix write the sums back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--initiative', type=int, action='append', help="Only this initiative (repeatable)")
+        parser.add_argument('--fix', action='store_true', help="Write the summed values back")
+
+    def handle(self, *args, **options):
+        drift = reconcile(options['initiative'], fix=options['fix'])
+        for pk, name, stored, expected in drift:
+            self.stdout.write(f"{name} (#{pk}): stored {stored}, records add up to {expected}")
+        if not drift:
+            self.stdout.write("Actual spend matches the records for every initiative")
+        elif options['fix']:
+            self.stdout.write(self.style.SUCCESS(f"Fixed actual spend of {len(drift)} initiatives"))
+        else:
+            self.stdout.write(self.style.WARNING(f"{len(drift)} initiatives drifted; rerun with --fix to correct them"))
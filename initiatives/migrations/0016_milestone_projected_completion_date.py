@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('initiatives', '0015_initiative_volunteer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='milestone',
+            name='projected_completion_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('initiatives', '0016_milestone_projected_completion_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='milestone',
+            name='task_progress_weighted',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='milestone',
+            name='task_weight_total',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
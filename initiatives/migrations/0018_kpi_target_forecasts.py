@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('initiatives', '0017_milestone_task_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kpi',
+            name='on_track',
+            field=models.BooleanField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='kpi',
+            name='projected_attainment_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:13
+
+import django.core.validators
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('initiatives', '0018_kpi_target_forecasts'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='initiative',
+            name='actual_spend',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), editable=False, max_digits=10, validators=[django.core.validators.MinValueValidator(Decimal('0.00'))]),
+        ),
+    ]
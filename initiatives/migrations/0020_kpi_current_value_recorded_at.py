@@ -0,0 +1,25 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:07
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_recorded_at(apps, schema_editor):
+    # The best guess available for existing rows
+    apps.get_model('initiatives', 'KPI').objects.update(current_value_recorded_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('initiatives', '0019_actual_spend_maintained'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kpi',
+            name='current_value_recorded_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_recorded_at, migrations.RunPython.noop),
+    ]
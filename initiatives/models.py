@@ -1,12 +1,17 @@
 # initiatives/models.py
 from django.db import models
+from django.db.models import Case, When, Value, F, Q, Count, OuterRef, Subquery, ExpressionWrapper
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.timezone import now
 from django.core.validators import MinValueValidator, MaxValueValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
 from decimal import Decimal
+from collections import defaultdict, namedtuple
 from users.models import Member, Department, StudentVolunteer
 import datetime
 from utils.fields import CustomRichTextField
+from utils.queries import chunked_update
 from . import models as initiative_models
 
 
@@ -19,6 +24,16 @@ def validate_file_size(value):
     if filesize > 10 * 1024 * 1024:  # 10MB limit
         raise ValidationError("Maximum file size is 10MB")
 
+class InitiativeQuerySet(models.QuerySet):
+    def transition_status(self, status, chunk_size=1000):
+        """Set status on every initiative in the queryset with chunked UPDATEs"""
+        return chunked_update(
+            self,
+            {'status': status, 'last_updated': timezone.now()},
+            chunk_size
+        )
+
+
 class Initiative(models.Model):
     STATUS_CHOICES = [
         ('PLANNED', 'Planned'),
@@ -57,10 +72,12 @@ class Initiative(models.Model):
         decimal_places=2,
         validators=[MinValueValidator(Decimal('0.00'))]
     )
+    # Sum of budget line items and financial records, kept by initiatives.spending
     actual_spend = models.DecimalField(
         max_digits=10,
         decimal_places=2,
         default=Decimal('0.00'),
+        editable=False,
         validators=[MinValueValidator(Decimal('0.00'))]
     )
     stakeholders = models.ManyToManyField('Stakeholder', related_name='initiatives',blank=True)
@@ -81,6 +98,9 @@ class Initiative(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     
     volunteer = models.ManyToManyField("users.StudentVolunteer", related_name='initiatives')
+
+    objects = InitiativeQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -93,8 +113,16 @@ class Initiative(models.Model):
         if self.start_date and self.end_date:
             if self.end_date <= self.start_date:
                 raise ValidationError('End date must be after start date')
-        if self.actual_spend > self.budget:
-            raise ValidationError('Actual spend cannot exceed budget')
+
+    def save(self, *args, **kwargs):
+        # actual_spend is only ever changed with F() updates; writing back the
+        # value this instance was loaded with would undo concurrent ones
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != 'actual_spend'
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} ({self.get_status_display()})"
@@ -224,6 +252,149 @@ class CommunityMapping(models.Model):
     def __str__(self):
         return f"Community Mapping - {self.area_name}"
 
+class TaskQuerySet(models.QuerySet):
+    def transition_status(self, status, chunk_size=1000):
+        """
+        Bulk-apply a status change without loading Task instances.
+
+        Follows the same rules as Task.save and Task.clean: a task at 100%
+        progress is always COMPLETED with a completion date, and only
+        completed tasks keep a completion date.
+        """
+        today = timezone.now().date()
+        if status == 'COMPLETED':
+            changes = {
+                'status': 'COMPLETED',
+                'progress': 100,
+                'completion_date': Coalesce(F('completion_date'), Value(today)),
+            }
+        else:
+            changes = {
+                'status': Case(
+                    When(progress=100, then=Value('COMPLETED')),
+                    default=Value(status),
+                    output_field=models.CharField()
+                ),
+                'completion_date': Case(
+                    When(progress=100, then=Coalesce(F('completion_date'), Value(today))),
+                    default=Value(None),
+                    output_field=models.DateField()
+                ),
+            }
+        changes['updated_at'] = timezone.now()
+        if status != 'COMPLETED':
+            return chunked_update(self, changes, chunk_size)
+
+        # Completing tasks moves their progress to 100, so the milestone
+        # rollups they feed are refreshed afterwards
+        from .rollups import refresh_milestones
+        milestone_ids = set(
+            self.filter(milestone__isnull=False).order_by().values_list('milestone_id', flat=True).distinct()
+        )
+        updated = chunked_update(self, changes, chunk_size)
+        refresh_milestones(milestone_ids)
+        return updated
+
+    def apply_progress(self, mapping, chunk_size=500):
+        """
+        Set progress for many tasks at once from a {task_id: progress} mapping.
+
+        Status and completion_date are derived in the same UPDATE, using the
+        Task.save rules: 100% is COMPLETED (keeping an existing completion
+        date), anything above 0 is IN_PROGRESS, and a completed task reset to
+        0 goes back to TODO. Rows whose progress is unchanged are skipped.
+
+        Returns a ProgressChanges tuple with the number of updated tasks and
+        the milestone and initiative ids they belong to, so callers can
+        refresh rollups for just those.
+        """
+        today = timezone.now().date()
+        mapping = {int(pk): min(100, max(0, int(value))) for pk, value in mapping.items()}
+        pks = list(mapping)
+        updated = 0
+        milestone_ids = set()
+        initiative_ids = set()
+
+        for start in range(0, len(pks), chunk_size):
+            chunk = pks[start:start + chunk_size]
+            current = self.filter(pk__in=chunk).order_by().values_list(
+                'pk', 'progress', 'milestone_id', 'initiative_id'
+            )
+            by_progress = defaultdict(list)
+            for pk, progress, milestone_id, initiative_id in current:
+                if mapping[pk] == progress:
+                    continue
+                by_progress[mapping[pk]].append(pk)
+                if milestone_id:
+                    milestone_ids.add(milestone_id)
+                initiative_ids.add(initiative_id)
+
+            if not by_progress:
+                continue
+
+            changed = [pk for pks_at_value in by_progress.values() for pk in pks_at_value]
+            completed = by_progress.get(100, [])
+            reset = by_progress.get(0, [])
+            updated += Task._base_manager.filter(pk__in=changed).update(
+                progress=Case(
+                    *[When(pk__in=ids, then=Value(value)) for value, ids in by_progress.items()],
+                    output_field=models.PositiveIntegerField()
+                ),
+                status=Case(
+                    When(pk__in=completed, then=Value('COMPLETED')),
+                    When(pk__in=reset, status='COMPLETED', then=Value('TODO')),
+                    When(pk__in=reset, then=F('status')),
+                    default=Value('IN_PROGRESS'),
+                    output_field=models.CharField()
+                ),
+                completion_date=Case(
+                    When(pk__in=completed, then=Coalesce(F('completion_date'), Value(today))),
+                    default=Value(None),
+                    output_field=models.DateField()
+                ),
+                updated_at=timezone.now()
+            )
+
+        if milestone_ids:
+            from .rollups import refresh_milestones
+            refresh_milestones(milestone_ids)
+        return ProgressChanges(updated, milestone_ids, initiative_ids)
+
+    def with_schedule_state(self):
+        """
+        Annotate each task with what can_start(), is_delayed() and
+        days_until_due() compute per row, in the same single query:
+
+        open_predecessors: dependencies that are not completed yet
+        blocked: open_predecessors > 0
+        delayed: not completed and past its due date
+        due_in: due_date - today as a timedelta (zero once completed)
+        """
+        today = timezone.now().date()
+        open_predecessors = self.model.dependencies.through.objects.filter(
+            from_task=OuterRef('pk')
+        ).exclude(to_task__status='COMPLETED').order_by().values('from_task').annotate(
+            count=Count('*')
+        ).values('count')
+        return self.annotate(
+            open_predecessors=Coalesce(Subquery(open_predecessors), Value(0)),
+        ).annotate(
+            blocked=ExpressionWrapper(Q(open_predecessors__gt=0), output_field=models.BooleanField()),
+            delayed=ExpressionWrapper(
+                ~Q(status='COMPLETED') & Q(due_date__lt=today),
+                output_field=models.BooleanField()
+            ),
+            due_in=Case(
+                When(status='COMPLETED', then=Value(datetime.timedelta(0))),
+                default=ExpressionWrapper(F('due_date') - Value(today), output_field=models.DurationField()),
+                output_field=models.DurationField()
+            ),
+        )
+
+
+ProgressChanges = namedtuple('ProgressChanges', ['updated', 'milestone_ids', 'initiative_ids'])
+
+
 class Task(models.Model):
     PRIORITY_CHOICES = [
         ('LOW', 'Low'),
@@ -318,6 +489,8 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['due_date', 'priority']
         indexes = [
@@ -331,6 +504,10 @@ class Task(models.Model):
     def __str__(self):
         return f"{self.title} - {self.initiative.name}"
 
+    def rollup_contribution(self):
+        from .rollups import task_contribution
+        return task_contribution(self.milestone_id, self.start_date, self.due_date, self.progress)
+
     def clean(self):
         errors = {}
         
@@ -398,7 +575,7 @@ class Task(models.Model):
     def update_progress(self, new_progress):
         """Update progress ensuring proper status changes"""
         self.progress = min(100, max(0, new_progress))
-        self.save()
+        self.save(update_fields=['progress', 'status', 'completion_date', 'updated_at'])
 
 class Stakeholder(models.Model):
     STAKEHOLDER_TYPES = [
@@ -623,6 +800,11 @@ class KPI(models.Model):
     baseline_value = models.FloatField(null=True,blank=True,validators=[MinValueValidator(0.0)])
     target_date = models.DateField()
     achieved = models.BooleanField(default=False)
+    # When current_value last changed, the trend's latest observation
+    current_value_recorded_at = models.DateTimeField(null=True , blank=True , editable=False)
+    # Trend forecast written by monitoring.forecasting
+    projected_attainment_date = models.DateField(null=True , blank=True , editable=False)
+    on_track = models.BooleanField(null=True , blank=True , editable=False)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -646,6 +828,21 @@ class KPI(models.Model):
 
     def save(self , *args , **kwargs):
         self.achieved = self.current_value >= self.target_value
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding or not self.pk:
+            self.current_value_recorded_at = timezone.now()
+        elif (update_fields is None or 'current_value' in update_fields) and KPI.objects.filter(
+            pk=self.pk
+        ).exclude(current_value=self.current_value).exists():
+            self.current_value_recorded_at = timezone.now()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields , 'current_value_recorded_at'}
+        # The forecast is only written by the nightly job
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('projected_attainment_date' , 'on_track')
+            ]
         super().save(*args , **kwargs)
 
 
@@ -655,6 +852,8 @@ class Milestone(models.Model):
     description = models.TextField(blank=True)
     target_date = models.DateField()
     actual_completion_date = models.DateField(null=True , blank=True)
+    # Maintained by initiatives.slippage from the milestones this one depends on
+    projected_completion_date = models.DateField(null=True , blank=True , editable=False)
     status = models.CharField(
         max_length=20 ,
         choices=[
@@ -672,6 +871,9 @@ class Milestone(models.Model):
         default=0 ,
         validators=[MinValueValidator(0) , MaxValueValidator(100)]
     )
+    # Running sums over milestone_tasks maintained by initiatives.rollups
+    task_weight_total = models.PositiveIntegerField(default=0 , editable=False)
+    task_progress_weighted = models.PositiveBigIntegerField(default=0 , editable=False)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -686,10 +888,29 @@ class Milestone(models.Model):
     def __str__(self):
         return f"{self.title} - {self.initiative.name}"
 
+    def save(self , *args , **kwargs):
+        # The rollup sums are only ever changed with F() updates; writing back
+        # the values this instance was loaded with would undo concurrent ones
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in ('task_weight_total' , 'task_progress_weighted')
+            ]
+        super().save(*args , **kwargs)
+
+    def has_task_rollup(self):
+        return self.task_weight_total > 0
+
     def is_delayed(self):
         return (not self.actual_completion_date and
                 self.target_date < datetime.date.today())
 
+    def slip_days(self):
+        """Days the projected completion runs past the target date"""
+        if not self.projected_completion_date:
+            return 0
+        return max((self.projected_completion_date - self.target_date).days , 0)
+
 
 class Budget(models.Model):
     BUDGET_TYPES = [
@@ -742,6 +963,10 @@ class Budget(models.Model):
     def __str__(self):
         return f"{self.item_name} - {self.initiative.name}"
 
+    def spend_contribution(self):
+        from .spending import spend_contribution
+        return spend_contribution(self.initiative_id , self.actual_amount)
+
     def variance_amount(self):
         return self.actual_amount - self.estimated_amount
 
@@ -0,0 +1,136 @@
+"""
+Milestone progress rolled up from task progress.
+
+Each task contributes its duration in days (due_date - start_date + 1) as
+weight, so a three-month task counts for more than a one-day task. A
+milestone stores the running sums task_weight_total and
+task_progress_weighted (sum of weight * progress). progress is then
+task_progress_weighted // task_weight_total.
+
+Saving or deleting a single task applies the difference between its
+stored and new contribution with F() expressions, so a milestone with
+thousands of tasks is never re-aggregated on a task save. The stored
+contribution is read from the row just before the write, locked within
+the transaction, rather than taken from when the task was loaded. Bulk
+paths that bypass signals call refresh_milestones() for the milestones
+they touched, and the rebuild_milestone_progress command recomputes
+everything from scratch.
+"""
+from collections import defaultdict
+
+from django.db import models
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+ROLLUP_FIELDS = ('task_weight_total', 'task_progress_weighted')
+
+
+def task_weight(start_date, due_date):
+    if not start_date or not due_date:
+        return 1
+    return max((due_date - start_date).days, 0) + 1
+
+
+def task_contribution(milestone_id, start_date, due_date, progress):
+    """(milestone_id, weight, weighted progress) for one task, or None"""
+    if not milestone_id:
+        return None
+    weight = task_weight(start_date, due_date)
+    return milestone_id, weight, weight * (progress or 0)
+
+
+def _derive_progress_and_status(milestone_ids):
+    """Recompute progress and status from the stored sums in one UPDATE"""
+    from .models import Milestone
+
+    total = F('task_weight_total')
+    weighted = F('task_progress_weighted')
+    Milestone.objects.filter(pk__in=milestone_ids).update(
+        progress=Case(
+            When(task_weight_total__gt=0, then=weighted / total),
+            default=F('progress'),
+            output_field=models.IntegerField()
+        ),
+        # Milestones without tasks keep whatever status was set by hand, and
+        # a milestone flagged DELAYED stays so until it is complete
+        status=Case(
+            When(task_weight_total=0, then=F('status')),
+            When(task_progress_weighted=total * 100, then=Value('COMPLETED')),
+            When(status='DELAYED', then=F('status')),
+            When(task_progress_weighted=0, then=Value('PENDING')),
+            default=Value('IN_PROGRESS'),
+            output_field=models.CharField()
+        ),
+        updated_at=timezone.now()
+    )
+
+
+def apply_task_delta(old, new):
+    """
+    Move a task's contribution from old to new, both as returned by
+    task_contribution(). Issues one UPDATE per affected milestone plus one
+    to derive progress and status.
+    """
+    from .models import Milestone
+
+    if old == new:
+        return
+    deltas = defaultdict(lambda: [0, 0])
+    if old:
+        deltas[old[0]][0] -= old[1]
+        deltas[old[0]][1] -= old[2]
+    if new:
+        deltas[new[0]][0] += new[1]
+        deltas[new[0]][1] += new[2]
+
+    changed = []
+    for milestone_id, (weight, weighted) in deltas.items():
+        if weight or weighted:
+            Milestone.objects.filter(pk=milestone_id).update(
+                task_weight_total=F('task_weight_total') + weight,
+                task_progress_weighted=F('task_progress_weighted') + weighted
+            )
+            changed.append(milestone_id)
+    if changed:
+        _derive_progress_and_status(changed)
+
+
+def refresh_milestones(milestone_ids=None, chunk_size=2000):
+    """
+    Recompute the sums from tasks for the given milestones, or for every
+    milestone when milestone_ids is None. Returns the number of milestones
+    refreshed.
+    """
+    from .models import Milestone, Task
+
+    milestones = Milestone.objects.all()
+    tasks = Task.objects.filter(milestone__isnull=False)
+    if milestone_ids is not None:
+        milestone_ids = set(milestone_ids)
+        if not milestone_ids:
+            return 0
+        milestones = milestones.filter(pk__in=milestone_ids)
+        tasks = tasks.filter(milestone_id__in=milestone_ids)
+
+    sums = defaultdict(lambda: [0, 0])
+    for milestone_id, start_date, due_date, progress in tasks.order_by().values_list(
+        'milestone_id', 'start_date', 'due_date', 'progress'
+    ).iterator(chunk_size=chunk_size):
+        _, weight, weighted = task_contribution(milestone_id, start_date, due_date, progress)
+        sums[milestone_id][0] += weight
+        sums[milestone_id][1] += weighted
+
+    changed = []
+    ids = []
+    for pk, weight_total, weighted_total in milestones.order_by().values_list('pk', *ROLLUP_FIELDS).iterator(
+        chunk_size=chunk_size
+    ):
+        ids.append(pk)
+        weight, weighted = sums.get(pk, (0, 0))
+        if (weight, weighted) != (weight_total, weighted_total):
+            changed.append(Milestone(pk=pk, task_weight_total=weight, task_progress_weighted=weighted))
+
+    Milestone.objects.bulk_update(changed, ROLLUP_FIELDS, batch_size=500)
+    for start in range(0, len(ids), chunk_size):
+        _derive_progress_and_status(ids[start:start + chunk_size])
+    return len(ids)
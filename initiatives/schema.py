@@ -62,6 +62,11 @@ class BrainstormingSessionType(DjangoObjectType):
 
 
 class TaskType(DjangoObjectType):
+    open_predecessors = graphene.Int()
+    blocked = graphene.Boolean()
+    delayed = graphene.Boolean()
+    days_until_due = graphene.Int()
+
     class Meta:
         model = Task
         filter_fields = {
@@ -73,6 +78,33 @@ class TaskType(DjangoObjectType):
         }
         interfaces = (graphene.relay.Node ,)
 
+    @classmethod
+    def get_queryset(cls , queryset , info):
+        return queryset.with_schedule_state()
+
+    # Tasks reached through other types are not annotated, so fall back to
+    # the per-row model methods for those
+
+    def resolve_open_predecessors(self , info):
+        if hasattr(self , 'open_predecessors'):
+            return self.open_predecessors
+        return self.dependencies.exclude(status='COMPLETED').count()
+
+    def resolve_blocked(self , info):
+        if hasattr(self , 'blocked'):
+            return self.blocked
+        return not self.can_start()
+
+    def resolve_delayed(self , info):
+        if hasattr(self , 'delayed'):
+            return self.delayed
+        return self.is_delayed()
+
+    def resolve_days_until_due(self , info):
+        if hasattr(self , 'due_in'):
+            return self.due_in.days
+        return self.days_until_due()
+
 
 class RiskType(DjangoObjectType):
     class Meta:
@@ -91,6 +123,7 @@ class KPIType(DjangoObjectType):
         model = KPI
         filter_fields = {
             'achieved': ['exact'] ,
+            'on_track': ['exact'] ,
             'measurement_frequency': ['exact'] ,
             'initiative': ['exact'] ,
         }
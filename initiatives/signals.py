@@ -0,0 +1,139 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .graph import DependencyCycleError, find_dependency_cycle
+from .models import Milestone, Task
+from .rollups import apply_task_delta, task_contribution
+from .slippage import invalidate_impacts, propagate_from
+from .spending import SOURCES as SPEND_SOURCES, apply_spend_delta, spend_contribution
+
+
+@receiver(m2m_changed, sender=Task.dependencies.through)
+def prevent_dependency_cycles(sender, instance, action, reverse, pk_set, **kwargs):
+    """Reject dependency additions that would make tasks wait on themselves"""
+    if action != 'pre_add' or not pk_set:
+        return
+    if not reverse:
+        cycle = find_dependency_cycle(instance.pk, pk_set)
+        if cycle:
+            raise DependencyCycleError(cycle)
+    else:
+        # instance is becoming a dependency of every task in pk_set
+        for task_id in pk_set:
+            cycle = find_dependency_cycle(task_id, [instance.pk])
+            if cycle:
+                raise DependencyCycleError(cycle)
+
+
+@receiver(post_save, sender=Milestone)
+def propagate_milestone_slip(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields and set(update_fields) <= {'projected_completion_date', 'updated_at'}:
+        return
+    pk = instance.pk
+    # The admin saves dependencies after the milestone itself, so wait for the
+    # whole change to commit before walking the graph
+    transaction.on_commit(lambda: propagate_from({pk}))
+
+
+@receiver(pre_delete, sender=Milestone)
+def load_milestone_dependents(sender, instance, **kwargs):
+    # The dependency rows are gone by post_delete
+    instance._dependents = set(instance.milestone_set.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Milestone)
+def propagate_milestone_delete(sender, instance, **kwargs):
+    dependents = getattr(instance, '_dependents', set())
+
+    def propagate():
+        # Cached impacts upstream of the deleted milestone may still list it
+        invalidate_impacts()
+        propagate_from(dependents)
+
+    transaction.on_commit(propagate)
+
+
+@receiver(m2m_changed, sender=Milestone.dependencies.through)
+def propagate_dependency_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance._cleared_dependents = set(instance.milestone_set.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        affected = {instance.pk}
+    elif action == 'post_clear':
+        affected = getattr(instance, '_cleared_dependents', set())
+    else:
+        affected = set(pk_set or ())
+    if affected:
+        transaction.on_commit(lambda: propagate_from(affected))
+
+
+def _stored_values(model, pk, fields):
+    """
+    Field values of the stored row, locked until the end of the transaction
+    when there is one. Deltas are taken against this rather than the values
+    the instance was loaded with, which another writer may have changed
+    since.
+    """
+    rows = model._base_manager.filter(pk=pk)
+    if transaction.get_connection().in_atomic_block:
+        rows = rows.select_for_update()
+    return rows.values_list(*fields).first()
+
+
+@receiver(pre_save, sender=Task)
+@receiver(pre_delete, sender=Task)
+def load_task_contribution(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance._state.adding or not instance.pk:
+        instance._rollup_contribution = None
+        return
+    current = _stored_values(Task, instance.pk, ('milestone_id', 'start_date', 'due_date', 'progress'))
+    instance._rollup_contribution = task_contribution(*current) if current else None
+
+
+@receiver(post_save, sender=Task)
+def roll_up_task_progress(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    apply_task_delta(getattr(instance, '_rollup_contribution', None), instance.rollup_contribution())
+
+
+@receiver(post_delete, sender=Task)
+def remove_task_progress(sender, instance, **kwargs):
+    apply_task_delta(getattr(instance, '_rollup_contribution', None), None)
+
+
+def load_spend_contribution(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance._state.adding or not instance.pk:
+        instance._spend_contribution = None
+        return
+    current = _stored_values(sender, instance.pk, ('initiative_id', 'actual_amount'))
+    instance._spend_contribution = spend_contribution(*current) if current else None
+
+
+def update_actual_spend(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    apply_spend_delta(getattr(instance, '_spend_contribution', None), instance.spend_contribution())
+
+
+def remove_actual_spend(sender, instance, **kwargs):
+    apply_spend_delta(getattr(instance, '_spend_contribution', None), None)
+
+
+for label in SPEND_SOURCES:
+    model = apps.get_model(label)
+    pre_save.connect(load_spend_contribution, sender=model, dispatch_uid=f'spend-pre-save-{label}')
+    pre_delete.connect(load_spend_contribution, sender=model, dispatch_uid=f'spend-pre-delete-{label}')
+    post_save.connect(update_actual_spend, sender=model, dispatch_uid=f'spend-post-save-{label}')
+    post_delete.connect(remove_actual_spend, sender=model, dispatch_uid=f'spend-post-delete-{label}')
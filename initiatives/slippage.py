@@ -0,0 +1,161 @@
+"""
+Milestone slip propagation.
+
+A milestone cannot finish before the milestones it depends on, and keeps
+the planned gap after them: if an upstream milestone is projected to land
+ten days late, a downstream one planned a week after it moves out by the
+same ten days. An unfinished milestone whose target date has passed is
+projected no earlier than today.
+
+Projected dates are stored on Milestone.projected_completion_date. When a
+milestone changes only its downstream subgraph is reloaded and recomputed,
+and only rows whose projection moved are written, so this is cheap enough
+to run on every save. The set of slipping milestones downstream of a
+milestone is cached and invalidated whenever any projection moves.
+"""
+from collections import deque
+import datetime
+import logging
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from utils.cache import bump_cache_version, cache_version
+
+logger = logging.getLogger(__name__)
+
+IMPACT_CACHE_TIMEOUT = 60 * 60 * 24
+IMPACT_VERSION_KEY = 'milestone:impact-version'
+
+
+def invalidate_impacts():
+    # A projection change can alter the impact set of any upstream milestone,
+    # so every cached impact is dropped at once
+    bump_cache_version(IMPACT_VERSION_KEY)
+
+
+def _downstream(milestone_ids):
+    """Return ({id: [downstream ids]}, all ids reached) walking one level per query"""
+    from .models import Milestone
+
+    Through = Milestone.dependencies.through
+    successors = {}
+    reached = set(milestone_ids)
+    frontier = set(milestone_ids)
+    while frontier:
+        next_frontier = set()
+        for upstream, downstream in Through.objects.filter(to_milestone_id__in=frontier).values_list(
+            'to_milestone_id', 'from_milestone_id'
+        ):
+            successors.setdefault(upstream, []).append(downstream)
+            if downstream not in reached:
+                reached.add(downstream)
+                next_frontier.add(downstream)
+        frontier = next_frontier
+    return successors, reached
+
+
+def _projection(target_date, actual_completion_date, status, today):
+    if actual_completion_date:
+        return actual_completion_date
+    if status != 'COMPLETED' and target_date < today:
+        return today
+    return target_date
+
+
+def propagate_from(milestone_ids):
+    """
+    Recompute projections for the given milestones and everything downstream
+    of them. Returns the ids of milestones whose projection changed.
+    """
+    from .models import Milestone
+
+    milestone_ids = set(milestone_ids)
+    if not milestone_ids:
+        return set()
+    now = timezone.now()
+    today = now.date()
+    successors, subgraph = _downstream(milestone_ids)
+
+    rows = {
+        pk: row for pk, *row in Milestone.objects.filter(pk__in=subgraph).order_by().values_list(
+            'pk', 'target_date', 'actual_completion_date', 'status', 'projected_completion_date'
+        )
+    }
+    # Upstream milestones of the subgraph, including ones outside it whose
+    # stored projection is taken as given
+    Through = Milestone.dependencies.through
+    upstream = {}
+    outside = {}
+    for downstream, up, target_date, projected, actual, status in Through.objects.filter(
+        from_milestone_id__in=subgraph
+    ).values_list(
+        'from_milestone_id', 'to_milestone_id', 'to_milestone__target_date',
+        'to_milestone__projected_completion_date', 'to_milestone__actual_completion_date',
+        'to_milestone__status'
+    ):
+        upstream.setdefault(downstream, []).append(up)
+        if up not in subgraph:
+            outside[up] = (target_date, projected or _projection(target_date, actual, status, today))
+
+    indegree = {pk: sum(1 for up in upstream.get(pk, ()) if up in subgraph) for pk in rows}
+    queue = deque(pk for pk, degree in indegree.items() if degree == 0)
+    projected = {}
+    changed = []
+    while queue:
+        pk = queue.popleft()
+        target_date, actual, status, stored = rows[pk]
+        value = _projection(target_date, actual, status, today)
+        if not actual:
+            for up in upstream.get(pk, ()):
+                if up in projected:
+                    up_target, up_projected = rows[up][0], projected[up]
+                else:
+                    up_target, up_projected = outside[up]
+                value = max(value, up_projected + max(target_date - up_target, datetime.timedelta(0)))
+        projected[pk] = value
+        if value != stored:
+            changed.append(Milestone(pk=pk, projected_completion_date=value, updated_at=now))
+        for down in successors.get(pk, ()):
+            indegree[down] -= 1
+            if indegree[down] == 0:
+                queue.append(down)
+
+    if len(projected) != len(rows):
+        logger.warning(
+            'Milestone dependency cycle among %s, projections not updated for them',
+            sorted(set(rows) - set(projected))
+        )
+
+    if changed:
+        Milestone.objects.bulk_update(changed, ['projected_completion_date', 'updated_at'], batch_size=500)
+        invalidate_impacts()
+    return {m.pk for m in changed}
+
+
+def impact_of(milestone_id):
+    """
+    Milestones downstream of milestone_id (itself included) projected past
+    their target, as {id: {'projected_completion_date', 'slip_days'}}, and
+    the ids of open tasks under them. The milestone part is cached; tasks
+    are read fresh since their status changes far more often.
+    """
+    from .models import Milestone, Task
+
+    key = f'milestone:impact:{cache_version(IMPACT_VERSION_KEY)}:{milestone_id}'
+    slipping = cache.get(key)
+    if slipping is None:
+        _, reached = _downstream({milestone_id})
+        slipping = {
+            pk: {'projected_completion_date': projected, 'slip_days': (projected - target_date).days}
+            for pk, target_date, projected in Milestone.objects.filter(
+                pk__in=reached, projected_completion_date__gt=F('target_date')
+            ).order_by().values_list('pk', 'target_date', 'projected_completion_date')
+        }
+        cache.set(key, slipping, IMPACT_CACHE_TIMEOUT)
+
+    tasks = list(
+        Task.objects.filter(milestone_id__in=slipping).exclude(status='COMPLETED').order_by().values_list('pk', flat=True)
+    )
+    return {'milestones': slipping, 'tasks': tasks}
@@ -0,0 +1,102 @@
+"""
+Initiative.actual_spend kept as the sum of what was spent against it.
+
+An initiative's actual spend is the sum of actual_amount over its budget
+line items (initiatives.Budget) and its monthly financial records
+(monitoring.FinancialTracking). Saving or deleting either applies the
+change in amount to the initiative with an F() update, taking it off the
+old initiative when a record is reassigned, so concurrent saves never
+overwrite each other and nothing is re-summed on a save. The old amount is
+read from the stored row just before the write, not from when the record
+was loaded.
+
+Bulk paths that bypass signals, raw SQL edits and figures typed in before
+the sums were maintained show up as drift. reconcile() sums both sources
+with one grouped query each, reports every initiative whose stored value
+differs and optionally writes the sums back in bulk; the
+reconcile_actual_spend command runs it.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+SOURCES = ('initiatives.Budget', 'monitoring.FinancialTracking')
+
+
+def spend_contribution(initiative_id, actual_amount):
+    """(initiative_id, amount) one record adds to actual spend, or None"""
+    if not initiative_id:
+        return None
+    return initiative_id, actual_amount or Decimal('0')
+
+
+def apply_spend_delta(old, new):
+    """
+    Move a record's contribution from old to new, both as returned by
+    spend_contribution(). Issues one UPDATE per initiative whose spend
+    changes.
+    """
+    from .models import Initiative
+
+    if old == new:
+        return
+    deltas = defaultdict(Decimal)
+    if old:
+        deltas[old[0]] -= old[1]
+    if new:
+        deltas[new[0]] += new[1]
+    for initiative_id, delta in deltas.items():
+        if delta:
+            Initiative.objects.filter(pk=initiative_id).update(
+                actual_spend=F('actual_spend') + delta, last_updated=timezone.now()
+            )
+
+
+def spend_totals(initiative_ids=None):
+    """Actual spend per initiative id summed from every source"""
+    totals = defaultdict(Decimal)
+    for label in SOURCES:
+        records = apps.get_model(label).objects.order_by()
+        if initiative_ids is not None:
+            records = records.filter(initiative_id__in=initiative_ids)
+        for initiative_id, total in records.values('initiative_id').annotate(
+            total=Sum('actual_amount')
+        ).values_list('initiative_id', 'total'):
+            totals[initiative_id] += total or 0
+    return totals
+
+
+def reconcile(initiative_ids=None, fix=False, chunk_size=2000):
+    """
+    Compare stored actual_spend with the summed records for the given
+    initiatives (every initiative when None). Returns (pk, name, stored,
+    expected) for each one that drifted; with fix, the sums are written
+    back.
+    """
+    from .models import Initiative
+
+    initiatives = Initiative.objects.order_by('pk')
+    if initiative_ids is not None:
+        initiative_ids = list(initiative_ids)
+        initiatives = initiatives.filter(pk__in=initiative_ids)
+    totals = spend_totals(initiative_ids)
+
+    drift = []
+    for pk, name, stored in initiatives.values_list('pk', 'name', 'actual_spend').iterator(chunk_size=chunk_size):
+        expected = totals.get(pk, Decimal('0.00'))
+        if stored != expected:
+            drift.append((pk, name, stored, expected))
+
+    if fix and drift:
+        now = timezone.now()
+        with transaction.atomic():
+            Initiative.objects.bulk_update(
+                [Initiative(pk=pk, actual_spend=expected, last_updated=now) for pk, _, _, expected in drift],
+                ['actual_spend', 'last_updated'],
+                batch_size=500
+            )
+    return drift
@@ -0,0 +1,57 @@
+"""
+Admin site for MCSU SOP.
+
+Rendering any admin page builds the side menu from every registered
+ModelAdmin (has_module_permission plus the add/change/delete/view checks
+for each model). With eight apps and ~90 models that is a large fixed cost
+per request, so the navigation structure is cached. Permissions themselves
+are read from the database on every request as usual, and the cached menu
+is keyed on a digest of them: users with the same permissions share one
+menu, and a change to someone's permissions moves them to another entry in
+every process at once, whatever the cache backend.
+"""
+import hashlib
+
+from django.contrib import admin
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from utils.export import export_as_csv
+
+NAVIGATION_CACHE_TIMEOUT = 60 * 60
+
+
+def permission_digest(user):
+    """Digest of everything the admin's permission checks look at for user"""
+    if user.is_superuser:
+        permissions = ['*']
+    else:
+        permissions = sorted(user.get_all_permissions())
+    flags = f'{user.is_active:d}{user.is_staff:d}{user.is_superuser:d}'
+    return hashlib.md5('\n'.join([flags, *permissions]).encode(), usedforsecurity=False).hexdigest()
+
+
+class MCSUAdminSite(admin.AdminSite):
+    def __init__(self, name='admin'):
+        super().__init__(name)
+        # Available on every registered ModelAdmin
+        self.add_action(export_as_csv)
+
+    def _build_app_dict(self, request, label=None):
+        key = (
+            f'admin:navigation:{self.name}:{len(self._registry)}:{get_language()}:'
+            f'{permission_digest(request.user)}'
+        )
+        app_dict = cache.get(key)
+        if app_dict is None:
+            app_dict = super()._build_app_dict(request)
+            # Names are lazy translations, which can't be pickled into the cache
+            for app in app_dict.values():
+                app['name'] = str(app['name'])
+                for model in app['models']:
+                    model['name'] = str(model['name'])
+            cache.set(key, app_dict, NAVIGATION_CACHE_TIMEOUT)
+
+        if label:
+            return {label: app_dict[label]} if label in app_dict else {}
+        return app_dict
@@ -0,0 +1,5 @@
+from django.contrib.admin.apps import AdminConfig
+
+
+class MCSUAdminConfig(AdminConfig):
+    default_site = 'mcsu_sop.admin.MCSUAdminSite'
@@ -1,13 +1,15 @@
 import graphene
 import graphql_jwt
 import initiatives.schema
+import exports.schema
+import monitoring.schema
 
-class Query(initiatives.schema.Query, graphene.ObjectType):
+class Query(initiatives.schema.Query, exports.schema.Query, graphene.ObjectType):
     # JWT Token verification
     verify_token = graphql_jwt.Verify.Field()
     refresh_token = graphql_jwt.Refresh.Field()
 
-class Mutation(initiatives.schema.Mutation, graphene.ObjectType):
+class Mutation(initiatives.schema.Mutation, exports.schema.Mutation, monitoring.schema.Mutation, graphene.ObjectType):
     # JWT Authentication
     token_auth = graphql_jwt.ObtainJSONWebToken.Field()
     verify_token = graphql_jwt.Verify.Field()
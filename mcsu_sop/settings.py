@@ -25,6 +25,17 @@ DEBUG = os.environ.get('DJANGO_DEBUG' , 'True') == 'True'
 # Add your domain names here
 ALLOWED_HOSTS = ['*']
 
+# Public base URL used in links sent by email and notifications
+SITE_URL = os.environ.get('SITE_URL' , '')
+
+# First month of the fiscal year used by finance reports (April to March)
+FISCAL_YEAR_START_MONTH = int(os.environ.get('FISCAL_YEAR_START_MONTH' , '4'))
+
+# How far the change-data export stays behind now, so rows written by
+# transactions that have not committed yet are not skipped (seconds; at
+# least the longest expected transaction)
+CHANGE_FEED_LAG_SECONDS = int(os.environ.get('CHANGE_FEED_LAG_SECONDS' , '60'))
+
 # Application definition
 # Grouped by purpose for better organization
 DJANGO_APPS = [
@@ -32,7 +43,7 @@ DJANGO_APPS = [
     'corsheaders',
 
     # Material admin configuration
-    'django.contrib.admin' ,
+    'mcsu_sop.apps.MCSUAdminConfig' ,
     'django.contrib.auth' ,
     'django.contrib.contenttypes' ,
     'django.contrib.sessions' ,
@@ -57,6 +68,7 @@ PROJECT_APPS = [
     'documentation' ,
     'sustainability' ,
     'job_portal',
+    'exports' ,
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + PROJECT_APPS
@@ -26,6 +26,10 @@ urlpatterns = [
     path('admin/', admin.site.urls),
 
     path('ckeditor/', include('ckeditor_uploader.urls')),
+    path('documentation/', include('documentation.urls')),
+    path('exports/', include('exports.urls')),
+    path('governance/', include('governance.urls')),
+    path('monitoring/', include('monitoring.urls')),
     path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True, schema=schema))),
 ]+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
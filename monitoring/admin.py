@@ -1,18 +1,44 @@
 # monitoring/admin.py
-from django.contrib import admin
-from django.utils.html import format_html
-from django.urls import reverse
+from django import forms
+from django.contrib import admin , messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseBadRequest
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.utils.html import format_html , format_html_join
+from django.urls import path , reverse
 from django.utils import timezone
-from django.db.models import Avg
+from django.db.models import Avg , Count
 from .models import (
     KPIMetric , MetricProgress , ParticipantFeedback ,
-    MonitoringCheckIn , DataCollectionTemplate , MonitoringReport
+    MonitoringCheckIn , DataCollectionTemplate , MonitoringReport , DataSubmission
 )
 
 from .models import (
     EmploymentTracking, SkillAssessment, WeeklyProgress,
-    QuarterlyImpactReview, FinancialTracking
+    QuarterlyImpactReview, FinancialTracking, ValueAnomaly
 )
+from initiatives.models import Initiative
+from .anomalies import series_model
+from .employment import PERIODS , get_cohorts
+from .impact_reviews import compute_quarter
+from .rollups import metric_series
+from .variance import FISCAL_YEARS , fiscal_year , get_cube , quarter_table , variance_columns
+
+PERIOD_HISTORY_ROWS = 12
+
+
+def forecast_badge(projected , on_track):
+    """Projected attainment date coloured by the nightly on-track flag"""
+    if on_track is None:
+        return format_html('<span style="color: gray;">Not enough data</span>')
+    color = 'green' if on_track else 'red'
+    if projected is None:
+        return format_html('<span style="color: {};">Not converging</span>' , color)
+    return format_html('<span style="color: {};">{}</span>' , color , projected.strftime('%b %d, %Y'))
+
+
 class MetricProgressInline(admin.TabularInline):
     model = MetricProgress
     extra = 1
@@ -29,15 +55,23 @@ class KPIMetricAdmin(admin.ModelAdmin):
     list_display = (
         'name' , 'initiative' , 'metric_type' ,
         'progress_display' , 'monitoring_frequency' ,
-        'responsible_person' , 'status_display'
+        'responsible_person' , 'status_display' , 'forecast_display'
     )
     list_filter = (
         'metric_type' , 'monitoring_frequency' ,
-        'start_date' , 'initiative'
+        'start_date' , 'on_track' , 'initiative'
     )
     search_fields = ('name' , 'description' , 'initiative__name')
+    list_select_related = ('initiative' , 'responsible_person__user')
+    readonly_fields = ('projected_attainment_date' , 'on_track' , 'period_history')
     inlines = [MetricProgressInline]
 
+    def get_readonly_fields(self , request , obj=None):
+        # current_value follows the latest progress record once there is one
+        if obj is not None and obj.latest_progress_id:
+            return tuple(self.readonly_fields) + ('current_value' ,)
+        return self.readonly_fields
+
     fieldsets = (
         ('Basic Information' , {
             'fields': (
@@ -54,6 +88,13 @@ class KPIMetricAdmin(admin.ModelAdmin):
         ('Timeline' , {
             'fields': ('start_date' , 'end_date')
         }) ,
+        ('Forecast' , {
+            'fields': ('projected_attainment_date' , 'on_track')
+        }) ,
+        ('Period History' , {
+            'fields': ('period_history' ,) ,
+            'classes': ('collapse' ,)
+        }) ,
         ('Responsibility' , {
             'fields': (
                 'responsible_person' ,
@@ -80,6 +121,27 @@ class KPIMetricAdmin(admin.ModelAdmin):
 
     progress_display.short_description = 'Progress'
 
+    def period_history(self , obj):
+        """Progress per monitoring period, latest first, from the rollup table"""
+        if not obj.pk:
+            return '-'
+        periods = metric_series([obj.pk])[obj.pk][::-1][:PERIOD_HISTORY_ROWS]
+        if not periods:
+            return 'No progress recorded yet'
+        return format_html(
+            '<table><tr><th>Period</th><th>Records</th><th>Average</th><th>Min</th><th>Max</th><th>Last</th></tr>'
+            '{}</table>' ,
+            format_html_join(
+                '' , '<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>' ,
+                (
+                    (start.strftime('%b %d, %Y') , count , f'{average:.2f}' , f'{minimum:.2f}' , f'{maximum:.2f}' , f'{last_value:.2f}')
+                    for start , count , average , minimum , maximum , last_value in periods
+                )
+            )
+        )
+
+    period_history.short_description = 'Progress by period'
+
     def status_display(self , obj):
         if obj.current_value >= obj.target_value:
             return format_html('<span style="color: green;">Target Achieved</span>')
@@ -89,6 +151,52 @@ class KPIMetricAdmin(admin.ModelAdmin):
 
     status_display.short_description = 'Status'
 
+    def forecast_display(self , obj):
+        return forecast_badge(obj.projected_attainment_date , obj.on_track)
+
+    forecast_display.short_description = 'Projected Attainment'
+    forecast_display.admin_order_field = 'projected_attainment_date'
+
+
+@admin.register(ValueAnomaly)
+class ValueAnomalyAdmin(admin.ModelAdmin):
+    list_display = (
+        'series_link' , 'content_type' , 'value' , 'expected' ,
+        'score_display' , 'reason' , 'resolved' , 'detected_at'
+    )
+    list_filter = ('resolved' , 'content_type' , 'detected_at')
+    search_fields = ('reason' ,)
+    list_select_related = ('content_type' ,)
+    readonly_fields = (
+        'content_type' , 'object_id' , 'series_id' , 'value' ,
+        'expected' , 'score' , 'reason' , 'detected_at'
+    )
+    actions = ['mark_resolved']
+
+    def has_add_permission(self , request):
+        return False
+
+    def series_link(self , obj):
+        model = series_model(obj.content_type.model_class()._meta.label)
+        url = reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_change' , args=[obj.series_id])
+        return format_html('<a href="{}">{} #{}</a>' , url , model._meta.verbose_name.title() , obj.series_id)
+
+    series_link.short_description = 'Series'
+
+    def score_display(self , obj):
+        if obj.score is None:
+            return format_html('<span style="color: red;">Flat series</span>')
+        return f'{obj.score:.1f}'
+
+    score_display.short_description = 'Score'
+    score_display.admin_order_field = 'score'
+
+    def mark_resolved(self , request , queryset):
+        updated = queryset.update(resolved=True)
+        self.message_user(request , f'{updated} anomalies marked as resolved.')
+
+    mark_resolved.short_description = "Mark selected anomalies as resolved"
+
 
 @admin.register(ParticipantFeedback)
 class ParticipantFeedbackAdmin(admin.ModelAdmin):
@@ -202,7 +310,7 @@ class DataCollectionTemplateAdmin(admin.ModelAdmin):
         return False
     list_display = (
         'name' , 'template_type' , 'created_by' ,
-        'is_active' , 'created_at'
+        'is_active' , 'submission_count' , 'created_at'
     )
     list_filter = ('template_type' , 'is_active' , 'created_at')
     search_fields = ('name' , 'description' , 'instructions')
@@ -222,6 +330,26 @@ class DataCollectionTemplateAdmin(admin.ModelAdmin):
         })
     )
 
+    def submission_count(self , obj):
+        return obj.submission_count
+
+    submission_count.short_description = 'Responses'
+    submission_count.admin_order_field = 'submission_count'
+
+    def get_queryset(self , request):
+        return super().get_queryset(request).annotate(submission_count=Count('submissions'))
+
+
+@admin.register(DataSubmission)
+class DataSubmissionAdmin(admin.ModelAdmin):
+    def has_module_permission(self , request):
+        return False
+    list_display = ('__str__' , 'template' , 'initiative' , 'submitted_by' , 'submitted_at' , 'batch')
+    list_filter = ('template' , 'initiative' , 'submitted_at')
+    list_select_related = ('template' , 'initiative' , 'submitted_by__user')
+    search_fields = ('batch' ,)
+    readonly_fields = ('template' , 'initiative' , 'data' , 'batch' , 'submitted_by' , 'submitted_at')
+
 
 @admin.register(MonitoringReport)
 class MonitoringReportAdmin(admin.ModelAdmin):
@@ -298,6 +426,7 @@ class EmploymentTrackingAdmin(admin.ModelAdmin):
         'status' , 'placement_date' , 'is_field_related' ,
         'initiative'
     )
+    change_list_template = 'admin/monitoring/employmenttracking/change_list.html'
     search_fields = (
         'participant__user__first_name' , 'participant__user__last_name' ,
         'employer_name' , 'position' , 'skills_utilized'
@@ -345,6 +474,36 @@ class EmploymentTrackingAdmin(admin.ModelAdmin):
     retention_period_display.short_description = 'Retention'
 
 
+    def get_urls(self):
+        return [
+            path(
+                'cohorts/' ,
+                self.admin_site.admin_view(self.cohorts_view) ,
+                name='monitoring_employmenttracking_cohorts'
+            ) ,
+        ] + super().get_urls()
+
+    def cohorts_view(self , request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        period = request.GET.get('period')
+        if period not in PERIODS:
+            period = 'quarter'
+        initiative = None
+        if request.GET.get('initiative' , '').isdigit():
+            initiative = Initiative.objects.filter(pk=request.GET['initiative']).first()
+        context = dict(
+            self.admin_site.each_context(request) ,
+            title='Employment outcomes by cohort' ,
+            opts=self.model._meta ,
+            period=period ,
+            periods=list(PERIODS) ,
+            initiative=initiative ,
+            initiatives=Initiative.objects.filter(employment_records__isnull=False).distinct().order_by('name') ,
+            statistics=get_cohorts(initiative.pk if initiative else None , period) ,
+        )
+        return TemplateResponse(request , 'admin/monitoring/employmenttracking/cohorts.html' , context)
+
 @admin.register(SkillAssessment)
 class SkillAssessmentAdmin(admin.ModelAdmin):
     def has_module_permission(self, request):
@@ -494,6 +653,27 @@ class WeeklyProgressAdmin(admin.ModelAdmin):
     recorded_by_name.short_description = 'Recorded By'
 
 
+QUARTER_CHOICES = [(q , f'Q{q}') for q in range(1 , 5)]
+
+
+class QuarterActionForm(ActionForm):
+    year = forms.IntegerField(
+        required=False , min_value=FISCAL_YEARS[0] , max_value=FISCAL_YEARS[-1] , label='Fiscal year'
+    )
+    quarter = forms.TypedChoiceField(
+        choices=[('' , '---------')] + QUARTER_CHOICES ,
+        coerce=int ,
+        empty_value=None ,
+        required=False ,
+        label='Quarter'
+    )
+
+
+class QuarterForm(forms.Form):
+    year = forms.IntegerField(min_value=FISCAL_YEARS[0] , max_value=FISCAL_YEARS[-1] , label='Fiscal year')
+    quarter = forms.TypedChoiceField(choices=QUARTER_CHOICES , coerce=int , label='Quarter')
+
+
 @admin.register(QuarterlyImpactReview)
 class QuarterlyImpactReviewAdmin(admin.ModelAdmin):
     def has_module_permission(self, request):
@@ -508,6 +688,9 @@ class QuarterlyImpactReviewAdmin(admin.ModelAdmin):
         'key_achievements' , 'challenges_faced' ,
         'recommendations' , 'initiative__name'
     )
+    actions = ['compute_quarter_metrics']
+    action_form = QuarterActionForm
+    change_list_template = 'admin/monitoring/quarterlyimpactreview/change_list.html'
 
     fieldsets = (
         ('Review Period' , {
@@ -552,25 +735,89 @@ class QuarterlyImpactReviewAdmin(admin.ModelAdmin):
     def impact_metrics_display(self , obj):
         return format_html(
             'Beneficiaries: {}<br>'
-            'Skills: {:.1f}%<br>'
-            'Employment: {:.1f}%' ,
+            'Skills: {}%<br>'
+            'Employment: {}%' ,
             obj.total_beneficiaries ,
-            obj.skill_completion_rate ,
-            obj.employment_rate
+            f'{obj.skill_completion_rate:.1f}' ,
+            f'{obj.employment_rate:.1f}'
         )
 
     impact_metrics_display.short_description = 'Impact Metrics'
 
     def financial_metrics_display(self , obj):
         return format_html(
-            'Budget: ${:,.2f}<br>'
-            'Cost/Beneficiary: ${:,.2f}' ,
-            obj.budget_utilized ,
-            obj.cost_per_beneficiary
+            'Budget: ${}<br>'
+            'Cost/Beneficiary: ${}' ,
+            f'{obj.budget_utilized:,.2f}' ,
+            f'{obj.cost_per_beneficiary:,.2f}'
         )
 
     financial_metrics_display.short_description = 'Financial Metrics'
 
+    def _compute_quarters(self , request , quarters):
+        prepared_by = getattr(request.user , 'member_profile' , None)
+        created = updated = 0
+        for year , quarter in quarters:
+            c , u = compute_quarter(year , quarter , prepared_by=prepared_by)
+            created += c
+            updated += u
+        self.message_user(
+            request ,
+            f'Computed {len(quarters)} quarter(s): {created} reviews created, {updated} updated.' ,
+            messages.SUCCESS
+        )
+
+    def compute_quarter_metrics(self , request , queryset):
+        """
+        Compute metrics for every initiative in the quarter chosen in the
+        action bar, or else in the quarters of the selected reviews
+        """
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid():
+            self.message_user(request , 'Enter a valid fiscal year and quarter.' , messages.ERROR)
+            return
+        year , quarter = form.cleaned_data['year'] , form.cleaned_data['quarter']
+        if year is not None and quarter is not None:
+            quarters = [(year , quarter)]
+        elif year is not None or quarter is not None:
+            self.message_user(request , 'Choose both a fiscal year and a quarter.' , messages.ERROR)
+            return
+        else:
+            quarters = sorted(set(queryset.values_list('year' , 'quarter')))
+        self._compute_quarters(request , quarters)
+
+    compute_quarter_metrics.short_description = 'Compute metrics for every initiative in the quarter'
+    compute_quarter_metrics.allowed_permissions = ('add' , 'change')
+
+    def get_urls(self):
+        return [
+            path(
+                'compute/' ,
+                self.admin_site.admin_view(self.compute_view) ,
+                name='monitoring_quarterlyimpactreview_compute'
+            ) ,
+        ] + super().get_urls()
+
+    def compute_view(self , request):
+        """Compute a quarter's metrics without having to select a review first"""
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        if request.method == 'POST':
+            form = QuarterForm(request.POST)
+            if form.is_valid():
+                self._compute_quarters(request , [(form.cleaned_data['year'] , form.cleaned_data['quarter'])])
+                return redirect('admin:monitoring_quarterlyimpactreview_changelist')
+        else:
+            form = QuarterForm(initial={'year': fiscal_year(timezone.now().date())})
+        context = dict(
+            self.admin_site.each_context(request) ,
+            title='Compute quarter metrics' ,
+            opts=self.model._meta ,
+            form=form ,
+        )
+        return TemplateResponse(request , 'admin/monitoring/quarterlyimpactreview/compute.html' , context)
+
     def prepared_by_name(self , obj):
         return obj.prepared_by.user.get_full_name()
 
@@ -606,6 +853,7 @@ class FinancialTrackingAdmin(admin.ModelAdmin):
         'description' , 'variance_notes' ,
         'initiative__name'
     )
+    change_list_template = 'admin/monitoring/financialtracking/change_list.html'
 
     fieldsets = (
         ('Basic Information' , {
@@ -628,27 +876,38 @@ class FinancialTrackingAdmin(admin.ModelAdmin):
         })
     )
 
+    def get_queryset(self , request):
+        # Named apart from the model's variance_amount()/variance_percentage()
+        columns = variance_columns()
+        return super().get_queryset(request).select_related(
+            'initiative' , 'recorded_by__user'
+        ).annotate(
+            variance_value=columns['variance'] ,
+            variance_pct=columns['variance_percentage']
+        )
+
     def amount_comparison(self , obj):
         return format_html(
-            'Budget: ${:,.2f}<br>'
-            'Actual: ${:,.2f}' ,
-            obj.budgeted_amount ,
-            obj.actual_amount
+            'Budget: ${}<br>'
+            'Actual: ${}' ,
+            f'{obj.budgeted_amount:,.2f}' ,
+            f'{obj.actual_amount:,.2f}'
         )
 
     amount_comparison.short_description = 'Amount'
 
     def variance_display(self , obj):
-        variance = obj.variance_percentage()
+        variance = obj.variance_pct
         color = 'red' if variance > 10 else 'green' if variance < 0 else 'orange'
         return format_html(
-            '<span style="color: {};">{:+.1f}%<br>(${:,.2f})</span>' ,
+            '<span style="color: {};">{}%<br>(${})</span>' ,
             color ,
-            variance ,
-            obj.variance_amount()
+            f'{variance:+.1f}' ,
+            f'{obj.variance_value:,.2f}'
         )
 
     variance_display.short_description = 'Variance'
+    variance_display.admin_order_field = 'variance_pct'
 
     def recorded_by_name(self , obj):
         return obj.recorded_by.user.get_full_name()
@@ -671,6 +930,35 @@ class FinancialTrackingAdmin(admin.ModelAdmin):
             obj.recorded_by = request.user.member
         super().save_model(request , obj , form , change)
 
+    def get_urls(self):
+        return [
+            path(
+                'variance/' ,
+                self.admin_site.admin_view(self.variance_view) ,
+                name='monitoring_financialtracking_variance'
+            ) ,
+        ] + super().get_urls()
+
+    def variance_view(self , request):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            year = int(request.GET['year'])
+        except (KeyError , ValueError):
+            year = fiscal_year(timezone.now().date())
+        if year not in FISCAL_YEARS:
+            return HttpResponseBadRequest(f'year must be between {FISCAL_YEARS[0]} and {FISCAL_YEARS[-1]}')
+        cube = get_cube(year)
+        context = dict(
+            self.admin_site.each_context(request) ,
+            title=f'Budget variance FY {year}-{str(year + 1)[-2:]}' ,
+            opts=self.model._meta ,
+            year=year ,
+            cube=cube ,
+            table=quarter_table(cube) ,
+        )
+        return TemplateResponse(request , 'admin/monitoring/financialtracking/variance_cube.html' , context)
+
 # Register any additional customizations here
 admin.site.site_header = 'MCSU Monitoring & Evaluation Administration'
 admin.site.site_title = 'MCSU M&E'
@@ -0,0 +1,219 @@
+"""
+Anomaly checks for hand-entered progress values.
+
+MetricProgress and SDGProgress values are typed in by hand, so an extra
+zero or a figure in the wrong unit is easy to miss. Each value is compared
+with the WINDOW values recorded before it in the same series. Its score is
+its distance from their median in robust standard deviations: the median
+absolute deviation scaled by 1.4826, but never less than RELATIVE_FLOOR of
+the median, so a series that barely moves doesn't flag every small step.
+Values scoring above THRESHOLD are stored as ValueAnomaly with a reason,
+which calls out a power-of-ten ratio to the median as a likely typo or unit
+mix-up. A value breaking a window of zeros has no finite score and is
+always flagged. Series with fewer than MIN_HISTORY earlier values are not
+checked.
+
+New values are checked on insert against SeriesStatistics, which keeps the
+window and a count, so an insert costs a few queries however long the
+history. A backdated value is therefore compared with the latest window
+rather than the values before its date. Edits and deletes rescan their
+series with scan(), which also backs the detect_value_anomalies command and
+checks any number of series at once by building a matrix of each value's
+preceding window and taking row-wise medians.
+"""
+from itertools import islice
+import math
+
+import numpy as np
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+# Progress model label: (series foreign key column, date field)
+SERIES = {
+    'monitoring.MetricProgress': ('metric_id', 'date_recorded'),
+    'documentation.SDGProgress': ('sdg_mapping_id', 'record_date'),
+}
+
+WINDOW = 12
+MIN_HISTORY = 5
+THRESHOLD = 5.0
+MAD_SCALE = 1.4826
+RELATIVE_FLOOR = 0.05
+
+
+def series_model(label):
+    """The model owning a series of label records (KPIMetric, SDGMapping)"""
+    model = apps.get_model(label)
+    return model._meta.get_field(SERIES[label][0][:-3]).related_model
+
+
+def score(values, windows):
+    """
+    Robust z-scores of values against the rows of windows (nan-padded),
+    with the window medians. Scores are inf where the window has no spread
+    and no magnitude to scale by.
+    """
+    median = np.nanmedian(windows, axis=-1)
+    scale = np.maximum(
+        np.nanmedian(np.abs(windows - median[..., None]), axis=-1) * MAD_SCALE,
+        np.abs(median) * RELATIVE_FLOOR
+    )
+    deviation = np.abs(values - median)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        scores = np.where(scale > 0, deviation / scale, np.where(deviation > 0, np.inf, 0.0))
+    return scores, median
+
+
+def describe(value, median, score):
+    if math.isinf(score):
+        text = f"breaks a run of {median:g}"
+    else:
+        text = f"{score:.1f} deviations from the rolling median {median:g}"
+    if value and median:
+        magnitude = math.log10(abs(value / median))
+        power = round(magnitude)
+        if power and abs(magnitude - power) < 0.05:
+            text += f", about {10.0 ** power:g}x the usual value (extra zero or wrong unit?)"
+    return text
+
+
+def _anomaly(content_type, series_id, pk, value, median, score):
+    from .models import ValueAnomaly
+
+    return ValueAnomaly(
+        content_type=content_type, series_id=series_id, object_id=pk, value=value, expected=median,
+        score=None if math.isinf(score) else score, reason=describe(value, median, score)
+    )
+
+
+def record_added(record):
+    """Check a newly inserted progress record and fold it into its series statistics"""
+    from .models import SeriesStatistics
+
+    label = record._meta.label
+    series_id = getattr(record, SERIES[label][0])
+    content_type = ContentType.objects.get_for_model(record)
+    with transaction.atomic():
+        stats = SeriesStatistics.objects.select_for_update().filter(
+            content_type=content_type, series_id=series_id
+        ).first()
+        if stats is None:
+            # First record of the series, or statistics dropped by a delete
+            scan(label, [series_id])
+            return
+        if len(stats.window) >= MIN_HISTORY:
+            scores, median = score(np.array([record.value]), np.array([stats.window], dtype=float))
+            if scores[0] > THRESHOLD:
+                _anomaly(content_type, series_id, record.pk, record.value, float(median[0]), float(scores[0])).save()
+        stats.count += 1
+        stats.window = (stats.window + [record.value])[-WINDOW:]
+        stats.save(update_fields=['count', 'window', 'updated_at'])
+
+
+def record_removed(record):
+    from .models import SeriesStatistics, ValueAnomaly
+
+    content_type = ContentType.objects.get_for_model(record)
+    ValueAnomaly.objects.filter(content_type=content_type, object_id=record.pk).delete()
+    # The window may hold the removed value; the next insert rescans
+    SeriesStatistics.objects.filter(
+        content_type=content_type, series_id=getattr(record, SERIES[record._meta.label][0])
+    ).delete()
+
+
+def _load(rows, chunk_size):
+    """Flat (series id, pk, value) arrays from an iterator of tuples"""
+    keys, pks, values = [], [], []
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        k, p, v = zip(*chunk)
+        keys.append(np.array(k, dtype=np.int64))
+        pks.append(np.array(p, dtype=np.int64))
+        values.append(np.array(v, dtype=float))
+    if not keys:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, float)
+    return np.concatenate(keys), np.concatenate(pks), np.concatenate(values)
+
+
+def scan(label, series_ids=None, chunk_size=20000):
+    """
+    Recheck every value of the given series (all series when None) and
+    rebuild their statistics. Resolved flags are kept. Returns the number
+    of new flags.
+    """
+    from .models import SeriesStatistics, ValueAnomaly
+
+    model = apps.get_model(label)
+    series_field, date_field = SERIES[label]
+    content_type = ContentType.objects.get_for_model(model)
+    records = model.objects.order_by(series_field, date_field, 'pk')
+    statistics = SeriesStatistics.objects.filter(content_type=content_type)
+    anomalies = ValueAnomaly.objects.filter(content_type=content_type)
+    if series_ids is not None:
+        series_ids = list(series_ids)
+        records = records.filter(**{f'{series_field}__in': series_ids})
+        statistics = statistics.filter(series_id__in=series_ids)
+        anomalies = anomalies.filter(series_id__in=series_ids)
+    keys, pks, values = _load(
+        records.values_list(series_field, 'pk', 'value').iterator(chunk_size=chunk_size), chunk_size
+    )
+
+    index = np.arange(len(values))
+    first = np.ones(len(values), dtype=bool)
+    first[1:] = keys[1:] != keys[:-1]
+    group_start = np.maximum.accumulate(np.where(first, index, 0))
+    checked = np.flatnonzero(index - group_start >= MIN_HISTORY)
+
+    flagged = {}
+    for start in range(0, len(checked), chunk_size):
+        rows = checked[start:start + chunk_size]
+        # Row r holds the WINDOW values preceding rows[r] in its series,
+        # nan where the series has fewer
+        offsets = rows[:, None] - np.arange(WINDOW, 0, -1)
+        windows = np.where(offsets >= group_start[rows][:, None], values[np.maximum(offsets, 0)], np.nan)
+        scores, median = score(values[rows], windows)
+        for r in np.flatnonzero(scores > THRESHOLD):
+            i = rows[r]
+            flagged[int(pks[i])] = (int(keys[i]), float(values[i]), float(median[r]), float(scores[r]))
+
+    starts = np.flatnonzero(first)
+    ends = np.append(starts[1:], len(values))
+    with transaction.atomic():
+        statistics.delete()
+        # A concurrent scan of the same series (two first inserts at once)
+        # may have written its rows since the delete; overwrite them rather
+        # than fail on the unique constraint
+        SeriesStatistics.objects.bulk_create(
+            [
+                SeriesStatistics(
+                    content_type=content_type, series_id=int(keys[s]), count=int(e - s),
+                    window=values[max(s, e - WINDOW):e].tolist()
+                )
+                for s, e in zip(starts, ends)
+            ],
+            batch_size=1000, update_conflicts=True,
+            unique_fields=['content_type', 'series_id'], update_fields=['count', 'window', 'updated_at']
+        )
+
+        existing = {
+            object_id: (pk, resolved, value)
+            for object_id, pk, resolved, value in anomalies.values_list('object_id', 'pk', 'resolved', 'value')
+        }
+        stale = [pk for object_id, (pk, resolved, _) in existing.items() if not resolved and object_id not in flagged]
+        for start in range(0, len(stale), 500):
+            ValueAnomaly.objects.filter(pk__in=stale[start:start + 500]).delete()
+        created = []
+        changed = []
+        for pk, (series_id, value, median, value_score) in flagged.items():
+            anomaly = _anomaly(content_type, series_id, pk, value, median, value_score)
+            if pk not in existing:
+                created.append(anomaly)
+            elif not existing[pk][1] and existing[pk][2] != value:
+                anomaly.pk = existing[pk][0]
+                changed.append(anomaly)
+        ValueAnomaly.objects.bulk_create(created, batch_size=1000, ignore_conflicts=True)
+        ValueAnomaly.objects.bulk_update(changed, ['value', 'expected', 'score', 'reason'], batch_size=500)
+    return len(created)
@@ -0,0 +1,141 @@
+"""
+Employment outcome statistics per cohort.
+
+A cohort is the participants whose EmploymentTracking records were created
+in the same month, quarter or year, either within one initiative or across
+all of them. Per cohort:
+
+    participants: distinct participants tracked
+    placement_rate: share of participants, leaving out records NOT_SEEKING,
+        placed in a job or self-employed
+    field_related_share: share of placed records where the work is related
+        to the field of training
+    time_to_placement: days from the record's creation to placement_date
+    retention: retention_period in months of placed records
+
+The counts come from one grouped query. The two distributions come from
+one more query over placed records; they are summarized as count, mean and
+the 25th, 50th, 75th and 90th percentiles, with every cohort done at once:
+values are sorted by cohort then value, and each percentile is
+interpolated between the two ranks around (n - 1) * q, as np.percentile
+does.
+
+Results are cached per initiative (or all initiatives) and period. Each
+initiative has a version number, bumped when one of its records is saved
+or deleted, so only the statistics of that initiative and the all
+initiatives view are recomputed.
+"""
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Count, DateField, Q
+from django.db.models.functions import TruncDate, TruncMonth, TruncQuarter, TruncYear
+from django.utils import timezone
+
+from utils.cache import bump_cache_version, cache_version
+
+COHORT_CACHE_TIMEOUT = 60 * 60 * 24
+PERIODS = {'month': TruncMonth, 'quarter': TruncQuarter, 'year': TruncYear}
+PERCENTILES = (25, 50, 75, 90)
+EMPLOYED = ('PLACED', 'SELF_EMPLOYED')
+
+
+def group_percentiles(groups, values, size, percentiles=PERCENTILES):
+    """
+    Percentiles of values per group (in range(size)) as a size x
+    len(percentiles) array, with the counts and means. Rows of empty groups
+    are nan.
+    """
+    order = np.lexsort((values, groups))
+    groups, values = groups[order], values[order]
+    count = np.bincount(groups, minlength=size)
+    start = np.concatenate([[0], np.cumsum(count)[:-1]])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(groups, values, size) / count
+    result = np.full((size, len(percentiles)), np.nan)
+    present = count > 0
+    if values.size:
+        rank = (count[present, None] - 1) * (np.array(percentiles) / 100)
+        low = np.floor(rank).astype(np.int64)
+        high = np.minimum(low + 1, count[present, None] - 1)
+        base = start[present, None]
+        result[present] = values[base + low] + (values[base + high] - values[base + low]) * (rank - low)
+    return result, count, mean
+
+
+def _distribution(result, count, mean, i):
+    if not count[i]:
+        return None
+    return {
+        'count': int(count[i]),
+        'mean': round(float(mean[i]), 1),
+        **{f'p{q}': round(float(result[i, j]), 1) for j, q in enumerate(PERCENTILES)},
+    }
+
+
+def build_cohorts(initiative_id=None, period='quarter'):
+    from .models import EmploymentTracking
+
+    records = EmploymentTracking.objects.order_by().annotate(
+        cohort=PERIODS[period]('created_at', output_field=DateField())
+    )
+    if initiative_id is not None:
+        records = records.filter(initiative_id=initiative_id)
+    employed = Q(status__in=EMPLOYED)
+    statuses = [status for status, _ in EmploymentTracking.EMPLOYMENT_STATUS]
+    cohorts = list(records.values('cohort').annotate(
+        participants=Count('participant', distinct=True),
+        records=Count('pk'),
+        seeking=Count('participant', distinct=True, filter=~Q(status='NOT_SEEKING')),
+        placed_participants=Count('participant', distinct=True, filter=employed),
+        placed=Count('pk', filter=employed),
+        field_related=Count('pk', filter=employed & Q(is_field_related=True)),
+        **{f'status_{status}': Count('pk', filter=Q(status=status)) for status in statuses}
+    ).order_by('cohort'))
+    index = {row['cohort']: i for i, row in enumerate(cohorts)}
+
+    rows = list(records.filter(employed).filter(
+        Q(placement_date__isnull=False) | Q(retention_period__isnull=False)
+    ).annotate(tracked_on=TruncDate('created_at')).values_list(
+        'cohort', 'tracked_on', 'placement_date', 'retention_period'
+    ))
+    days = [(index[c], (p - t).days) for c, t, p, _ in rows if p and p >= t]
+    months = [(index[c], r) for c, _, _, r in rows if r is not None]
+    size = len(cohorts)
+    distributions = {}
+    for name, pairs in (('time_to_placement', days), ('retention', months)):
+        groups = np.array([g for g, _ in pairs], dtype=np.int64)
+        values = np.array([v for _, v in pairs], dtype=float)
+        distributions[name] = group_percentiles(groups, values, size)
+
+    for i, row in enumerate(cohorts):
+        row['statuses'] = {status: row.pop(f'status_{status}') for status in statuses}
+        row['placement_rate'] = round(row['placed_participants'] / row['seeking'] * 100, 1) if row['seeking'] else None
+        row['field_related_share'] = round(row['field_related'] / row['placed'] * 100, 1) if row['placed'] else None
+        for name, summary in distributions.items():
+            row[name] = _distribution(*summary, i)
+    return {
+        'initiative': initiative_id,
+        'period': period,
+        'percentiles': list(PERCENTILES),
+        'cohorts': cohorts,
+        'generated_at': timezone.now(),
+    }
+
+
+def _version_key(initiative_id):
+    return f'employment-cohorts:{initiative_id or "all"}:version'
+
+
+def invalidate_cohorts(*initiative_ids):
+    """Drop the statistics of the given initiatives and of all initiatives"""
+    for initiative_id in {pk for pk in initiative_ids if pk} | {None}:
+        bump_cache_version(_version_key(initiative_id))
+
+
+def get_cohorts(initiative_id=None, period='quarter'):
+    key = f'employment-cohorts:{initiative_id or "all"}:{cache_version(_version_key(initiative_id))}:{period}'
+    data = cache.get(key)
+    if data is None:
+        data = build_cohorts(initiative_id, period)
+        cache.set(key, data, COHORT_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,197 @@
+"""
+Feedback statistics per event and per initiative.
+
+Event feedback comes from initiatives.Feedback (rating) and
+ParticipantFeedback (satisfaction_rating and confidence_improvement), both
+on a 1-5 scale with would_recommend; programme feedback comes from
+program_design.ProgramFeedback. FeedbackStatistics keeps one row per event
+and one per initiative holding counters only: responses, recommendations,
+a histogram column per rating and confidence value, and ProgramFeedback
+counts on initiative rows. Means and shares are derived from the
+counters, so a summary page reads one row.
+
+Each feedback record contributes a set of +1 counters to one scope (its
+event, or for ProgramFeedback its initiative). Event contributions are also
+applied to the event's initiative. Saving or deleting a record applies the
+difference between its old and new contribution with F() updates, creating
+the statistics row first when it is missing; counters are floored at zero
+so a row that was rebuilt or created after the record never goes negative.
+An event moved to another initiative carries its counters along. rebuild()
+recomputes every row from grouped queries, for backfills and after bulk
+changes.
+"""
+from collections import Counter, defaultdict
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+SCALE = range(1, 6)
+HISTOGRAMS = ('rating', 'confidence')
+COUNTERS = (
+    'responses', 'recommended', *(f'{name}_{i}' for name in HISTOGRAMS for i in SCALE),
+    'program_responses', 'expectations_met', 'culturally_sensitive',
+)
+
+# Model label: (scope, scope field, {counter prefix or name: field})
+SOURCES = {
+    'initiatives.Feedback': ('event', 'event_id', {'rating': 'rating'}),
+    'monitoring.ParticipantFeedback': (
+        'event', 'event_id', {'rating': 'satisfaction_rating', 'confidence': 'confidence_improvement'}
+    ),
+    'program_design.ProgramFeedback': (
+        'initiative', 'initiative_id',
+        {'expectations_met': 'expectations_met', 'culturally_sensitive': 'culturally_sensitive'}
+    ),
+}
+
+
+def contribution(label, values):
+    """
+    (scope, scope id, counters) one record adds, from a dict of its field
+    values, or None when it has no scope
+    """
+    scope, scope_field, fields = SOURCES[label]
+    if not values.get(scope_field):
+        return None
+    counters = []
+    if scope == 'event':
+        counters.append('responses')
+        if values.get('would_recommend'):
+            counters.append('recommended')
+        for prefix, field in fields.items():
+            if values.get(field) in SCALE:
+                counters.append(f'{prefix}_{values[field]}')
+    else:
+        counters.append('program_responses')
+        counters.extend(name for name, field in fields.items() if values.get(field))
+    return scope, values[scope_field], tuple(counters)
+
+
+def fields(label):
+    """Fields of a source model that its contribution depends on"""
+    scope, scope_field, values = SOURCES[label]
+    return (scope_field, *values.values(), *(('would_recommend',) if scope == 'event' else ()))
+
+
+def record_contribution(record):
+    label = record._meta.label
+    return contribution(label, {field: getattr(record, field) for field in fields(label)})
+
+
+def _rows(scope, scope_id):
+    from .models import FeedbackStatistics
+
+    if scope == 'event':
+        return FeedbackStatistics.objects.filter(event_id=scope_id)
+    return FeedbackStatistics.objects.filter(initiative_id=scope_id, event__isnull=True)
+
+
+def _apply(scope, scope_id, initiative_id, counts):
+    """Add counts to one statistics row, creating it when counts has something to add"""
+    from .models import FeedbackStatistics
+
+    changes = {counter: Greatest(F(counter) + n, 0) for counter, n in counts.items() if n}
+    if not changes:
+        return
+    changes['updated_at'] = timezone.now()
+    if _rows(scope, scope_id).update(**changes):
+        return
+    # Nothing to take away from a row that was never created, or that is
+    # being deleted along with its event
+    if any(n > 0 for n in counts.values()):
+        FeedbackStatistics.objects.bulk_create([FeedbackStatistics(
+            initiative_id=initiative_id, event_id=scope_id if scope == 'event' else None
+        )], ignore_conflicts=True)
+        _rows(scope, scope_id).update(**changes)
+
+
+def apply_feedback_delta(old, new):
+    """
+    Move a record's contribution from old to new, both as returned by
+    contribution(): one UPDATE per statistics row that changes, after
+    looking up the initiative of the events involved
+    """
+    from initiatives.models import Event
+
+    if old == new:
+        return
+    deltas = defaultdict(Counter)
+    for sign, part in ((-1, old), (1, new)):
+        if part:
+            scope, scope_id, counters = part
+            deltas[(scope, scope_id)].update({counter: sign for counter in counters})
+
+    event_ids = [scope_id for scope, scope_id in deltas if scope == 'event']
+    initiatives = dict(Event.objects.filter(pk__in=event_ids).values_list('pk', 'initiative_id')) if event_ids else {}
+    for event_id, initiative_id in initiatives.items():
+        deltas[('initiative', initiative_id)].update(deltas[('event', event_id)])
+
+    with transaction.atomic():
+        for (scope, scope_id), counts in deltas.items():
+            if scope == 'initiative':
+                _apply(scope, scope_id, scope_id, counts)
+            elif scope_id in initiatives:
+                _apply(scope, scope_id, initiatives[scope_id], counts)
+
+
+def move_event(event_id, previous_initiative_id, initiative_id):
+    """Carry an event's counters over to the initiative it was moved to"""
+    from .models import FeedbackStatistics
+
+    stats = FeedbackStatistics.objects.filter(event_id=event_id).values(*COUNTERS).first()
+    if stats is None:
+        return
+    counts = Counter({counter: n for counter, n in stats.items() if n})
+    with transaction.atomic():
+        _rows('event', event_id).update(initiative_id=initiative_id, updated_at=timezone.now())
+        _apply('initiative', previous_initiative_id, previous_initiative_id, Counter({c: -n for c, n in counts.items()}))
+        _apply('initiative', initiative_id, initiative_id, counts)
+
+
+def rebuild(apps=global_apps):
+    """
+    Recompute every statistics row from the feedback tables; returns the
+    number of rows. apps is the model registry, for use from migrations.
+    """
+    Event = apps.get_model('initiatives', 'Event')
+    FeedbackStatistics = apps.get_model('monitoring', 'FeedbackStatistics')
+
+    events = defaultdict(Counter)
+    initiatives = defaultdict(Counter)
+    for label, (scope, scope_field, values) in SOURCES.items():
+        if scope == 'event':
+            aggregates = {
+                'responses': Count('pk'),
+                'recommended': Count('pk', filter=Q(would_recommend=True)),
+                **{
+                    f'{prefix}_{i}': Count('pk', filter=Q(**{field: i}))
+                    for prefix, field in values.items() for i in SCALE
+                },
+            }
+        else:
+            aggregates = {
+                'program_responses': Count('pk'),
+                **{name: Count('pk', filter=Q(**{field: True})) for name, field in values.items()},
+            }
+        target = events if scope == 'event' else initiatives
+        for row in apps.get_model(label).objects.order_by().values(scope_field).annotate(**aggregates):
+            target[row.pop(scope_field)].update(row)
+
+    event_initiatives = dict(Event.objects.filter(pk__in=list(events)).values_list('pk', 'initiative_id'))
+    for event_id, counts in events.items():
+        initiatives[event_initiatives[event_id]].update(counts)
+
+    rows = [
+        FeedbackStatistics(event_id=event_id, initiative_id=event_initiatives[event_id], **counts)
+        for event_id, counts in events.items()
+    ] + [
+        FeedbackStatistics(initiative_id=initiative_id, **counts)
+        for initiative_id, counts in initiatives.items()
+    ]
+    with transaction.atomic():
+        FeedbackStatistics.objects.all().delete()
+        FeedbackStatistics.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
@@ -0,0 +1,195 @@
+"""
+Target attainment forecasts for KPIMetric and initiatives.KPI.
+
+Each series is fitted with an ordinary least-squares line value = a + b * day.
+A KPIMetric's series is its MetricProgress history. A KPI only has two
+points, baseline_value (0 when unset) on the day it was created and
+current_value on the day it last changed (current_value_recorded_at).
+
+The projected attainment date is where the line crosses target_value, no
+earlier than today, and a series is on track when that date is on or before
+its deadline (end_date for metrics, target_date for KPIs). A series that
+already meets its target is on track and projected at its latest
+observation. With fewer than two distinct days there is no trend and
+on_track is left null; a flat or falling trend never gets there and is off
+track.
+
+All series are fitted together: rows are loaded into flat NumPy arrays with
+a series index per point, and the per-series sums come from np.bincount, so
+the cost is a handful of array passes however many series there are. Only
+rows whose forecast changed are written back, with updated_at bumped so the
+change feed picks them up.
+"""
+import datetime
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+EPOCH = datetime.date(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+MAX_DAY = (datetime.date.max - EPOCH).days
+UNKNOWN = -1
+
+
+def _days(dates):
+    """Days since 1970-01-01 for a sequence of dates"""
+    return np.fromiter((d.toordinal() for d in dates), np.int64, len(dates)) - EPOCH_ORDINAL
+
+
+def _date(day):
+    return EPOCH + datetime.timedelta(days=int(day))
+
+
+def linear_trends(groups, x, y, size):
+    """
+    Least-squares fit of every series at once. groups holds the series index
+    (in range(size)) of each point. Returns (mean_x, mean_y, slope) arrays;
+    slope is nan for series with fewer than two distinct x values.
+    """
+    count = np.bincount(groups, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.bincount(groups, x, size) / count
+        mean_y = np.bincount(groups, y, size) / count
+        # Centred sums rather than sum(x*x) - n*mean^2, which loses precision
+        # on day numbers in the tens of thousands
+        dx = x - mean_x[groups]
+        sxx = np.bincount(groups, dx * dx, size)
+        sxy = np.bincount(groups, dx * (y - mean_y[groups]), size)
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+    return mean_x, mean_y, slope
+
+
+def project(mean_x, mean_y, slope, target, deadline, reached, reached_day, today):
+    """
+    Projected attainment day and on-track flag per series. Days are -1 where
+    there is no projection; flags are 1, 0 or UNKNOWN.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        crossing = np.maximum(np.ceil(mean_x + (target - mean_y) / slope), today)
+    reachable = (slope > 0) & (crossing <= MAX_DAY)
+    day = np.where(reachable, crossing, -1).astype(np.int64)
+    on_track = np.where(reachable, day <= deadline, np.where(np.isnan(slope), UNKNOWN, 0))
+    day = np.where(reached, reached_day, day)
+    on_track = np.where(reached, 1, on_track).astype(np.int8)
+    return day, on_track
+
+
+def _load_points(rows, chunk_size):
+    """Flat (key, day, value) arrays from an iterator of (key, date, value)"""
+    keys, days, values = [], [], []
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        k, d, v = zip(*chunk)
+        keys.append(np.array(k, dtype=np.int64))
+        days.append(_days(d))
+        values.append(np.array(v, dtype=float))
+    if not keys:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, float)
+    return np.concatenate(keys), np.concatenate(days), np.concatenate(values)
+
+
+def _stored(dates, flags):
+    day = np.array([(d - EPOCH).days if d else -1 for d in dates], dtype=np.int64)
+    on_track = np.array([UNKNOWN if f is None else int(f) for f in flags], dtype=np.int8)
+    return day, on_track
+
+
+def _write(model, ids, day, on_track, stored_day, stored_on_track, batch_size=500):
+    """
+    Write the rows whose forecast differs from what is stored. Rows sharing
+    a (day, flag) pair are updated together, which for a nightly run means
+    a few hundred distinct dates rather than one CASE branch per row.
+    """
+    changed = np.flatnonzero((day != stored_day) | (on_track != stored_on_track))
+    if not len(changed):
+        return 0
+    pairs, inverse = np.unique(np.stack([day[changed], on_track[changed]]), axis=1, return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    bounds = np.searchsorted(inverse[order], np.arange(pairs.shape[1] + 1))
+    now = timezone.now()
+    with transaction.atomic():
+        for p, (pair_day, flag) in enumerate(pairs.T):
+            pks = ids[changed[order[bounds[p]:bounds[p + 1]]]].tolist()
+            for start in range(0, len(pks), batch_size):
+                model.objects.filter(pk__in=pks[start:start + batch_size]).update(
+                    projected_attainment_date=_date(pair_day) if pair_day >= 0 else None,
+                    on_track=None if flag == UNKNOWN else bool(flag),
+                    updated_at=now
+                )
+    return len(changed)
+
+
+def forecast_metrics(today=None, chunk_size=20000):
+    """Forecast every KPIMetric from its progress history; returns rows changed"""
+    from .models import KPIMetric, MetricProgress
+
+    today = today or timezone.now().date()
+    rows = list(KPIMetric.objects.order_by('pk').values_list(
+        'pk', 'target_value', 'current_value', 'latest_progress_date', 'end_date',
+        'projected_attainment_date', 'on_track'
+    ).iterator(chunk_size=chunk_size))
+    if not rows:
+        return 0
+    ids, target, current, latest, end_date, stored_dates, stored_flags = zip(*rows)
+    ids = np.array(ids, dtype=np.int64)
+    target = np.array(target, dtype=float)
+    size = len(ids)
+
+    keys, x, y = _load_points(
+        MetricProgress.objects.order_by().values_list('metric_id', 'date_recorded', 'value').iterator(
+            chunk_size=chunk_size
+        ),
+        chunk_size
+    )
+    groups = np.searchsorted(ids, keys)
+    # Drop points of metrics created after the metric list was read
+    known = ids[np.minimum(groups, size - 1)] == keys
+    groups, x, y = groups[known], x[known], y[known]
+
+    today_day = (today - EPOCH).days
+    mean_x, mean_y, slope = linear_trends(groups, x, y, size)
+    day, on_track = project(
+        mean_x, mean_y, slope, target, _days(end_date),
+        np.array(current, dtype=float) >= target,
+        _days([d or today for d in latest]),
+        today_day
+    )
+    return _write(KPIMetric, ids, day, on_track, *_stored(stored_dates, stored_flags))
+
+
+def forecast_kpis(today=None, chunk_size=20000):
+    """Forecast every initiatives.KPI from baseline to current value; returns rows changed"""
+    from initiatives.models import KPI
+
+    today = today or timezone.now().date()
+    rows = list(KPI.objects.order_by('pk').annotate(
+        created_day=TruncDate('created_at'),
+        recorded_day=TruncDate(Coalesce('current_value_recorded_at', 'created_at'))
+    ).values_list(
+        'pk', 'baseline_value', 'current_value', 'target_value', 'created_day', 'recorded_day', 'target_date',
+        'projected_attainment_date', 'on_track'
+    ).iterator(chunk_size=chunk_size))
+    if not rows:
+        return 0
+    ids, baseline, current, target, created, recorded, target_date, stored_dates, stored_flags = zip(*rows)
+    ids = np.array(ids, dtype=np.int64)
+    current = np.array(current, dtype=float)
+    target = np.array(target, dtype=float)
+    recorded = _days(recorded)
+    size = len(ids)
+
+    index = np.arange(size)
+    groups = np.concatenate([index, index])
+    x = np.concatenate([_days(created), recorded]).astype(float)
+    y = np.concatenate([np.array([b or 0.0 for b in baseline]), current])
+
+    mean_x, mean_y, slope = linear_trends(groups, x, y, size)
+    day, on_track = project(
+        mean_x, mean_y, slope, target, _days(target_date), current >= target, recorded, (today - EPOCH).days
+    )
+    return _write(KPI, ids, day, on_track, *_stored(stored_dates, stored_flags))
@@ -0,0 +1,132 @@
+"""
+QuarterlyImpactReview metrics computed for every initiative at once.
+
+Quarters are fiscal quarters of the fiscal year named by the review's year
+(settings.FISCAL_YEAR_START_MONTH, as in the variance cube), so quarter 1
+of 2026 starts on the first day of the 2026 fiscal year. For each
+initiative running in the quarter, or already holding a review for it:
+
+    total_beneficiaries: total_participants of the latest DiversityMetric
+        recorded by the end of the quarter, else the number of distinct
+        participants assessed by then
+    skill_completion_rate: share of participants assessed by the end of the
+        quarter who have a post-program assessment
+    avg_confidence_score: mean confidence_score of assessments in the
+        quarter, else of all assessments up to its end; with none, an
+        existing review keeps its score and a new one has none
+    employment_rate: share of tracked participants (not NOT_SEEKING) who
+        are placed or self-employed by the end of the quarter
+    budget_utilized: FinancialTracking actual_amount for months in the
+        quarter
+    cost_per_beneficiary: budget_utilized / total_beneficiaries
+
+Each source is read with one grouped query over all initiatives, and the
+reviews are written with a single bulk upsert on (initiative, year,
+quarter). Narrative fields, prepared_by and reviewed_by of existing
+reviews are left alone. New reviews are prepared by the given member, or
+by the initiative's creator.
+"""
+import datetime
+from decimal import Decimal
+
+from django.db.models import Avg, Count, OuterRef, Q, Subquery, Sum
+
+from .employment import EMPLOYED
+from .variance import fiscal_year_bounds
+
+METRIC_FIELDS = (
+    'start_date', 'end_date', 'total_beneficiaries', 'skill_completion_rate', 'employment_rate',
+    'avg_confidence_score', 'budget_utilized', 'cost_per_beneficiary',
+)
+
+
+def quarter_bounds(year, quarter):
+    """First and last day of a fiscal quarter"""
+    start = fiscal_year_bounds(year)[0]
+    month = start.month - 1 + (quarter - 1) * 3
+    first = start.replace(year=start.year + month // 12, month=month % 12 + 1)
+    month += 3
+    return first, first.replace(year=start.year + month // 12, month=month % 12 + 1) - datetime.timedelta(days=1)
+
+
+def _percentage(part, whole):
+    return round(part / whole * 100, 2) if whole else 0.0
+
+
+def compute_quarter(year, quarter, prepared_by=None, initiative_ids=None):
+    """
+    Compute and upsert the reviews of one quarter. Returns (created,
+    updated) counts.
+    """
+    from initiatives.models import Initiative
+    from program_design.models import DiversityMetric
+
+    from .models import EmploymentTracking, FinancialTracking, QuarterlyImpactReview, SkillAssessment
+
+    start, end = quarter_bounds(year, quarter)
+    reviews = QuarterlyImpactReview.objects.filter(year=year, quarter=quarter)
+    initiatives = Initiative.objects.filter(
+        Q(start_date__lte=end, end_date__gte=start) | Q(pk__in=reviews.values('initiative_id'))
+    )
+    if initiative_ids is not None:
+        initiative_ids = list(initiative_ids)
+        initiatives = initiatives.filter(pk__in=initiative_ids)
+    rows = list(initiatives.order_by('pk').annotate(
+        beneficiaries=Subquery(
+            DiversityMetric.objects.filter(initiative=OuterRef('pk'), date_recorded__lte=end).order_by(
+                '-date_recorded', '-pk'
+            ).values('total_participants')[:1]
+        )
+    ).values_list('pk', 'created_by_id', 'beneficiaries'))
+    if not rows:
+        return 0, 0
+    ids = [pk for pk, _, _ in rows]
+
+    def grouped(queryset, **aggregates):
+        return {
+            row.pop('initiative_id'): row
+            for row in queryset.filter(initiative_id__in=ids).order_by().values('initiative_id').annotate(**aggregates)
+        }
+
+    skills = grouped(
+        SkillAssessment.objects.filter(assessment_date__lte=end),
+        assessed=Count('participant', distinct=True),
+        completed=Count('participant', distinct=True, filter=Q(assessment_type='POST')),
+        quarter_confidence=Avg('confidence_score', filter=Q(assessment_date__gte=start)),
+        confidence=Avg('confidence_score'),
+    )
+    employment = grouped(
+        EmploymentTracking.objects.filter(created_at__date__lte=end).exclude(status='NOT_SEEKING'),
+        tracked=Count('participant', distinct=True),
+        employed=Count(
+            'participant', distinct=True,
+            filter=Q(status__in=EMPLOYED) & (Q(placement_date__isnull=True) | Q(placement_date__lte=end))
+        ),
+    )
+    spend = grouped(FinancialTracking.objects.filter(month__gte=start, month__lte=end), spent=Sum('actual_amount'))
+    existing = dict(reviews.filter(initiative_id__in=ids).values_list('initiative_id', 'avg_confidence_score'))
+
+    cent = Decimal('0.01')
+    objs = []
+    for pk, created_by_id, beneficiaries in rows:
+        skill = skills.get(pk, {})
+        employed = employment.get(pk, {})
+        if beneficiaries is None:
+            beneficiaries = skill.get('assessed', 0)
+        budget_utilized = (spend.get(pk, {}).get('spent') or Decimal('0')).quantize(cent)
+        confidence = skill.get('quarter_confidence') or skill.get('confidence') or existing.get(pk)
+        objs.append(QuarterlyImpactReview(
+            initiative_id=pk, year=year, quarter=quarter, start_date=start, end_date=end,
+            total_beneficiaries=beneficiaries,
+            skill_completion_rate=_percentage(skill.get('completed', 0), skill.get('assessed', 0)),
+            employment_rate=_percentage(employed.get('employed', 0), employed.get('tracked', 0)),
+            avg_confidence_score=round(confidence, 2) if confidence is not None else None,
+            budget_utilized=budget_utilized,
+            cost_per_beneficiary=(budget_utilized / beneficiaries).quantize(cent) if beneficiaries else Decimal('0.00'),
+            prepared_by_id=prepared_by.pk if prepared_by else created_by_id,
+        ))
+    QuarterlyImpactReview.objects.bulk_create(
+        objs, batch_size=500, update_conflicts=True, unique_fields=['initiative', 'year', 'quarter'],
+        update_fields=[*METRIC_FIELDS, 'updated_at']
+    )
+    return len(objs) - len(existing), len(existing)
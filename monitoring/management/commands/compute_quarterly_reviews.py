@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from monitoring.impact_reviews import compute_quarter, quarter_bounds
+from users.models import Member
+
+
+class Command(BaseCommand):
+    help = "Compute quarterly impact review metrics for every initiative running in a fiscal quarter."
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int, help="Fiscal year, named after the calendar year it starts in")
+        parser.add_argument('quarter', type=int, choices=[1, 2, 3, 4])
+        parser.add_argument('--initiative', type=int, action='append', help="Only this initiative (repeatable)")
+        parser.add_argument(
+            '--prepared-by', help="Username of the member new reviews are prepared by (default: initiative creator)"
+        )
+
+    def handle(self, *args, **options):
+        prepared_by = None
+        if options['prepared_by']:
+            prepared_by = Member.objects.filter(user__username=options['prepared_by']).first()
+            if prepared_by is None:
+                raise CommandError(f"No member with username {options['prepared_by']!r}")
+        started = time.monotonic()
+        created, updated = compute_quarter(
+            options['year'], options['quarter'], prepared_by=prepared_by, initiative_ids=options['initiative']
+        )
+        start, end = quarter_bounds(options['year'], options['quarter'])
+        self.stdout.write(
+            f"Q{options['quarter']} {options['year']} ({start} to {end}): created {created} and updated {updated} "
+            f"reviews in {time.monotonic() - started:.1f}s"
+        )
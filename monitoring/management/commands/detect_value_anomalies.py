@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.anomalies import SERIES, scan
+
+
+class Command(BaseCommand):
+    help = "Recheck MetricProgress and SDGProgress values for anomalies and rebuild the running series statistics."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models', nargs='+', choices=sorted(SERIES), default=sorted(SERIES),
+            help="Progress models to scan"
+        )
+
+    def handle(self, *args, **options):
+        for label in options['models']:
+            created = scan(label)
+            self.stdout.write(f"{label}: {created} new anomalies")
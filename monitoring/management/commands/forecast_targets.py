@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from monitoring.forecasting import forecast_kpis, forecast_metrics
+
+
+class Command(BaseCommand):
+    help = "Project target attainment dates for KPI metrics and initiative KPIs. Meant to run nightly."
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        metrics = forecast_metrics()
+        kpis = forecast_kpis()
+        self.stdout.write(
+            f"Updated forecasts for {metrics} metrics and {kpis} KPIs in {time.monotonic() - started:.1f}s"
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.feedback import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-event and per-initiative feedback statistics, for backfills or after bulk imports."
+
+    def handle(self, *args, **options):
+        total = rebuild()
+        self.stdout.write(f"Rebuilt {total} feedback statistics rows")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute KPI metric period rollups and current values from MetricProgress."
+
+    def add_arguments(self, parser):
+        parser.add_argument('metric_ids', nargs='*', type=int, help="Limit to these metrics")
+
+    def handle(self, *args, **options):
+        written = rebuild(options['metric_ids'] or None)
+        self.stdout.write(f"Wrote {written} rollup rows")
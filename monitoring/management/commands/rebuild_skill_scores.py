@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from monitoring.skills import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = "Regenerate the skill score rows from SkillAssessment ratings, for backfills or after bulk imports."
+
+    def handle(self, *args, **options):
+        total = rebuild_scores()
+        self.stdout.write(f"Rebuilt {total} skill scores")
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0004_alter_datacollectiontemplate_description_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kpimetric',
+            name='latest_progress',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='monitoring.metricprogress'),
+        ),
+        migrations.AddField(
+            model_name='kpimetric',
+            name='latest_progress_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='MetricRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('WEEKLY', 'Weekly'), ('MONTHLY', 'Monthly'), ('QUARTERLY', 'Quarterly'), ('ANNUALLY', 'Annually')], max_length=20)),
+                ('period_start', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total', models.FloatField(default=0.0)),
+                ('minimum', models.FloatField()),
+                ('maximum', models.FloatField()),
+                ('last_value', models.FloatField()),
+                ('last_recorded', models.DateField()),
+                ('last_progress_id', models.BigIntegerField()),
+                ('metric', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='monitoring.kpimetric')),
+            ],
+            options={
+                'ordering': ['metric', 'period_start'],
+                'constraints': [models.UniqueConstraint(fields=('metric', 'period', 'period_start'), name='unique_metric_rollup_period')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0005_metric_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='kpimetric',
+            name='on_track',
+            field=models.BooleanField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='kpimetric',
+            name='projected_attainment_date',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+    ]
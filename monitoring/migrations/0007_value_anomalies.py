@@ -0,0 +1,53 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('monitoring', '0006_target_forecasts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeriesStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('series_id', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('mean', models.FloatField(default=0.0)),
+                ('m2', models.FloatField(default=0.0)),
+                ('window', models.JSONField(default=list, help_text='Most recent values, oldest first')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name_plural': 'Series statistics',
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'series_id'), name='unique_series_statistics')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ValueAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('series_id', models.PositiveIntegerField()),
+                ('value', models.FloatField()),
+                ('expected', models.FloatField(help_text='Rolling median of the series before this value')),
+                ('score', models.FloatField(blank=True, help_text='Distance from the median in robust standard deviations; empty when the series was flat at zero', null=True)),
+                ('reason', models.CharField(max_length=255)),
+                ('resolved', models.BooleanField(default=False, help_text='Checked and confirmed or corrected')),
+                ('detected_at', models.DateTimeField(auto_now_add=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name_plural': 'Value anomalies',
+                'ordering': ['resolved', '-detected_at'],
+                'indexes': [models.Index(fields=['content_type', 'series_id'], name='monitoring__content_56e598_idx'), models.Index(fields=['resolved'], name='monitoring__resolve_d8081e_idx')],
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id'), name='unique_value_anomaly')],
+            },
+        ),
+    ]
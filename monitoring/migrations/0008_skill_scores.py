@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('initiatives', '0019_actual_spend_maintained'),
+        ('monitoring', '0007_value_anomalies'),
+        ('users', '0002_alter_department_description_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assessment_type', models.CharField(choices=[('PRE', 'Pre-Program Assessment'), ('MID', 'Mid-Program Assessment'), ('POST', 'Post-Program Assessment'), ('FOLLOWUP', 'Follow-up Assessment')], max_length=20)),
+                ('assessment_date', models.DateField()),
+                ('category', models.CharField(choices=[('TECHNICAL', 'Technical'), ('SOFT', 'Soft')], max_length=20)),
+                ('skill', models.CharField(max_length=100)),
+                ('rating', models.FloatField()),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_scores', to='monitoring.skillassessment')),
+                ('initiative', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='initiatives.initiative')),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='users.member')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['initiative', 'skill', 'assessment_type'], name='monitoring__initiat_bfea61_idx'), models.Index(fields=['participant', 'skill', 'category', 'assessment_type', 'assessment_date'], name='monitoring__partici_30dd65_idx')],
+                'constraints': [models.UniqueConstraint(fields=('assessment', 'category', 'skill'), name='unique_skill_score')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('initiatives', '0019_actual_spend_maintained'),
+        ('monitoring', '0008_skill_scores'),
+        ('users', '0002_alter_department_description_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(help_text='Field values, validated against the template')),
+                ('batch', models.UUIDField(help_text='Shared by the responses ingested together')),
+                ('submitted_at', models.DateTimeField(auto_now_add=True)),
+                ('initiative', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='data_submissions', to='initiatives.initiative')),
+                ('submitted_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='data_submissions', to='users.member')),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='monitoring.datacollectiontemplate')),
+            ],
+            options={
+                'ordering': ['-submitted_at'],
+                'indexes': [models.Index(fields=['template', 'submitted_at'], name='monitoring__templat_679495_idx'), models.Index(fields=['batch'], name='monitoring__batch_bcdc9a_idx')],
+            },
+        ),
+    ]
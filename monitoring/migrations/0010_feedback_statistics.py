@@ -0,0 +1,99 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:29
+
+from collections import Counter, defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+# Frozen copy of monitoring.feedback.SOURCES as of this migration
+SCALE = range(1, 6)
+SOURCES = {
+    'initiatives.Feedback': ('event', 'event_id', {'rating': 'rating'}),
+    'monitoring.ParticipantFeedback': (
+        'event', 'event_id', {'rating': 'satisfaction_rating', 'confidence': 'confidence_improvement'}
+    ),
+    'program_design.ProgramFeedback': (
+        'initiative', 'initiative_id',
+        {'expectations_met': 'expectations_met', 'culturally_sensitive': 'culturally_sensitive'}
+    ),
+}
+
+
+def backfill_statistics(apps, schema_editor):
+    Event = apps.get_model('initiatives', 'Event')
+    FeedbackStatistics = apps.get_model('monitoring', 'FeedbackStatistics')
+
+    events = defaultdict(Counter)
+    initiatives = defaultdict(Counter)
+    for label, (scope, scope_field, values) in SOURCES.items():
+        if scope == 'event':
+            aggregates = {
+                'responses': Count('pk'),
+                'recommended': Count('pk', filter=Q(would_recommend=True)),
+                **{
+                    f'{prefix}_{i}': Count('pk', filter=Q(**{field: i}))
+                    for prefix, field in values.items() for i in SCALE
+                },
+            }
+        else:
+            aggregates = {
+                'program_responses': Count('pk'),
+                **{name: Count('pk', filter=Q(**{field: True})) for name, field in values.items()},
+            }
+        target = events if scope == 'event' else initiatives
+        for row in apps.get_model(label).objects.order_by().values(scope_field).annotate(**aggregates):
+            target[row.pop(scope_field)].update(row)
+
+    event_initiatives = dict(Event.objects.filter(pk__in=list(events)).values_list('pk', 'initiative_id'))
+    for event_id, counts in events.items():
+        initiatives[event_initiatives[event_id]].update(counts)
+
+    FeedbackStatistics.objects.bulk_create([
+        FeedbackStatistics(event_id=event_id, initiative_id=event_initiatives[event_id], **counts)
+        for event_id, counts in events.items()
+    ] + [
+        FeedbackStatistics(initiative_id=initiative_id, **counts)
+        for initiative_id, counts in initiatives.items()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('initiatives', '0019_actual_spend_maintained'),
+        ('monitoring', '0009_data_submissions'),
+        ('program_design', '0003_alter_cocreationworkshop_agenda_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('recommended', models.PositiveIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+                ('confidence_1', models.PositiveIntegerField(default=0)),
+                ('confidence_2', models.PositiveIntegerField(default=0)),
+                ('confidence_3', models.PositiveIntegerField(default=0)),
+                ('confidence_4', models.PositiveIntegerField(default=0)),
+                ('confidence_5', models.PositiveIntegerField(default=0)),
+                ('program_responses', models.PositiveIntegerField(default=0)),
+                ('expectations_met', models.PositiveIntegerField(default=0)),
+                ('culturally_sensitive', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='feedback_statistics', to='initiatives.event')),
+                ('initiative', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feedback_statistics', to='initiatives.initiative')),
+            ],
+            options={
+                'verbose_name_plural': 'Feedback statistics',
+                'constraints': [models.UniqueConstraint(condition=models.Q(('event__isnull', True)), fields=('initiative',), name='unique_initiative_feedback_statistics')],
+            },
+        ),
+        migrations.RunPython(backfill_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:47
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0010_feedback_statistics'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='seriesstatistics',
+            name='m2',
+        ),
+        migrations.RemoveField(
+            model_name='seriesstatistics',
+            name='mean',
+        ),
+    ]
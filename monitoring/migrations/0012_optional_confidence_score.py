@@ -0,0 +1,19 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:48
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0011_drop_series_moments'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quarterlyimpactreview',
+            name='avg_confidence_score',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(1.0), django.core.validators.MaxValueValidator(5.0)]),
+        ),
+    ]
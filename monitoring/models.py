@@ -1,5 +1,7 @@
 # monitoring/models.py
 from django.db import models
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.timezone import now
 from users.models import Member
@@ -36,6 +38,20 @@ class KPIMetric(models.Model):
     description = CustomRichTextField(blank=True)
     target_value = models.FloatField(validators=[MinValueValidator(0.0)])
     current_value = models.FloatField(default=0.0)
+    # Progress record current_value was taken from, kept by monitoring.rollups
+    latest_progress = models.ForeignKey(
+        'MetricProgress',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+'
+    )
+    latest_progress_date = models.DateField(null=True, blank=True, editable=False)
+    # Trend forecast written by monitoring.forecasting; on_track is null
+    # until there are enough progress records to fit a trend
+    projected_attainment_date = models.DateField(null=True, blank=True, editable=False)
+    on_track = models.BooleanField(null=True, blank=True, editable=False)
     unit_of_measure = models.CharField(max_length=50)
     monitoring_frequency = models.CharField(
         max_length=20,
@@ -66,6 +82,19 @@ class KPIMetric(models.Model):
     def __str__(self):
         return f"{self.name} - {self.initiative.name}"
 
+    def save(self, *args, **kwargs):
+        # Once progress records drive current_value it is only changed by
+        # monitoring.rollups; a stale instance must not write it back
+        if self.pk and not self._state.adding and kwargs.get('update_fields') is None:
+            derived = {'latest_progress', 'latest_progress_date', 'projected_attainment_date', 'on_track'}
+            if self.latest_progress_id:
+                derived.add('current_value')
+            kwargs['update_fields'] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in derived
+            ]
+        super().save(*args, **kwargs)
+
     def completion_percentage(self):
         if self.target_value == 0:
             return 0
@@ -99,6 +128,103 @@ class MetricProgress(models.Model):
     def __str__(self):
         return f"{self.metric.name} Progress - {self.date_recorded}"
 
+
+class MetricRollup(models.Model):
+    """
+    MetricProgress aggregated per metric and period (the metric's
+    monitoring_frequency). Maintained by monitoring.rollups.
+    """
+    metric = models.ForeignKey(
+        KPIMetric,
+        on_delete=models.CASCADE,
+        related_name='rollups'
+    )
+    period = models.CharField(max_length=20, choices=KPIMetric.FREQUENCY_CHOICES)
+    period_start = models.DateField()
+    count = models.PositiveIntegerField(default=0)
+    total = models.FloatField(default=0.0)
+    minimum = models.FloatField()
+    maximum = models.FloatField()
+    last_value = models.FloatField()
+    last_recorded = models.DateField()
+    last_progress_id = models.BigIntegerField()
+
+    class Meta:
+        ordering = ['metric', 'period_start']
+        constraints = [
+            models.UniqueConstraint(fields=['metric', 'period', 'period_start'], name='unique_metric_rollup_period')
+        ]
+
+    def __str__(self):
+        return f"{self.metric.name} {self.get_period_display()} {self.period_start}"
+
+    @property
+    def average(self):
+        return self.total / self.count if self.count else None
+
+
+class SeriesStatistics(models.Model):
+    """
+    Running statistics of one progress series (a KPIMetric's MetricProgress
+    or an SDGMapping's SDGProgress), kept by monitoring.anomalies so a new
+    value is checked without reading the series history.
+    """
+    # Content type of the progress records, not of the series owner
+    content_type = models.ForeignKey(
+        'contenttypes.ContentType',
+        on_delete=models.CASCADE
+    )
+    series_id = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    window = models.JSONField(default=list, help_text="Most recent values, oldest first")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Series statistics"
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'series_id'], name='unique_series_statistics')
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.name} series #{self.series_id}"
+
+
+class ValueAnomaly(models.Model):
+    """A progress value that stands out from its series, see monitoring.anomalies"""
+    # Generic foreign key to the flagged MetricProgress or SDGProgress
+    content_type = models.ForeignKey(
+        'contenttypes.ContentType',
+        on_delete=models.CASCADE
+    )
+    object_id = models.PositiveIntegerField()
+    record = GenericForeignKey('content_type', 'object_id')
+    # KPIMetric or SDGMapping the record belongs to
+    series_id = models.PositiveIntegerField()
+    value = models.FloatField()
+    expected = models.FloatField(help_text="Rolling median of the series before this value")
+    score = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Distance from the median in robust standard deviations; empty when the series was flat at zero"
+    )
+    reason = models.CharField(max_length=255)
+    resolved = models.BooleanField(default=False, help_text="Checked and confirmed or corrected")
+    detected_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name_plural = "Value anomalies"
+        ordering = ['resolved', '-detected_at']
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='unique_value_anomaly')
+        ]
+        indexes = [
+            models.Index(fields=['content_type', 'series_id']),
+            models.Index(fields=['resolved'])
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.name} #{self.object_id}: {self.reason}"
+
 class ParticipantFeedback(models.Model):
     SATISFACTION_CHOICES = [
         (1, 'Very Dissatisfied'),
@@ -140,6 +266,85 @@ class ParticipantFeedback(models.Model):
     def __str__(self):
         return f"Feedback - {self.event.name} ({self.submission_date})"
 
+class FeedbackStatistics(models.Model):
+    """
+    Feedback counters of one event, or of a whole initiative when event is
+    empty, kept by monitoring.feedback
+    """
+    initiative = models.ForeignKey(
+        Initiative,
+        on_delete=models.CASCADE,
+        related_name='feedback_statistics'
+    )
+    event = models.OneToOneField(
+        Event,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='feedback_statistics'
+    )
+    # Event feedback (initiatives.Feedback and ParticipantFeedback)
+    responses = models.PositiveIntegerField(default=0)
+    recommended = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    # ParticipantFeedback.confidence_improvement
+    confidence_1 = models.PositiveIntegerField(default=0)
+    confidence_2 = models.PositiveIntegerField(default=0)
+    confidence_3 = models.PositiveIntegerField(default=0)
+    confidence_4 = models.PositiveIntegerField(default=0)
+    confidence_5 = models.PositiveIntegerField(default=0)
+    # program_design.ProgramFeedback, initiative rows only
+    program_responses = models.PositiveIntegerField(default=0)
+    expectations_met = models.PositiveIntegerField(default=0)
+    culturally_sensitive = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Feedback statistics"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['initiative'],
+                condition=models.Q(event__isnull=True),
+                name='unique_initiative_feedback_statistics'
+            )
+        ]
+
+    def __str__(self):
+        return f"Feedback statistics - {self.event or self.initiative}"
+
+    def rating_histogram(self):
+        return [getattr(self, f'rating_{i}') for i in range(1, 6)]
+
+    def confidence_histogram(self):
+        return [getattr(self, f'confidence_{i}') for i in range(1, 6)]
+
+    @staticmethod
+    def _mean(histogram):
+        count = sum(histogram)
+        return sum(i * n for i, n in enumerate(histogram, 1)) / count if count else None
+
+    def rating_mean(self):
+        return self._mean(self.rating_histogram())
+
+    def confidence_mean(self):
+        return self._mean(self.confidence_histogram())
+
+    def recommend_share(self):
+        """Percentage of responses that would recommend"""
+        return self.recommended / self.responses * 100 if self.responses else None
+
+    def recommend_score(self):
+        """NPS-style score: share recommending minus share not recommending, -100 to 100"""
+        return (2 * self.recommended - self.responses) / self.responses * 100 if self.responses else None
+
+    def expectations_met_share(self):
+        return self.expectations_met / self.program_responses * 100 if self.program_responses else None
+
+
 class MonitoringCheckIn(models.Model):
     CHECK_IN_TYPES = [
         ('WEEKLY', 'Weekly Check-in'),
@@ -218,6 +423,52 @@ class DataCollectionTemplate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_template_type_display()})"
 
+    def clean(self):
+        from .submissions import TemplateDefinitionError, compile_template
+        # Inactive templates take no submissions, so older definitions that
+        # don't compile can still be edited once switched off
+        if not self.is_active:
+            return
+        try:
+            compile_template(self.fields)
+        except TemplateDefinitionError as e:
+            raise ValidationError({'fields': f'{e}; fix it or make the template inactive'})
+
+
+class DataSubmission(models.Model):
+    """One response collected with a DataCollectionTemplate, see monitoring.submissions"""
+    template = models.ForeignKey(
+        DataCollectionTemplate,
+        on_delete=models.CASCADE,
+        related_name='submissions'
+    )
+    initiative = models.ForeignKey(
+        Initiative,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='data_submissions'
+    )
+    data = models.JSONField(help_text="Field values, validated against the template")
+    batch = models.UUIDField(help_text="Shared by the responses ingested together")
+    submitted_by = models.ForeignKey(
+        Member,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='data_submissions'
+    )
+    submitted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['template', 'submitted_at']),
+            models.Index(fields=['batch'])
+        ]
+
+    def __str__(self):
+        return f"{self.template.name} response #{self.pk}"
+
 class MonitoringReport(models.Model):
     REPORT_TYPES = [
         ('WEEKLY', 'Weekly Progress Report'),
@@ -320,6 +571,15 @@ class EmploymentTracking(models.Model):
     def __str__(self):
         return f"{self.participant.user.get_full_name()} - {self.status}"
 
+    @classmethod
+    def from_db(cls , db , field_names , values):
+        instance = super().from_db(db , field_names , values)
+        # Remember the initiative, so moving the record also drops the old
+        # initiative's cohort statistics
+        if 'initiative_id' in instance.__dict__:
+            instance._previous_initiative_id = instance.initiative_id
+        return instance
+
 
 class SkillAssessment(models.Model):
     ASSESSMENT_TYPES = [
@@ -364,6 +624,52 @@ class SkillAssessment(models.Model):
         return f"{self.participant.user.get_full_name()} - {self.get_assessment_type_display()}"
 
 
+class SkillScore(models.Model):
+    """
+    One skill rating of a SkillAssessment, kept in step with its JSON fields
+    by monitoring.skills so ratings can be aggregated in SQL
+    """
+    CATEGORIES = [
+        ('TECHNICAL' , 'Technical') ,
+        ('SOFT' , 'Soft')
+    ]
+
+    assessment = models.ForeignKey(
+        SkillAssessment ,
+        on_delete=models.CASCADE ,
+        related_name='skill_scores'
+    )
+    # Copied from the assessment so pre/post comparisons need no join
+    participant = models.ForeignKey(
+        'users.Member' ,
+        on_delete=models.CASCADE ,
+        related_name='+'
+    )
+    initiative = models.ForeignKey(
+        'initiatives.Initiative' ,
+        on_delete=models.CASCADE ,
+        related_name='+'
+    )
+    assessment_type = models.CharField(max_length=20 , choices=SkillAssessment.ASSESSMENT_TYPES)
+    assessment_date = models.DateField()
+    category = models.CharField(max_length=20 , choices=CATEGORIES)
+    # Lower-cased with whitespace collapsed, so "Excel" and " excel" match
+    skill = models.CharField(max_length=100)
+    rating = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['assessment' , 'category' , 'skill'] , name='unique_skill_score')
+        ]
+        indexes = [
+            models.Index(fields=['initiative' , 'skill' , 'assessment_type']) ,
+            models.Index(fields=['participant' , 'skill' , 'category' , 'assessment_type' , 'assessment_date'])
+        ]
+
+    def __str__(self):
+        return f"{self.skill}: {self.rating}"
+
+
 class WeeklyProgress(models.Model):
     PROGRESS_STATUS = [
         ('ON_TRACK' , 'On Track') ,
@@ -431,6 +737,8 @@ class QuarterlyImpactReview(models.Model):
         validators=[MinValueValidator(0.0) , MaxValueValidator(100.0)]
     )
     avg_confidence_score = models.FloatField(
+        null=True ,
+        blank=True ,
         validators=[MinValueValidator(1.0) , MaxValueValidator(5.0)]
     )
 
@@ -532,6 +840,19 @@ class FinancialTracking(models.Model):
     def __str__(self):
         return f"{self.initiative.name} - {self.get_category_display()} - {self.month}"
 
+    @classmethod
+    def from_db(cls , db , field_names , values):
+        instance = super().from_db(db , field_names , values)
+        # Remember the month, so moving the record to another fiscal year
+        # also drops the old year's variance cube
+        if 'month' in instance.__dict__:
+            instance._previous_month = instance.month
+        return instance
+
+    def spend_contribution(self):
+        from initiatives.spending import spend_contribution
+        return spend_contribution(self.initiative_id , self.actual_amount)
+
     def variance_amount(self):
         return self.actual_amount - self.budgeted_amount
 
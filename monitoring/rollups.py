@@ -0,0 +1,228 @@
+"""
+Rollups of MetricProgress.
+
+KPIMetric.current_value follows the latest progress record (latest
+date_recorded, then highest id), and MetricRollup keeps count, sum, min,
+max and last value per metric and period, the period being the metric's
+monitoring_frequency.
+
+A new record is folded in with one conditional UPDATE on the metric and one
+upsert on its bucket. Edits and deletes can't be undone from a sum and a
+min/max, so they re-aggregate just the buckets involved, which hold at most
+one period of raw rows. rebuild_metric_rollups recomputes everything.
+"""
+from collections import namedtuple
+import datetime
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+Bucket = namedtuple('Bucket', ['count', 'total', 'minimum', 'maximum', 'last_value', 'last_recorded', 'last_progress_id'])
+
+
+def period_start(date, period):
+    if period == 'WEEKLY':
+        return date - datetime.timedelta(days=date.weekday())
+    if period == 'MONTHLY':
+        return date.replace(day=1)
+    if period == 'QUARTERLY':
+        return date.replace(month=(date.month - 1) // 3 * 3 + 1, day=1)
+    return date.replace(month=1, day=1)
+
+
+def _is_later(date, pk):
+    """Q matching rollup or metric rows whose 'latest' is older than (date, pk)"""
+    return Q(last_recorded__lt=date) | Q(last_recorded=date, last_progress_id__lt=pk)
+
+
+def record_added(progress):
+    """Fold a newly inserted MetricProgress into its metric and bucket"""
+    from .models import KPIMetric, MetricRollup
+
+    KPIMetric.objects.filter(pk=progress.metric_id).filter(
+        Q(latest_progress_date__isnull=True)
+        | Q(latest_progress_date__lt=progress.date_recorded)
+        | Q(latest_progress_date=progress.date_recorded, latest_progress_id__lt=progress.pk)
+    ).update(
+        current_value=progress.value,
+        latest_progress=progress.pk,
+        latest_progress_date=progress.date_recorded,
+        updated_at=timezone.now()
+    )
+
+    period = KPIMetric.objects.filter(pk=progress.metric_id).values_list('monitoring_frequency', flat=True).first()
+    if period is None:
+        return
+    start = period_start(progress.date_recorded, period)
+    bucket = MetricRollup.objects.filter(metric_id=progress.metric_id, period=period, period_start=start)
+    newer = _is_later(progress.date_recorded, progress.pk)
+    changes = dict(
+        count=F('count') + 1,
+        total=F('total') + progress.value,
+        minimum=Least(F('minimum'), Value(progress.value)),
+        maximum=Greatest(F('maximum'), Value(progress.value)),
+        last_value=Case(
+            When(newer, then=Value(progress.value)), default=F('last_value'), output_field=models.FloatField()
+        ),
+        last_recorded=Case(
+            When(newer, then=Value(progress.date_recorded)), default=F('last_recorded'), output_field=models.DateField()
+        ),
+        last_progress_id=Case(
+            When(newer, then=Value(progress.pk)), default=F('last_progress_id'), output_field=models.BigIntegerField()
+        ),
+    )
+    if bucket.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            MetricRollup.objects.create(
+                metric_id=progress.metric_id, period=period, period_start=start,
+                count=1, total=progress.value, minimum=progress.value, maximum=progress.value,
+                last_value=progress.value, last_recorded=progress.date_recorded, last_progress_id=progress.pk
+            )
+    except IntegrityError:
+        # Another writer created the bucket first
+        bucket.update(**changes)
+
+
+def refresh_buckets(keys):
+    """Re-aggregate the buckets holding the given (metric_id, date) pairs"""
+    from .models import KPIMetric, MetricProgress, MetricRollup
+
+    keys = {key for key in keys if key[0]}
+    if not keys:
+        return
+    metric_ids = {metric_id for metric_id, _ in keys}
+    periods = dict(KPIMetric.objects.filter(pk__in=metric_ids).values_list('pk', 'monitoring_frequency'))
+    for metric_id, date in keys:
+        if metric_id not in periods:
+            continue
+        period = periods[metric_id]
+        start = period_start(date, period)
+        rows = MetricProgress.objects.filter(
+            metric_id=metric_id,
+            date_recorded__gte=start,
+            date_recorded__lt=_next_period(start, period)
+        ).order_by('date_recorded', 'pk').values_list('pk', 'date_recorded', 'value')
+        bucket = _aggregate(rows)
+        lookup = dict(metric_id=metric_id, period=period, period_start=start)
+        if bucket is None:
+            MetricRollup.objects.filter(**lookup).delete()
+        else:
+            MetricRollup.objects.update_or_create(defaults=bucket._asdict(), **lookup)
+    refresh_current_values(metric_ids)
+
+
+def refresh_current_values(metric_ids):
+    """Point current_value of each metric at its latest progress record"""
+    from .models import KPIMetric, MetricProgress
+
+    for metric_id in metric_ids:
+        latest = MetricProgress.objects.filter(metric_id=metric_id).order_by(
+            '-date_recorded', '-pk'
+        ).values_list('pk', 'date_recorded', 'value').first()
+        if latest:
+            KPIMetric.objects.filter(pk=metric_id).update(
+                latest_progress=latest[0], latest_progress_date=latest[1], current_value=latest[2],
+                updated_at=timezone.now()
+            )
+        else:
+            KPIMetric.objects.filter(pk=metric_id).update(
+                latest_progress=None, latest_progress_date=None, updated_at=timezone.now()
+            )
+
+
+def _next_period(start, period):
+    if period == 'WEEKLY':
+        return start + datetime.timedelta(days=7)
+    months = {'MONTHLY': 1, 'QUARTERLY': 3}.get(period, 12)
+    month = start.month - 1 + months
+    return start.replace(year=start.year + month // 12, month=month % 12 + 1)
+
+
+def _fold(bucket, pk, date, value):
+    """Add one row to a bucket; rows must arrive sorted by date then pk"""
+    if bucket is None:
+        return Bucket(1, value, value, value, value, date, pk)
+    return Bucket(
+        bucket.count + 1, bucket.total + value,
+        min(bucket.minimum, value), max(bucket.maximum, value),
+        value, date, pk
+    )
+
+
+def _aggregate(rows):
+    """Bucket from (pk, date, value) rows sorted by date then pk"""
+    bucket = None
+    for pk, date, value in rows:
+        bucket = _fold(bucket, pk, date, value)
+    return bucket
+
+
+def rebuild(metric_ids=None, chunk_size=5000):
+    """Recompute all rollups and current values; returns the number of buckets written"""
+    from .models import KPIMetric, MetricProgress, MetricRollup
+
+    metrics = KPIMetric.objects.all()
+    if metric_ids is not None:
+        metrics = metrics.filter(pk__in=metric_ids)
+    periods = dict(metrics.values_list('pk', 'monitoring_frequency'))
+
+    written = 0
+    now = timezone.now()
+    ids = sorted(periods)
+    for offset in range(0, len(ids), 500):
+        batch = ids[offset:offset + 500]
+        rows = MetricProgress.objects.filter(metric_id__in=batch).order_by(
+            'metric_id', 'date_recorded', 'pk'
+        ).values_list('metric_id', 'pk', 'date_recorded', 'value').iterator(chunk_size=chunk_size)
+
+        buckets = {}
+        latest = {}
+        for metric_id, pk, date, value in rows:
+            key = (metric_id, period_start(date, periods[metric_id]))
+            buckets[key] = _fold(buckets.get(key), pk, date, value)
+            latest[metric_id] = (pk, date, value)
+
+        metrics_to_update = []
+        for metric_id in batch:
+            pk, date, value = latest.get(metric_id, (None, None, None))
+            metric = KPIMetric(pk=metric_id, latest_progress_id=pk, latest_progress_date=date, updated_at=now)
+            fields = ['latest_progress', 'latest_progress_date', 'updated_at']
+            if pk is not None:
+                metric.current_value = value
+                fields.append('current_value')
+            metrics_to_update.append((metric, tuple(fields)))
+
+        with transaction.atomic():
+            MetricRollup.objects.filter(metric_id__in=batch).delete()
+            MetricRollup.objects.bulk_create([
+                MetricRollup(metric_id=metric_id, period=periods[metric_id], period_start=start, **bucket._asdict())
+                for (metric_id, start), bucket in buckets.items()
+            ], batch_size=1000)
+            for fields in {fields for _, fields in metrics_to_update}:
+                KPIMetric.objects.bulk_update(
+                    [metric for metric, f in metrics_to_update if f == fields], fields, batch_size=500
+                )
+        written += len(buckets)
+    return written
+
+
+def metric_series(metric_ids, since=None):
+    """
+    Chart data per metric from the rollup table: {metric_id: [(period_start,
+    count, average, minimum, maximum, last_value), ...]}
+    """
+    from .models import MetricRollup
+
+    rollups = MetricRollup.objects.filter(metric_id__in=metric_ids)
+    if since is not None:
+        rollups = rollups.filter(period_start__gte=since)
+    series = {metric_id: [] for metric_id in metric_ids}
+    for metric_id, start, count, total, minimum, maximum, last_value in rollups.order_by(
+        'metric_id', 'period_start'
+    ).values_list('metric_id', 'period_start', 'count', 'total', 'minimum', 'maximum', 'last_value'):
+        series[metric_id].append((start, count, total / count, minimum, maximum, last_value))
+    return series
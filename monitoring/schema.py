@@ -0,0 +1,63 @@
+import graphene
+from graphql_jwt.decorators import login_required
+
+from initiatives.models import Initiative
+from .models import DataCollectionTemplate
+from .submissions import TemplateDefinitionError , ingest
+
+
+class SubmissionRowError(graphene.ObjectType):
+    row = graphene.Int(description="Index of the response in the submitted list")
+    errors = graphene.JSONString(description="Messages by field name, __all__ for the whole response")
+
+
+class SubmitTemplateResponsesMutation(graphene.Mutation):
+    class Arguments:
+        template_id = graphene.ID(required=True)
+        responses = graphene.JSONString(required=True , description="List of objects of field values")
+        initiative_id = graphene.ID()
+        atomic = graphene.Boolean(default_value=False , description="Store nothing unless every response is valid")
+
+    success = graphene.Boolean()
+    batch = graphene.String()
+    stored = graphene.Int()
+    row_errors = graphene.List(SubmissionRowError)
+    errors = graphene.List(graphene.String)
+
+    @login_required
+    def mutate(self , info , template_id , responses , initiative_id=None , atomic=False):
+        user = info.context.user
+        if not user.has_perm('monitoring.add_datasubmission'):
+            return SubmitTemplateResponsesMutation(success=False , stored=0 , errors=["Permission denied"])
+        template = DataCollectionTemplate.objects.filter(pk=template_id).first()
+        if template is None:
+            return SubmitTemplateResponsesMutation(success=False , stored=0 , errors=[f"Unknown template {template_id}"])
+        initiative = None
+        if initiative_id is not None:
+            initiative = Initiative.objects.filter(pk=initiative_id).first()
+            if initiative is None:
+                return SubmitTemplateResponsesMutation(
+                    success=False , stored=0 , errors=[f"Unknown initiative {initiative_id}"]
+                )
+        if not isinstance(responses , list):
+            return SubmitTemplateResponsesMutation(success=False , stored=0 , errors=["responses must be a list"])
+
+        try:
+            batch , stored , row_errors = ingest(
+                template , responses , submitted_by=getattr(user , 'member_profile' , None) ,
+                initiative=initiative , atomic=atomic
+            )
+        except TemplateDefinitionError as e:
+            return SubmitTemplateResponsesMutation(success=False , stored=0 , errors=[str(e)])
+
+        return SubmitTemplateResponsesMutation(
+            success=not row_errors ,
+            batch=str(batch) if stored else None ,
+            stored=stored ,
+            row_errors=[SubmissionRowError(**error) for error in row_errors] ,
+            errors=None
+        )
+
+
+class Mutation(graphene.ObjectType):
+    submit_template_responses = SubmitTemplateResponsesMutation.Field()
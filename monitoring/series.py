@@ -0,0 +1,120 @@
+"""
+Downsampled chart series for progress and budget history.
+
+A series is every MetricProgress of a KPIMetric, every SDGProgress of an
+SDGMapping, or the monthly actual spend of an AnnualBudget (BudgetTracking
+summed over categories). It is fetched with one values_list query and
+reduced to at most the requested number of points with
+largest-triangle-three-buckets (LTTB): the first and last points are kept,
+the rest are split into equal buckets, and from each bucket the point
+forming the largest triangle with the point kept before it and the average
+of the next bucket is kept. Peaks and dips survive, unlike with averaging
+or striding.
+
+Results are cached per series, date range and point count. Each series has
+a version number that any save or delete of one of its records bumps, so
+only charts of the series that changed are dropped.
+"""
+import datetime
+
+import numpy as np
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import Sum
+
+from utils.cache import bump_cache_version, cache_version
+
+SERIES_CACHE_TIMEOUT = 60 * 60 * 24
+DEFAULT_POINTS = 500
+MAX_POINTS = 2000
+
+# Kind: (record model, series foreign key column, date field, value field, sum values per date)
+SOURCES = {
+    'metric': ('monitoring.MetricProgress', 'metric_id', 'date_recorded', 'value', False),
+    'sdg': ('documentation.SDGProgress', 'sdg_mapping_id', 'record_date', 'value', False),
+    'budget': ('sustainability.BudgetTracking', 'annual_budget_id', 'month', 'actual_amount', True),
+}
+KIND_BY_LABEL = {source[0]: kind for kind, source in SOURCES.items()}
+
+
+def series_owner(kind):
+    """Model a series belongs to (KPIMetric, SDGMapping, AnnualBudget)"""
+    label, series_field = SOURCES[kind][:2]
+    return apps.get_model(label)._meta.get_field(series_field[:-3]).related_model
+
+
+def _version_key(kind, series_id):
+    return f'series:{kind}:{series_id}:version'
+
+
+def invalidate_series(kind, *series_ids):
+    for series_id in series_ids:
+        if series_id:
+            bump_cache_version(_version_key(kind, series_id))
+
+
+def lttb(x, y, threshold):
+    """Indexes of at most threshold points of (x, y), x sorted, chosen by LTTB"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    # Bucket i covers bounds[i]:bounds[i + 1]; the first and last points
+    # are kept on their own
+    every = (n - 2) / (threshold - 2)
+    bounds = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+    sizes = np.diff(bounds)
+    mean_x = np.append(np.add.reduceat(x, bounds[:-1]) / sizes, x[-1])
+    mean_y = np.append(np.add.reduceat(y, bounds[:-1]) / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        # Twice the triangle area, constant factor dropped
+        areas = np.abs(
+            (x[a] - mean_x[i + 1]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (mean_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def build_series(kind, series_id, start=None, end=None, points=DEFAULT_POINTS):
+    label, series_field, date_field, value_field, summed = SOURCES[kind]
+    records = apps.get_model(label).objects.filter(**{series_field: series_id})
+    if start:
+        records = records.filter(**{f'{date_field}__gte': start})
+    if end:
+        records = records.filter(**{f'{date_field}__lte': end})
+    if summed:
+        rows = records.order_by(date_field).values(date_field).annotate(total=Sum(value_field)).values_list(
+            date_field, 'total'
+        )
+    else:
+        rows = records.order_by(date_field, 'pk').values_list(date_field, value_field)
+    rows = list(rows)
+
+    x = np.fromiter((row[0].toordinal() for row in rows), dtype=np.float64, count=len(rows))
+    y = np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows))
+    keep = lttb(x, y, points)
+    return {
+        'series': kind,
+        'id': series_id,
+        'start': start,
+        'end': end,
+        'total_points': len(rows),
+        'points': [[datetime.date.fromordinal(int(x[i])), float(y[i])] for i in keep],
+    }
+
+
+def get_series(kind, series_id, start=None, end=None, points=DEFAULT_POINTS):
+    points = max(3, min(points, MAX_POINTS))
+    key = f'series:{kind}:{series_id}:{cache_version(_version_key(kind, series_id))}:{start}:{end}:{points}'
+    data = cache.get(key)
+    if data is None:
+        data = build_series(kind, series_id, start, end, points)
+        cache.set(key, data, SERIES_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,168 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from initiatives.models import Event
+
+from . import anomalies, employment, feedback, rollups, series, skills, submissions, variance
+from .models import (
+    DataCollectionTemplate, EmploymentTracking, FinancialTracking, KPIMetric, MetricProgress, SkillAssessment
+)
+
+
+@receiver(pre_save, sender=MetricProgress)
+@receiver(pre_delete, sender=MetricProgress)
+def remember_rollup_key(sender, instance, raw=False, **kwargs):
+    # The bucket the stored row was rolled into, so moving a record to
+    # another date or metric fixes up the old bucket too. Read from the
+    # database rather than the instance, which may have been loaded before
+    # someone else moved the record.
+    if instance.pk and not raw:
+        instance._rollup_key = MetricProgress.objects.filter(pk=instance.pk).values_list(
+            'metric_id', 'date_recorded'
+        ).first()
+
+
+@receiver(post_save, sender=MetricProgress)
+def roll_up_progress(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.record_added(instance)
+    else:
+        rollups.refresh_buckets({
+            getattr(instance, '_rollup_key', None) or (None, None),
+            (instance.metric_id, instance.date_recorded)
+        })
+
+
+@receiver(post_delete, sender=MetricProgress)
+def remove_progress_rollup(sender, instance, **kwargs):
+    rollups.refresh_buckets({getattr(instance, '_rollup_key', None) or (instance.metric_id, instance.date_recorded)})
+
+
+@receiver(pre_save, sender=KPIMetric)
+def remember_monitoring_frequency(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_frequency = KPIMetric.objects.filter(pk=instance.pk).values_list(
+            'monitoring_frequency', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=KPIMetric)
+def rebucket_on_frequency_change(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_frequency', None)
+    if not created and not raw and previous and previous != instance.monitoring_frequency:
+        rollups.rebuild([instance.pk])
+
+
+@receiver(post_save, sender=FinancialTracking)
+@receiver(post_delete, sender=FinancialTracking)
+def invalidate_variance_cube(sender, instance, **kwargs):
+    variance.invalidate_cube(instance.month, getattr(instance, '_previous_month', None))
+    instance._previous_month = instance.month
+
+
+@receiver(post_save, sender=EmploymentTracking)
+@receiver(post_delete, sender=EmploymentTracking)
+def invalidate_employment_cohorts(sender, instance, **kwargs):
+    employment.invalidate_cohorts(instance.initiative_id, getattr(instance, '_previous_initiative_id', None))
+    instance._previous_initiative_id = instance.initiative_id
+
+
+@receiver(post_save, sender=DataCollectionTemplate)
+@receiver(post_delete, sender=DataCollectionTemplate)
+def forget_template_validator(sender, instance, **kwargs):
+    submissions.forget_validator(instance.pk)
+
+
+@receiver(post_save, sender=SkillAssessment)
+def sync_skill_scores(sender, instance, raw=False, **kwargs):
+    if not raw:
+        skills.sync_scores(instance)
+
+
+def load_feedback_contribution(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance._state.adding or not instance.pk:
+        instance._feedback_contribution = None
+        return
+    fields = feedback.fields(sender._meta.label)
+    current = sender.objects.filter(pk=instance.pk).values(*fields).first()
+    instance._feedback_contribution = feedback.contribution(sender._meta.label, current) if current else None
+
+
+def update_feedback_statistics(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    new = feedback.record_contribution(instance)
+    feedback.apply_feedback_delta(getattr(instance, '_feedback_contribution', None), new)
+    instance._feedback_contribution = new
+
+
+def remove_feedback_statistics(sender, instance, **kwargs):
+    feedback.apply_feedback_delta(feedback.record_contribution(instance), None)
+
+
+@receiver(pre_save, sender=Event)
+def remember_event_initiative(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw and not instance._state.adding:
+        instance._previous_initiative_id = Event.objects.filter(pk=instance.pk).values_list(
+            'initiative_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Event)
+def move_event_feedback_statistics(sender, instance, created, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_initiative_id', None)
+    if not created and not raw and previous and previous != instance.initiative_id:
+        feedback.move_event(instance.pk, previous, instance.initiative_id)
+    instance._previous_initiative_id = instance.initiative_id
+
+
+def remember_series(sender, instance, raw=False, **kwargs):
+    # A record moved to another series must also leave the old one
+    if instance.pk and not raw:
+        series_field = series.SOURCES[series.KIND_BY_LABEL[sender._meta.label]][1]
+        instance._previous_series = sender.objects.filter(pk=instance.pk).values_list(series_field, flat=True).first()
+
+
+def check_progress_value(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        anomalies.record_added(instance)
+    else:
+        series_field = anomalies.SERIES[sender._meta.label][0]
+        series_ids = {getattr(instance, series_field), getattr(instance, '_previous_series', None)} - {None}
+        anomalies.scan(sender._meta.label, series_ids)
+
+
+def forget_progress_value(sender, instance, **kwargs):
+    anomalies.record_removed(instance)
+
+
+def invalidate_series_charts(sender, instance, **kwargs):
+    kind = series.KIND_BY_LABEL[sender._meta.label]
+    series.invalidate_series(
+        kind, getattr(instance, series.SOURCES[kind][1]), getattr(instance, '_previous_series', None)
+    )
+
+
+for label in series.KIND_BY_LABEL:
+    model = apps.get_model(label)
+    pre_save.connect(remember_series, sender=model, dispatch_uid=f'series-pre-save-{label}')
+    post_save.connect(invalidate_series_charts, sender=model, dispatch_uid=f'series-post-save-{label}')
+    post_delete.connect(invalidate_series_charts, sender=model, dispatch_uid=f'series-post-delete-{label}')
+
+for label in anomalies.SERIES:
+    model = apps.get_model(label)
+    post_save.connect(check_progress_value, sender=model, dispatch_uid=f'anomalies-post-save-{label}')
+    post_delete.connect(forget_progress_value, sender=model, dispatch_uid=f'anomalies-post-delete-{label}')
+
+for label in feedback.SOURCES:
+    model = apps.get_model(label)
+    pre_save.connect(load_feedback_contribution, sender=model, dispatch_uid=f'feedback-pre-save-{label}')
+    post_save.connect(update_feedback_statistics, sender=model, dispatch_uid=f'feedback-post-save-{label}')
+    post_delete.connect(remove_feedback_statistics, sender=model, dispatch_uid=f'feedback-post-delete-{label}')
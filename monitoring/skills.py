@@ -0,0 +1,119 @@
+"""
+Skill ratings of SkillAssessment as rows.
+
+technical_skills and soft_skills are JSON objects of skill: rating pairs.
+Each pair is stored as a SkillScore with the assessment's participant,
+initiative, type and date copied alongside, so cohort questions are
+indexed aggregate queries instead of parsing every blob. Skill names are
+lower-cased with whitespace collapsed; ratings that aren't numbers are
+skipped. Saving an assessment replaces its scores; deleting it cascades.
+rebuild_skill_scores regenerates the whole table.
+
+skill_deltas() compares each POST rating with the same participant's
+latest PRE rating of the same skill on or before that date, in the same
+initiative. The pairing is a correlated subquery answered by the
+(participant, skill, category, assessment_type, assessment_date) index,
+and the averages are grouped by skill in the same statement.
+"""
+import math
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, FloatField, OuterRef, Q, Subquery
+
+CATEGORY_FIELDS = {'TECHNICAL': 'technical_skills', 'SOFT': 'soft_skills'}
+ASSESSMENT_FIELDS = ('pk', 'participant_id', 'initiative_id', 'assessment_type', 'assessment_date', *CATEGORY_FIELDS.values())
+
+
+def normalize_skill(name):
+    return ' '.join(str(name).split()).lower()[:100]
+
+
+def _rating(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        rating = float(value)
+    except (TypeError, ValueError):
+        return None
+    # "nan" and "inf" parse as floats but can't be stored or averaged
+    return rating if math.isfinite(rating) else None
+
+
+def score_rows(pk, participant_id, initiative_id, assessment_type, assessment_date, *ratings):
+    """SkillScore instances for one assessment's field values"""
+    from .models import SkillScore
+
+    scores = {}
+    for category, values in zip(CATEGORY_FIELDS, ratings):
+        if not isinstance(values, dict):
+            continue
+        for name, value in values.items():
+            skill, rating = normalize_skill(name), _rating(value)
+            if skill and rating is not None:
+                # A later duplicate after normalization wins, as in a dict
+                scores[(category, skill)] = SkillScore(
+                    assessment_id=pk, participant_id=participant_id, initiative_id=initiative_id,
+                    assessment_type=assessment_type, assessment_date=assessment_date,
+                    category=category, skill=skill, rating=rating
+                )
+    return list(scores.values())
+
+
+def sync_scores(assessment):
+    """Replace the stored scores of one assessment"""
+    from .models import SkillScore
+
+    rows = score_rows(*(getattr(assessment, field) for field in ASSESSMENT_FIELDS))
+    with transaction.atomic():
+        SkillScore.objects.filter(assessment_id=assessment.pk).delete()
+        SkillScore.objects.bulk_create(rows, batch_size=1000)
+
+
+def rebuild_scores(chunk_size=2000):
+    """Regenerate every SkillScore from the assessments; returns the number of scores"""
+    from .models import SkillAssessment, SkillScore
+
+    total = 0
+    with transaction.atomic():
+        SkillScore.objects.all().delete()
+        batch = []
+        for row in SkillAssessment.objects.order_by().values_list(*ASSESSMENT_FIELDS).iterator(chunk_size=chunk_size):
+            batch.extend(score_rows(*row))
+            if len(batch) >= chunk_size:
+                SkillScore.objects.bulk_create(batch, batch_size=1000)
+                total += len(batch)
+                batch = []
+        SkillScore.objects.bulk_create(batch, batch_size=1000)
+        total += len(batch)
+    return total
+
+
+def skill_deltas(initiative_id=None, category=None, skills=None):
+    """
+    Average PRE and POST rating and gain per skill over paired ratings,
+    with the number of participants, pairs and pairs that improved
+    """
+    from .models import SkillScore
+
+    posts = SkillScore.objects.filter(assessment_type='POST')
+    if initiative_id is not None:
+        posts = posts.filter(initiative_id=initiative_id)
+    if category:
+        posts = posts.filter(category=category)
+    if skills:
+        posts = posts.filter(skill__in=[normalize_skill(skill) for skill in skills])
+    pre = SkillScore.objects.filter(
+        participant=OuterRef('participant'), skill=OuterRef('skill'), category=OuterRef('category'),
+        assessment_type='PRE', assessment_date__lte=OuterRef('assessment_date'), initiative=OuterRef('initiative')
+    ).order_by('-assessment_date', '-pk').values('rating')[:1]
+    rows = posts.annotate(pre=Subquery(pre, output_field=FloatField())).filter(pre__isnull=False).order_by(
+        'category', 'skill'
+    ).values('category', 'skill').annotate(
+        participants=Count('participant', distinct=True),
+        pairs=Count('pk'),
+        improved=Count('pk', filter=Q(rating__gt=F('pre'))),
+        pre_average=Avg('pre'),
+        post_average=Avg('rating'),
+        gain=Avg(F('rating') - F('pre')),
+    )
+    return list(rows)
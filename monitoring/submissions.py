@@ -0,0 +1,278 @@
+"""
+Validation and storage of DataCollectionTemplate responses.
+
+A template's fields JSON is either a list of field definitions or an object
+mapping field names to definitions:
+
+    [{"name": "age", "type": "integer", "required": true, "min": 0},
+     {"name": "district", "type": "choice", "choices": ["North", "South"]}]
+
+A definition may set label, required, choices (values, or objects with a
+value), min and max (numbers and dates), min_length, max_length and
+pattern. Types are text (the default), email, integer, number, boolean,
+date, choice and multichoice; select, checkbox and the like are accepted
+as aliases.
+
+A definition is compiled once into a validator: one coerce function and a
+list of checks per field, all bound as closures so a row is checked with
+plain function calls rather than by re-reading the definition. Compiled
+validators are kept per process for each template and thrown away when
+the template is saved or deleted. The template's updated_at is part of
+the key, so other processes also recompile after an edit.
+
+ingest() validates a batch, writes the valid rows with bulk_create under a
+shared batch id, and returns per-row errors for the rest.
+"""
+import datetime
+from decimal import Decimal, InvalidOperation
+import math
+import re
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+
+TYPE_ALIASES = {
+    'text': 'text', 'string': 'text', 'textarea': 'text', 'char': 'text', 'str': 'text',
+    'email': 'email',
+    'integer': 'integer', 'int': 'integer',
+    'number': 'number', 'decimal': 'number', 'float': 'number', 'numeric': 'number',
+    'boolean': 'boolean', 'bool': 'boolean', 'checkbox': 'boolean', 'yes_no': 'boolean',
+    'date': 'date',
+    'choice': 'choice', 'select': 'choice', 'radio': 'choice', 'dropdown': 'choice',
+    'multichoice': 'multichoice', 'multiselect': 'multichoice', 'checkboxes': 'multichoice',
+}
+TRUE = {'true', 'yes', 'y', '1', 'on'}
+FALSE = {'false', 'no', 'n', '0', 'off'}
+BATCH_SIZE = 1000
+
+
+class TemplateDefinitionError(ValueError):
+    """A template's fields JSON can't be compiled"""
+
+
+def _text(value):
+    if isinstance(value, (dict, list)):
+        raise ValueError("expected text")
+    return str(value).strip()
+
+
+def _email(value):
+    value = _text(value)
+    try:
+        validate_email(value)
+    except ValidationError:
+        raise ValueError("enter a valid email address")
+    return value
+
+
+def _integer(value):
+    if isinstance(value, bool):
+        raise ValueError("expected a whole number")
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError("expected a whole number")
+
+
+def _number(value):
+    if isinstance(value, bool):
+        raise ValueError("expected a number")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        # json.loads accepts NaN and Infinity, which the JSON column refuses
+        if not math.isfinite(value):
+            raise ValueError("expected a finite number")
+        return value
+    try:
+        number = Decimal(str(value).replace(',', '').strip())
+    except InvalidOperation:
+        raise ValueError("expected a number")
+    if not number.is_finite():
+        raise ValueError("expected a number")
+    return int(number) if number == number.to_integral_value() else float(number)
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE:
+        return True
+    if text in FALSE:
+        return False
+    raise ValueError("expected yes or no")
+
+
+def _date(value):
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    try:
+        return datetime.date.fromisoformat(str(value).strip()[:10]).isoformat()
+    except ValueError:
+        raise ValueError("expected a date as YYYY-MM-DD")
+
+
+def _choices(definition, name):
+    choices = definition.get('choices', definition.get('options'))
+    if not isinstance(choices, list) or not choices:
+        raise TemplateDefinitionError(f"field {name!r} needs a list of choices")
+    values = [str(c.get('value', c.get('label')) if isinstance(c, dict) else c) for c in choices]
+    # Spreadsheet entries rarely match case exactly
+    return {value.lower(): value for value in values}
+
+
+def _compile_field(name, definition):
+    kind = TYPE_ALIASES.get(str(definition.get('type', 'text')).lower())
+    if kind is None:
+        raise TemplateDefinitionError(f"field {name!r} has unknown type {definition.get('type')!r}")
+    checks = []
+
+    if kind in ('choice', 'multichoice'):
+        lookup = _choices(definition, name)
+        allowed = ', '.join(lookup.values())
+
+        def choice(value):
+            try:
+                return lookup[str(value).strip().lower()]
+            except KeyError:
+                raise ValueError(f"{value!r} is not one of {allowed}")
+
+        if kind == 'choice':
+            coerce = choice
+        else:
+            def coerce(value):
+                items = value if isinstance(value, list) else [v for v in str(value).split(',') if v.strip()]
+                return [choice(item) for item in items]
+    else:
+        coerce = {
+            'text': _text, 'email': _email, 'integer': _integer, 'number': _number, 'boolean': _boolean,
+            'date': _date,
+        }[kind]
+
+    try:
+        if kind in ('integer', 'number', 'date'):
+            parse = _date if kind == 'date' else _number
+            for key, fails, message in (
+                ('min', lambda value, bound: value < bound, "at least"),
+                ('max', lambda value, bound: value > bound, "at most"),
+            ):
+                if definition.get(key) is not None:
+                    bound = parse(definition[key])
+                    checks.append(lambda value, bound=bound, fails=fails, message=message: (
+                        f"must be {message} {bound}" if fails(value, bound) else None
+                    ))
+        if kind in ('text', 'email'):
+            if definition.get('min_length') is not None:
+                min_length = int(definition['min_length'])
+                checks.append(lambda value: f"must be at least {min_length} characters" if len(value) < min_length else None)
+            if definition.get('max_length') is not None:
+                max_length = int(definition['max_length'])
+                checks.append(lambda value: f"must be at most {max_length} characters" if len(value) > max_length else None)
+            if definition.get('pattern'):
+                pattern = re.compile(definition['pattern'])
+                checks.append(lambda value: "has the wrong format" if not pattern.fullmatch(value) else None)
+    except (TypeError, ValueError, re.error) as e:
+        raise TemplateDefinitionError(f"field {name!r}: {e}")
+
+    return name, bool(definition.get('required', False)), coerce, checks
+
+
+def compile_template(fields):
+    """
+    Compile a fields definition into validate(row) -> (cleaned, errors).
+    Raises TemplateDefinitionError when the definition is malformed.
+    """
+    if isinstance(fields, dict):
+        fields = [{'name': name, **(d if isinstance(d, dict) else {'type': d})} for name, d in fields.items()]
+    if not isinstance(fields, list) or not fields:
+        raise TemplateDefinitionError("fields must be a non-empty list or object of field definitions")
+    compiled = []
+    for definition in fields:
+        if not isinstance(definition, dict):
+            raise TemplateDefinitionError("each field definition must be an object")
+        name = definition.get('name') or definition.get('key') or definition.get('id')
+        if not name:
+            raise TemplateDefinitionError("each field needs a name")
+        compiled.append(_compile_field(str(name), definition))
+    names = {name for name, *_ in compiled}
+    if len(names) != len(compiled):
+        raise TemplateDefinitionError("field names must be unique")
+
+    def validate(row):
+        if not isinstance(row, dict):
+            return None, {'__all__': "expected an object of field values"}
+        cleaned = {}
+        errors = {}
+        for name, required, coerce, checks in compiled:
+            value = row.get(name)
+            if value is None or value == '' or value == []:
+                if required:
+                    errors[name] = "this field is required"
+                continue
+            try:
+                value = coerce(value)
+            except ValueError as e:
+                errors[name] = str(e)
+                continue
+            for check in checks:
+                message = check(value)
+                if message:
+                    errors[name] = message
+                    break
+            else:
+                cleaned[name] = value
+        unknown = row.keys() - names
+        if unknown:
+            errors['__all__'] = f"unknown fields: {', '.join(sorted(map(str, unknown)))}"
+        return cleaned, errors
+
+    return validate
+
+
+_validators = {}
+
+
+def get_validator(template):
+    cached = _validators.get(template.pk)
+    if cached is None or cached[0] != template.updated_at:
+        cached = (template.updated_at, compile_template(template.fields))
+        _validators[template.pk] = cached
+    return cached[1]
+
+
+def forget_validator(template_id):
+    _validators.pop(template_id, None)
+
+
+def ingest(template, rows, submitted_by=None, initiative=None, atomic=False):
+    """
+    Validate rows against a template and store the valid ones. Returns
+    (batch id, number stored, [{'row': index, 'errors': {...}}]). With
+    atomic, nothing is stored unless every row is valid.
+    """
+    from .models import DataSubmission
+
+    if not template.is_active:
+        raise TemplateDefinitionError(f"template {template} is not active")
+    validate = get_validator(template)
+    batch = uuid.uuid4()
+    submissions = []
+    errors = []
+    for index, row in enumerate(rows):
+        cleaned, row_errors = validate(row)
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+        else:
+            submissions.append(DataSubmission(
+                template=template, initiative=initiative, submitted_by=submitted_by, batch=batch, data=cleaned
+            ))
+    if atomic and errors:
+        return batch, 0, errors
+    with transaction.atomic():
+        DataSubmission.objects.bulk_create(submissions, batch_size=BATCH_SIZE)
+    return batch, len(submissions), errors
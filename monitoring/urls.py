@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'monitoring'
+
+urlpatterns = [
+    path('series/<str:kind>/<int:series_id>/', views.series_chart, name='series-chart'),
+    path('metrics/<int:metric_id>/periods/', views.metric_periods, name='metric-periods'),
+    path('finance/variance/', views.variance_cube, name='variance-cube'),
+    path('finance/variance/<int:year>/', views.variance_cube, name='variance-cube-year'),
+    path('skills/gains/', views.skill_gains, name='skill-gains'),
+    path('employment/cohorts/', views.employment_cohorts, name='employment-cohorts'),
+]
@@ -0,0 +1,177 @@
+"""
+Budgeted vs actual variance cube over FinancialTracking.
+
+Cells are initiative x category x month for one fiscal year (starting in
+settings.FISCAL_YEAR_START_MONTH, named after the calendar year it starts
+in). They come from a single grouped query that also computes variance
+(actual - budgeted) and variance_percentage (variance / budgeted * 100, 0
+when nothing was budgeted) in SQL, matching FinancialTracking's own
+methods; variance_columns() gives the same expressions per row. Quarter
+and year subtotals per initiative and category, per initiative, and for
+the whole organisation are folded from the cells, as SQLite has no GROUP
+BY ROLLUP.
+
+Cubes are cached per fiscal year; saving or deleting a FinancialTracking
+row drops the cube of the year it falls in (and of the year it moved out
+of).
+"""
+import datetime
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+CUBE_CACHE_TIMEOUT = 60 * 60 * 24
+# Fiscal years whose bounds fit in a date
+FISCAL_YEARS = range(datetime.MINYEAR, datetime.MAXYEAR)
+
+
+def fiscal_year(date):
+    """Fiscal year a date falls in, named after the calendar year it starts in"""
+    return date.year if date.month >= settings.FISCAL_YEAR_START_MONTH else date.year - 1
+
+
+def fiscal_year_bounds(year):
+    """First day of the fiscal year and first day of the next one"""
+    start = datetime.date(year, settings.FISCAL_YEAR_START_MONTH, 1)
+    return start, start.replace(year=year + 1)
+
+
+def fiscal_quarter(date):
+    return ((date.month - settings.FISCAL_YEAR_START_MONTH) % 12) // 3 + 1
+
+
+def cube_cache_key(year):
+    return f'monitoring:variance-cube:{year}'
+
+
+def invalidate_cube(*dates):
+    cache.delete_many([cube_cache_key(fiscal_year(date)) for date in dates if date])
+
+
+def variance_columns(budgeted='budgeted_amount', actual='actual_amount'):
+    """
+    variance and variance_percentage as SQL expressions over two amount
+    columns, either FinancialTracking fields or aggregate aliases
+    """
+    return {
+        'variance': F(actual) - F(budgeted),
+        'variance_percentage': Case(
+            When(**{budgeted: 0}, then=Value(0.0)),
+            default=Cast(F(actual) - F(budgeted), FloatField()) * 100 / Cast(budgeted, FloatField()),
+            output_field=FloatField()
+        ),
+    }
+
+
+def _variance(budgeted, actual):
+    variance = actual - budgeted
+    return {
+        'budgeted': budgeted,
+        'actual': actual,
+        'variance': variance,
+        'variance_percentage': float(variance / budgeted * 100) if budgeted else 0.0,
+    }
+
+
+def build_cube(year):
+    from .models import FinancialTracking
+
+    start, end = fiscal_year_bounds(year)
+    categories = dict(FinancialTracking.EXPENSE_CATEGORIES)
+    cells = []
+    subtotals = {}
+    for row in FinancialTracking.objects.filter(month__gte=start, month__lt=end).order_by(
+        'initiative__name', 'initiative_id', 'category', 'month'
+    ).values(
+        'initiative_id', 'initiative__name', 'category', 'month'
+    ).annotate(
+        budgeted=Sum('budgeted_amount'), actual=Sum('actual_amount')
+    ).annotate(**variance_columns('budgeted', 'actual')):
+        quarter = fiscal_quarter(row['month'])
+        cells.append({
+            'initiative_id': row['initiative_id'],
+            'initiative': row['initiative__name'],
+            'category': row['category'],
+            'category_label': categories.get(row['category'], row['category']),
+            'month': row['month'],
+            'quarter': quarter,
+            'budgeted': row['budgeted'],
+            'actual': row['actual'],
+            'variance': row['variance'],
+            'variance_percentage': row['variance_percentage'],
+        })
+        initiative = (row['initiative_id'], row['initiative__name'])
+        # None stands for "all" at that level, as in a ROLLUP
+        for key in (
+            (initiative, row['category'], quarter), (initiative, row['category'], None),
+            (initiative, None, quarter), (initiative, None, None),
+            (None, None, quarter), (None, None, None),
+        ):
+            totals = subtotals.setdefault(key, [Decimal('0'), Decimal('0')])
+            totals[0] += row['budgeted']
+            totals[1] += row['actual']
+
+    rollup = []
+    for (initiative, category, quarter), (budgeted, actual) in subtotals.items():
+        if initiative is None and quarter is None:
+            continue
+        rollup.append({
+            'initiative_id': initiative[0] if initiative else None,
+            'initiative': initiative[1] if initiative else None,
+            'category': category,
+            'category_label': categories.get(category, category) if category else None,
+            'quarter': quarter,
+            **_variance(budgeted, actual),
+        })
+    rollup.sort(key=lambda r: (
+        r['initiative'] is None, r['initiative'] or '', r['initiative_id'] or 0,
+        r['category'] is None, r['category'] or '', r['quarter'] is None, r['quarter'] or 0
+    ))
+    budgeted, actual = subtotals.get((None, None, None), (Decimal('0'), Decimal('0')))
+    return {
+        'fiscal_year': year,
+        'start': start,
+        'end': end - datetime.timedelta(days=1),
+        'cells': cells,
+        'subtotals': rollup,
+        'total': _variance(budgeted, actual),
+        'generated_at': timezone.now(),
+    }
+
+
+def get_cube(year):
+    key = cube_cache_key(year)
+    cube = cache.get(key)
+    if cube is None:
+        cube = build_cube(year)
+        cache.set(key, cube, CUBE_CACHE_TIMEOUT)
+    return cube
+
+
+def quarter_table(cube):
+    """
+    Subtotals of a cube as table rows: one per initiative and category, then
+    the initiative total, then the organisation total, each with its four
+    quarters (None where nothing was recorded) and the year.
+    """
+    rows = {}
+    for subtotal in cube['subtotals']:
+        key = (subtotal['initiative_id'], subtotal['category'])
+        row = rows.setdefault(key, {
+            'initiative': subtotal['initiative'],
+            'category_label': subtotal['category_label'],
+            'quarters': [None] * 4,
+            'year': None,
+        })
+        if subtotal['quarter'] is None:
+            row['year'] = subtotal
+        else:
+            row['quarters'][subtotal['quarter'] - 1] = subtotal
+    table = list(rows.values())
+    if (None, None) in rows:
+        rows[(None, None)]['year'] = cube['total']
+    return table
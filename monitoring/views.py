@@ -1,3 +1,110 @@
-from django.shortcuts import render
+import datetime
 
-# Create your views here.
+from django.contrib.auth.decorators import login_required, permission_required
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
+from .employment import PERIODS, get_cohorts
+from .models import KPIMetric
+from .rollups import metric_series
+from .series import DEFAULT_POINTS, SOURCES, get_series, series_owner
+from .skills import CATEGORY_FIELDS, skill_deltas
+from .variance import FISCAL_YEARS, fiscal_year, get_cube
+
+
+@login_required
+def series_chart(request, kind, series_id):
+    """
+    Chart points of one series, downsampled to ?points= (default 500, at
+    most 2000) between optional ?start= and ?end= ISO dates.
+    """
+    if kind not in SOURCES:
+        raise Http404
+    owner = series_owner(kind)._meta
+    if not request.user.has_perm(f'{owner.app_label}.view_{owner.model_name}'):
+        raise PermissionDenied
+    get_object_or_404(series_owner(kind), pk=series_id)
+    try:
+        start = datetime.date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end = datetime.date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+        points = int(request.GET.get('points', DEFAULT_POINTS))
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return JsonResponse(get_series(kind, series_id, start, end, points))
+
+
+@login_required
+@permission_required('monitoring.view_kpimetric', raise_exception=True)
+def metric_periods(request, metric_id):
+    """
+    Count, average, minimum, maximum and last value of a KPI metric's
+    progress per monitoring period, from ?since= (an ISO date) if given
+    """
+    metric = get_object_or_404(KPIMetric, pk=metric_id)
+    try:
+        since = datetime.date.fromisoformat(request.GET['since']) if request.GET.get('since') else None
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return JsonResponse({
+        'metric': metric.pk,
+        'period': metric.monitoring_frequency,
+        'since': since,
+        'periods': [
+            {
+                'period_start': start, 'count': count, 'average': average,
+                'minimum': minimum, 'maximum': maximum, 'last_value': last_value,
+            }
+            for start, count, average, minimum, maximum, last_value in metric_series([metric.pk], since)[metric.pk]
+        ],
+    })
+
+
+@login_required
+@permission_required('monitoring.view_financialtracking', raise_exception=True)
+def variance_cube(request, year=None):
+    """Budgeted vs actual by initiative, category and month with subtotals, for one fiscal year"""
+    if year is None:
+        year = fiscal_year(timezone.now().date())
+    elif year not in FISCAL_YEARS:
+        return HttpResponseBadRequest(f'year must be between {FISCAL_YEARS[0]} and {FISCAL_YEARS[-1]}')
+    return JsonResponse(get_cube(year))
+
+
+@login_required
+@permission_required('monitoring.view_skillassessment', raise_exception=True)
+def skill_gains(request):
+    """
+    PRE to POST rating change per skill, optionally for one ?initiative=,
+    one ?category= (TECHNICAL or SOFT) and repeated ?skill= names
+    """
+    category = request.GET.get('category') or None
+    if category and category not in CATEGORY_FIELDS:
+        return HttpResponseBadRequest(f"category must be one of {', '.join(CATEGORY_FIELDS)}")
+    try:
+        initiative_id = int(request.GET['initiative']) if request.GET.get('initiative') else None
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return JsonResponse({
+        'initiative': initiative_id,
+        'category': category,
+        'skills': skill_deltas(initiative_id, category, request.GET.getlist('skill')),
+    })
+
+
+@login_required
+@permission_required('monitoring.view_employmenttracking', raise_exception=True)
+def employment_cohorts(request):
+    """
+    Placement and retention statistics per cohort, for one ?initiative= or
+    all of them, with cohorts by ?period= month, quarter (default) or year
+    """
+    period = request.GET.get('period', 'quarter')
+    if period not in PERIODS:
+        return HttpResponseBadRequest(f"period must be one of {', '.join(PERIODS)}")
+    try:
+        initiative_id = int(request.GET['initiative']) if request.GET.get('initiative') else None
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return JsonResponse(get_cohorts(initiative_id, period))
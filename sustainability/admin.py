@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
-from django.urls import reverse
+from django.urls import path , reverse
 from django.db.models import Sum, Avg
 from .models import (
     ReplicableProgram, ProgramReplication, CorporatePartner,
@@ -8,6 +10,7 @@ from .models import (
     FranchiseLocation, Product, ConsultingService, ConsultingEngagement,
     SocialEnterpriseMetrics, SustainabilityReport
 )
+from .reconciliation import get_reconciliation
 
 
 @admin.register(AnnualBudget)
@@ -15,9 +18,10 @@ class AnnualBudgetAdmin(admin.ModelAdmin):
     list_display = (
         'fiscal_year' , 'total_budget_display' ,
         'budget_breakdown_display' , 'status' ,
-        'approval_status'
+        'approval_status' , 'reconciliation_link'
     )
     list_filter = ('status' , 'fiscal_year')
+    change_form_template = 'admin/sustainability/annualbudget/change_form.html'
     search_fields = ('fiscal_year' , 'notes')
     readonly_fields = ('created_at' , 'updated_at')
 
@@ -41,18 +45,18 @@ class AnnualBudgetAdmin(admin.ModelAdmin):
     )
 
     def total_budget_display(self , obj):
-        return format_html('₹{:,}' , obj.total_budget)
+        return format_html('₹{}' , f'{obj.total_budget:,}')
 
     total_budget_display.short_description = 'Total Budget'
 
     def budget_breakdown_display(self , obj):
         return format_html(
-            'Staff: ₹{:,}<br>'
-            'Ops: ₹{:,}<br>'
-            'Programs: ₹{:,}' ,
-            obj.staff_salaries ,
-            obj.operational_costs ,
-            obj.program_costs
+            'Staff: ₹{}<br>'
+            'Ops: ₹{}<br>'
+            'Programs: ₹{}' ,
+            f'{obj.staff_salaries:,}' ,
+            f'{obj.operational_costs:,}' ,
+            f'{obj.program_costs:,}'
         )
 
     budget_breakdown_display.short_description = 'Breakdown'
@@ -68,6 +72,36 @@ class AnnualBudgetAdmin(admin.ModelAdmin):
         )
 
     approval_status.short_description = 'Approval'
+
+    def reconciliation_link(self , obj):
+        return format_html(
+            '<a href="{}">Reconcile</a>' ,
+            reverse('admin:sustainability_annualbudget_reconciliation' , args=[obj.pk])
+        )
+
+    reconciliation_link.short_description = 'Reconciliation'
+
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/reconciliation/' ,
+                self.admin_site.admin_view(self.reconciliation_view) ,
+                name='sustainability_annualbudget_reconciliation'
+            ) ,
+        ] + super().get_urls()
+
+    def reconciliation_view(self , request , object_id):
+        budget = self.get_object(request , object_id)
+        if budget is None or not self.has_view_permission(request , budget):
+            raise PermissionDenied
+        context = dict(
+            self.admin_site.each_context(request) ,
+            title=f'Budget reconciliation {budget.fiscal_year}' ,
+            opts=self.model._meta ,
+            original=budget ,
+            reconciliation=get_reconciliation(budget) ,
+        )
+        return TemplateResponse(request , 'admin/sustainability/annualbudget/reconciliation.html' , context)
     
     def has_module_permission(self, request):
         return False
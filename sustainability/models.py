@@ -293,6 +293,15 @@ class BudgetTracking(models.Model):
     def __str__(self):
         return f"{self.category} - {self.month}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the budget, so moving the record also drops the old
+        # budget's cached reconciliation
+        if 'annual_budget_id' in instance.__dict__:
+            instance._previous_budget_id = instance.annual_budget_id
+        return instance
+
 class FranchiseModel(models.Model):
     STATUS_CHOICES = [
         ('DEVELOPMENT', 'In Development'),
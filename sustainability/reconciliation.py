@@ -0,0 +1,206 @@
+"""
+AnnualBudget vs BudgetTracking reconciliation.
+
+An AnnualBudget plans its year in five fixed columns (staff_salaries,
+operational_costs, program_costs, marketing_costs, contingency_fund) and
+in the free-form detailed_breakdown JSON. BudgetTracking records budgeted
+and actual amounts per month under a free-text category. Both sides are
+mapped onto one category index: a name is lower-cased, runs of anything
+but letters and digits become underscores, and known spellings ("Staff",
+"salaries", "operational_costs", "Ops", ...) resolve to the category of a
+fixed column. Anything else stays a category of its own under its
+normalized name, labelled as first written.
+
+Planned amounts come from the fixed columns. A breakdown entry adds to its
+category when no column covers it, or when that column is zero. An entry
+is a number, a dict holding an amount/total/budget key, or a dict of
+sub-items, which is summed.
+
+Tracking records are summed per raw category and month in one grouped
+query, and the rows are folded into the index in a single pass. Per
+category this gives:
+    burn: actual spend in months up to the reconciliation date
+    committed: actual amounts already recorded against later months
+    remaining: planned minus burn and committed
+    run rate: burn per elapsed month of the fiscal year
+    projected: burn and committed plus the run rate over the months left
+    overrun: projected minus planned, where positive
+Money spent under a category with nothing planned is all overrun.
+
+The fiscal year comes from the first four-digit year in
+AnnualBudget.fiscal_year and settings.FISCAL_YEAR_START_MONTH. Results are
+cached per annual budget for the day. Saving or deleting the budget or one
+of its tracking records drops the cached copy.
+"""
+import datetime
+from decimal import Decimal
+import re
+
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+
+from monitoring.variance import fiscal_year, fiscal_year_bounds
+
+RECONCILIATION_CACHE_TIMEOUT = 60 * 60 * 24
+ZERO = Decimal('0.00')
+
+# Category key: (AnnualBudget column, label)
+COLUMNS = {
+    'staff': ('staff_salaries', 'Staff salaries'),
+    'operations': ('operational_costs', 'Operational costs'),
+    'programs': ('program_costs', 'Program costs'),
+    'marketing': ('marketing_costs', 'Marketing'),
+    'contingency': ('contingency_fund', 'Contingency'),
+}
+ALIASES = {
+    'staff': 'staff', 'staff_salaries': 'staff', 'staff_salary': 'staff', 'salaries': 'staff',
+    'salary': 'staff', 'personnel': 'staff', 'payroll': 'staff', 'staff_costs': 'staff',
+    'operations': 'operations', 'operational': 'operations', 'operational_costs': 'operations',
+    'operating_costs': 'operations', 'ops': 'operations', 'overheads': 'operations', 'overhead': 'operations',
+    'programs': 'programs', 'program': 'programs', 'programmes': 'programs', 'programme': 'programs',
+    'program_costs': 'programs', 'programme_costs': 'programs',
+    'marketing': 'marketing', 'marketing_costs': 'marketing', 'outreach': 'marketing',
+    'marketing_outreach': 'marketing', 'marketing_and_outreach': 'marketing',
+    'contingency': 'contingency', 'contingency_fund': 'contingency', 'reserve': 'contingency',
+    'reserves': 'contingency',
+}
+AMOUNT_KEYS = ('amount', 'total', 'budget', 'planned')
+
+
+def category_key(name):
+    """Index key of a breakdown key or tracking category"""
+    slug = re.sub(r'[^a-z0-9]+', '_', str(name).lower()).strip('_')
+    return ALIASES.get(slug, slug or 'uncategorized')
+
+
+def fiscal_year_start(budget):
+    """Calendar year the budget's fiscal year starts in, or None"""
+    match = re.search(r'\d{4}', budget.fiscal_year or '')
+    return int(match.group()) if match else None
+
+
+def _amount(value):
+    """Planned amount of a breakdown entry"""
+    if isinstance(value, bool):
+        return ZERO
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value))
+    if isinstance(value, str):
+        try:
+            return Decimal(value.replace(',', '').strip() or '0')
+        except ArithmeticError:
+            return ZERO
+    if isinstance(value, dict):
+        for key in AMOUNT_KEYS:
+            if key in value:
+                return _amount(value[key])
+        return sum((_amount(v) for v in value.values()), ZERO)
+    if isinstance(value, list):
+        return sum((_amount(v) for v in value), ZERO)
+    return ZERO
+
+
+def planned_amounts(budget):
+    """{category key: (label, planned amount)} for an AnnualBudget"""
+    planned = {key: [label, getattr(budget, column) or ZERO] for key, (column, label) in COLUMNS.items()}
+    breakdown = budget.detailed_breakdown if isinstance(budget.detailed_breakdown, dict) else {}
+    from_breakdown = {}
+    for name, value in breakdown.items():
+        key = category_key(name)
+        if key in COLUMNS and planned[key][1]:
+            continue
+        entry = from_breakdown.setdefault(key, [COLUMNS[key][1] if key in COLUMNS else str(name), ZERO])
+        entry[1] += _amount(value)
+    planned.update(from_breakdown)
+    return {key: tuple(entry) for key, entry in planned.items()}
+
+
+def _months_between(start, date):
+    return (date.year - start.year) * 12 + date.month - start.month
+
+
+def _category(key, label, planned):
+    return {
+        'category': key, 'label': label, 'planned': planned, 'budgeted': ZERO, 'burn': ZERO, 'committed': ZERO,
+    }
+
+
+def build_reconciliation(budget, as_of=None):
+    from .models import BudgetTracking
+
+    year = fiscal_year_start(budget)
+    rows = list(
+        BudgetTracking.objects.filter(annual_budget=budget).order_by().values('category', 'month').annotate(
+            budgeted=Sum('budgeted_amount'), actual=Sum('actual_amount')
+        )
+    )
+    if year is None:
+        year = fiscal_year(min((row['month'] for row in rows), default=timezone.now().date()))
+    start, end = fiscal_year_bounds(year)
+    end -= datetime.timedelta(days=1)
+    as_of = min(max(as_of or timezone.now().date(), start), end)
+    elapsed = _months_between(start, as_of) + 1
+    left = 12 - elapsed
+
+    categories = {
+        key: _category(key, label, amount) for key, (label, amount) in planned_amounts(budget).items()
+    }
+    for row in rows:
+        key = category_key(row['category'])
+        if key not in categories:
+            categories[key] = _category(key, row['category'], ZERO)
+        category = categories[key]
+        if row['month'] <= as_of:
+            category['budgeted'] += row['budgeted']
+            category['burn'] += row['actual']
+        else:
+            category['committed'] += row['actual']
+
+    totals = dict.fromkeys(
+        ('planned', 'budgeted', 'burn', 'committed', 'remaining', 'projected', 'overrun'), ZERO
+    )
+    for category in categories.values():
+        run_rate = category['burn'] / elapsed
+        spent = category['burn'] + category['committed']
+        category['run_rate'] = run_rate.quantize(ZERO)
+        category['remaining'] = category['planned'] - spent
+        category['projected'] = (spent + run_rate * left).quantize(ZERO)
+        category['overrun'] = max(category['projected'] - category['planned'], ZERO)
+        category['burn_percentage'] = float(category['burn'] / category['planned'] * 100) if category['planned'] else None
+        for field in totals:
+            totals[field] += category[field]
+    totals['burn_percentage'] = float(totals['burn'] / totals['planned'] * 100) if totals['planned'] else None
+
+    return {
+        'annual_budget_id': budget.pk,
+        'fiscal_year': year,
+        'start': start,
+        'end': end,
+        'as_of': as_of,
+        'months_elapsed': elapsed,
+        'total_budget': budget.total_budget,
+        'unallocated': budget.total_budget - totals['planned'],
+        'categories': sorted(categories.values(), key=lambda c: (c['category'] not in COLUMNS, c['label'].lower())),
+        'totals': totals,
+        'generated_at': timezone.now(),
+    }
+
+
+def reconciliation_cache_key(budget_id):
+    return f'sustainability:budget-reconciliation:{budget_id}'
+
+
+def invalidate_reconciliation(*budget_ids):
+    cache.delete_many([reconciliation_cache_key(pk) for pk in budget_ids if pk])
+
+
+def get_reconciliation(budget):
+    key = reconciliation_cache_key(budget.pk)
+    today = timezone.now().date()
+    reconciliation = cache.get(key)
+    # Burn and projections move with the date, so yesterday's copy is stale
+    if reconciliation is None or reconciliation['generated_at'].date() != today:
+        reconciliation = build_reconciliation(budget, today)
+        cache.set(key, reconciliation, RECONCILIATION_CACHE_TIMEOUT)
+    return reconciliation
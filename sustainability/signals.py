@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import AnnualBudget, BudgetTracking
+from .reconciliation import invalidate_reconciliation
+
+
+@receiver(post_save, sender=AnnualBudget)
+@receiver(post_delete, sender=AnnualBudget)
+def invalidate_budget_reconciliation(sender, instance, **kwargs):
+    invalidate_reconciliation(instance.pk)
+
+
+@receiver(post_save, sender=BudgetTracking)
+@receiver(post_delete, sender=BudgetTracking)
+def invalidate_tracking_reconciliation(sender, instance, **kwargs):
+    invalidate_reconciliation(instance.annual_budget_id, getattr(instance, '_previous_budget_id', None))
+    instance._previous_budget_id = instance.annual_budget_id
@@ -1,9 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils.timezone import now
-from django.http import HttpResponse
-import csv
-from datetime import datetime
 
 from .models import Member, CoreCommittee, Department, StudentVolunteer
 
@@ -130,7 +127,7 @@ class StudentVolunteerAdmin(admin.ModelAdmin):
         })
     )
 
-    actions = ['approve_volunteers', 'reject_volunteers', 'export_as_csv']
+    actions = ['approve_volunteers', 'reject_volunteers']
 
     def approve_volunteers(self, request, queryset):
         queryset.update(
@@ -144,22 +141,6 @@ class StudentVolunteerAdmin(admin.ModelAdmin):
         queryset.update(status='REJECTED')
     reject_volunteers.short_description = "Reject selected volunteers"
 
-    def export_as_csv(self, request, queryset):
-        meta = self.model._meta
-        field_names = [field.name for field in meta.fields]
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename={meta}_export_{datetime.now().strftime("%Y_%m_%d")}.csv'
-        
-        writer = csv.writer(response)
-        writer.writerow(field_names)
-        
-        for obj in queryset:
-            writer.writerow([getattr(obj, field) for field in field_names])
-        
-        return response
-    export_as_csv.short_description = "Export selected to CSV"
-
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
             'department',
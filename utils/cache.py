@@ -0,0 +1,29 @@
+import time
+
+from django.core.cache import cache
+
+
+def cache_version(key):
+    """
+    Return the version stored under key, creating it if missing.
+
+    Cached entries put the version in their own key, so bumping it makes
+    them unreachable without having to know or delete each one. A missing
+    version is seeded with the current time, so a version evicted from the
+    cache never comes back with a value an old entry was built from.
+    """
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key , version , timeout=None):
+            # Another process seeded it first
+            version = cache.get(key , version)
+    return version
+
+
+def bump_cache_version(key):
+    """Invalidate every cached entry built with the version under key"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key , time.time_ns() , timeout=None)
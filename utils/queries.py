@@ -0,0 +1,24 @@
+def chunked_pks(queryset , chunk_size=1000):
+    """Yield lists of primary keys from queryset, chunk_size at a time.
+
+    Uses keyset pagination on pk so chunks stay stable even when the caller
+    updates rows in a way that removes them from the queryset's filter.
+    """
+    pks = queryset.prefetch_related(None).order_by('pk').values_list('pk' , flat=True)
+    last_pk = None
+    while True:
+        page = pks if last_pk is None else pks.filter(pk__gt=last_pk)
+        chunk = list(page[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+def chunked_update(queryset , values , chunk_size=1000):
+    """Run queryset.update(**values) in pk chunks, returning the row count"""
+    manager = queryset.model._base_manager
+    updated = 0
+    for chunk in chunked_pks(queryset , chunk_size):
+        updated += manager.filter(pk__in=chunk).update(**values)
+    return updated